@@ -0,0 +1,285 @@
+"""
+Накладные расходы FastAPI, зависимостей и pydantic на каждый маршрут API без MongoDB.
+Приложение из create_app() вызывается через ASGI-транспорт httpx, репозитории заменены реализациями в памяти,
+аутентификация - фиксированным пользователем.
+
+Для каждого маршрута считаются запросы в секунду, p50/p99 задержки, процессорное время на запрос, выделения
+памяти на запрос (tracemalloc, отдельным проходом, чтобы не искажать время) и ответы с ошибкой. Результат сохраняется
+в benchmarks/results/endpoints-<commit>.json.
+
+Запуск: python -m benchmarks.endpoints --iterations 2000 [--compare benchmarks/results/endpoints-<commit>.json]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import time
+import tracemalloc
+import uuid
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+import httpx
+from src.api.v1.depends import User, get_current_user, get_test_current_user
+from src.domain.bookmark import Bookmark
+from src.domain.like import Like
+from src.domain.movie import activity_hour
+from src.domain.review import Review
+from src.infrastructure.cache import response_cache
+from src.infrastructure.repositories.bookmark import InMemoryBookmarkRepository, get_bookmark_repository
+from src.infrastructure.repositories.like import InMemoryLikeRepository, get_like_repository
+from src.infrastructure.repositories.like_counter import (
+    InMemoryLikeCounterRepository,
+    get_like_counter_repository,
+    like_shard_policy,
+)
+from src.infrastructure.repositories.memory import InMemoryBaseRepository
+from src.infrastructure.repositories.movie_activity import (
+    InMemoryMovieActivityRepository,
+    get_movie_activity_repository,
+)
+from src.infrastructure.repositories.review import InMemoryReviewRepository, get_review_repository
+from src.infrastructure.repositories.review_stats import InMemoryReviewStatsRepository, get_review_stats_repository
+from src.infrastructure.trending import trending_cache
+from src.main import create_app
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+USER = User(sub=uuid.UUID("3fa85f67-5717-4562-b3fc-2c963f66afa6"), role=["admin"])
+HEADERS = {"Authorization": "Bearer benchmark"}
+
+Request = tuple[str, str, dict | None]
+Scenario = Callable[[int], Awaitable[Request]]
+
+
+class Fixture:
+    """Данные в памяти, на которых выполняются сценарии"""
+
+    def __init__(self, movies: int, items: int, page_size: int = 10):
+        self.likes = InMemoryLikeRepository()
+        self.bookmarks = InMemoryBookmarkRepository()
+        self.reviews = InMemoryReviewRepository()
+        self.review_stats = InMemoryReviewStatsRepository(self.reviews)
+        self.like_counters = InMemoryLikeCounterRepository(self.likes, like_shard_policy)
+        self.activity = InMemoryMovieActivityRepository()
+        self.movie_uids = [uuid.uuid4() for _ in range(movies)]
+        self.items = items
+        self.page_size = page_size
+
+    async def seed(self) -> None:
+        for movie_uid in self.movie_uids[: self.items]:
+            await self.likes.add(Like(user_uid=USER.sub, movie_uid=movie_uid))
+            await self.bookmarks.add(Bookmark(user_uid=USER.sub, movie_uid=movie_uid))
+            await self.reviews.add(Review.create(movie_uid=movie_uid, user_uid=USER.sub, rating=7, content="x" * 200))
+        for movie_uid in self.movie_uids:
+            for _ in range(self.items):
+                user_uid = uuid.uuid4()
+                await self.likes.add(Like(user_uid=user_uid, movie_uid=movie_uid))
+                await self.reviews.add(Review.create(movie_uid=movie_uid, user_uid=user_uid, rating=8, content="y"))
+        await self.review_stats.rebuild()
+        await self.like_counters.rebuild()
+        for like in list(self.likes._items.values()):
+            await self.activity.increment(like.movie_uid, hour=activity_hour(like.created_at), likes_count=1)
+        await trending_cache.refresh(self.activity)
+
+    @staticmethod
+    def own_id(repository: InMemoryBaseRepository) -> str:
+        return next(item.id for item in repository._items.values() if item.user_uid == USER.sub)
+
+    def movie(self, i: int) -> uuid.UUID:
+        return self.movie_uids[i % len(self.movie_uids)]
+
+    def scenarios(self) -> dict[str, Scenario]:
+        """Сценарии по маршрутам: функция от номера итерации возвращает метод, путь и тело запроса"""
+
+        async def create(path: str, body: Callable[[uuid.UUID], dict]) -> Request:
+            return "POST", path, body(uuid.uuid4())
+
+        async def delete(repository, path: str, item) -> Request:
+            item = await repository.add(item)
+            return "DELETE", f"{path}{item.id}", None
+
+        like_id, bookmark_id, review_id = (
+            self.own_id(self.likes),
+            self.own_id(self.bookmarks),
+            self.own_id(self.reviews),
+        )
+        return {
+            "POST /like/": lambda i: create("/api/v1/like/", lambda uid: {"movie_uid": str(uid)}),
+            "GET /like/": self._get(f"/api/v1/like/?limit={self.page_size}"),
+            "GET /like/{like_id}": self._get(f"/api/v1/like/{like_id}"),
+            "DELETE /like/{like_id}": lambda i: delete(
+                self.likes, "/api/v1/like/", Like(user_uid=USER.sub, movie_uid=uuid.uuid4())
+            ),
+            "GET /like/movies/{movie_uid}": lambda i: self._request("GET", f"/api/v1/like/movies/{self.movie(i)}"),
+            "POST /bookmark/": lambda i: create("/api/v1/bookmark/", lambda uid: {"movie_uid": str(uid)}),
+            "GET /bookmark/": self._get(f"/api/v1/bookmark/?limit={self.page_size}"),
+            "GET /bookmark/{bookmark_id}": self._get(f"/api/v1/bookmark/{bookmark_id}"),
+            "DELETE /bookmark/{bookmark_id}": lambda i: delete(
+                self.bookmarks, "/api/v1/bookmark/", Bookmark(user_uid=USER.sub, movie_uid=uuid.uuid4())
+            ),
+            "POST /review/": lambda i: create(
+                "/api/v1/review/",
+                lambda uid: {"movie_uid": str(uid), "rating": 7, "content": "x" * 200},
+            ),
+            "GET /review/movies/{movie_uid}": lambda i: self._request(
+                "GET", f"/api/v1/review/movies/{self.movie(i)}?limit={self.page_size}"
+            ),
+            "GET /review/users/{user_uid}": self._get(f"/api/v1/review/users/{USER.sub}?limit={self.page_size}"),
+            "GET /review/search": self._get(f"/api/v1/review/search?q=x&limit={self.page_size}"),
+            "GET /review/{review_id}": self._get(f"/api/v1/review/{review_id}"),
+            "PATCH /review/{review_id}": lambda i: self._request(
+                "PATCH", f"/api/v1/review/{review_id}", {"rating": i % 10 + 1}
+            ),
+            "DELETE /review/{review_id}": lambda i: delete(
+                self.reviews,
+                "/api/v1/review/",
+                Review.create(movie_uid=uuid.uuid4(), user_uid=USER.sub, rating=5, content="z"),
+            ),
+            "GET /review/movies/{movie_uid}/count": lambda i: self._request(
+                "GET", f"/api/v1/review/movies/{self.movie(i)}/count"
+            ),
+            "GET /review/movies/{movie_uid}/average": lambda i: self._request(
+                "GET", f"/api/v1/review/movies/{self.movie(i)}/average"
+            ),
+            "GET /movies/trending": self._get("/api/v1/movies/trending?window=24h&limit=20"),
+            "GET /users/me/activity": self._get(f"/api/v1/users/me/activity?limit={self.page_size}"),
+            "POST /users/me/movies:membership": lambda i: self._request(
+                "POST", "/api/v1/users/me/movies:membership", {"movie_uids": [str(uid) for uid in self.movie_uids[:50]]}
+            ),
+            "GET /users/me/export": self._get("/api/v1/users/me/export"),
+            "POST /movies/stats:batch": lambda i: self._request(
+                "POST", "/api/v1/movies/stats:batch", {"movie_uids": [str(uid) for uid in self.movie_uids[:20]]}
+            ),
+        }
+
+    @staticmethod
+    async def _request(method: str, path: str, body: dict | None = None) -> Request:
+        return method, path, body
+
+    def _get(self, path: str) -> Scenario:
+        return lambda i: self._request("GET", path)
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, scenario: Scenario, iterations: int, trace: bool = False
+) -> tuple[list[float], list[float], list[int], int]:
+    """
+    Выполняет сценарий и замеряет каждый запрос
+    :param client: HTTP-клиент с ASGI-транспортом
+    :param scenario: Сценарий маршрута
+    :param iterations: Количество запросов
+    :param trace: Замерять выделенную память вместо времени
+    :return: Длительности и процессорное время запросов в секундах, пиковые выделения памяти в байтах
+        и количество ошибок
+    """
+
+    timings, cpu_timings, allocations, errors = [], [], [], 0
+    for i in range(iterations):
+        method, path, body = await scenario(i)
+        if trace:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            response = await client.request(method, path, json=body, headers=HEADERS)
+            allocations.append(tracemalloc.get_traced_memory()[1] - baseline)
+        else:
+            start, cpu_start = time.perf_counter(), time.process_time()
+            response = await client.request(method, path, json=body, headers=HEADERS)
+            timings.append(time.perf_counter() - start)
+            cpu_timings.append(time.process_time() - cpu_start)
+        errors += response.status_code >= 400
+    return timings, cpu_timings, allocations, errors
+
+
+async def run(
+    iterations: int, movies: int, items: int, page_size: int, only: str | None
+) -> dict[str, dict[str, float]]:
+    fixture = Fixture(movies=movies, items=items, page_size=page_size)
+    await fixture.seed()
+
+    app = create_app()
+    app.dependency_overrides = {
+        get_like_repository: lambda: fixture.likes,
+        get_bookmark_repository: lambda: fixture.bookmarks,
+        get_review_repository: lambda: fixture.reviews,
+        get_review_stats_repository: lambda: fixture.review_stats,
+        get_like_counter_repository: lambda: fixture.like_counters,
+        get_movie_activity_repository: lambda: fixture.activity,
+        get_current_user: lambda: USER,
+        get_test_current_user: lambda: USER,
+    }
+
+    results = {}
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for name, scenario in fixture.scenarios().items():
+            if only and only not in name:
+                continue
+            response_cache.clear()
+            await run_scenario(client, scenario, iterations=min(iterations, 100))
+            timings, cpu_timings, _, errors = await run_scenario(client, scenario, iterations)
+
+            tracemalloc.start()
+            try:
+                _, _, allocations, _ = await run_scenario(client, scenario, iterations=min(iterations, 200), trace=True)
+            finally:
+                tracemalloc.stop()
+
+            results[name] = {
+                "rps": len(timings) / sum(timings),
+                "p50_ms": statistics.median(timings) * 1000,
+                "p99_ms": statistics.quantiles(timings, n=100)[98] * 1000,
+                "cpu_ms": statistics.mean(cpu_timings) * 1000,
+                "alloc_kib": statistics.median(allocations) / 1024,
+                "errors": errors,
+            }
+            print(format_row(name, results[name]))
+    return results
+
+
+def format_row(name: str, result: dict[str, float], baseline: dict[str, float] | None = None) -> str:
+    row = f"{name:<42} " + " ".join(f"{key}={value:>9.3f}" for key, value in result.items())
+    if baseline:
+        row += "  " + " ".join(
+            f"{key}={(value / baseline[key] - 1) * 100:+.1f}%" for key, value in result.items() if baseline.get(key)
+        )
+    return row
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000, help="Количество запросов на маршрут")
+    parser.add_argument("--movies", type=int, default=100, help="Количество фильмов в данных")
+    parser.add_argument("--items", type=int, default=20, help="Лайков и рецензий на фильм")
+    parser.add_argument("--page-size", type=int, default=10, help="Размер страницы списков (не больше --items)")
+    parser.add_argument("--route", help="Запустить только маршруты, содержащие строку")
+    parser.add_argument("--output", type=Path, help="Файл результатов (по умолчанию по текущему коммиту)")
+    parser.add_argument("--compare", type=Path, help="Файл результатов предыдущего запуска для сравнения")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.iterations, args.movies, args.items, args.page_size, args.route))
+
+    commit = current_commit()
+    output = args.output or RESULTS_DIR / f"endpoints-{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({"commit": commit, "iterations": args.iterations, "results": results}, indent=2))
+    print(f"Результаты сохранены в {output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        print(f"\nСравнение с {baseline['commit']}:")
+        for name, result in results.items():
+            print(format_row(name, result, baseline["results"].get(name)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Сравнение чтения списков через документы Beanie и напрямую через Motor (MONGO_RAW_READS).
+Нужен запущенный MongoDB из настроек; данные пишутся в отдельную базу <MONGO_DB_NAME>_benchmark.
+
+Запуск: python -m benchmarks.raw_reads --rows 1000 --limit 100 --iterations 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from src.core.config import settings
+from src.domain.review import Review
+from src.infrastructure import db
+from src.infrastructure.models import ReviewModel
+from src.infrastructure.repositories.review import ReviewRepository
+
+
+async def measure(repository: ReviewRepository, user_uid: uuid.UUID, limit: int, iterations: int) -> dict[str, float]:
+    wall, cpu = [], []
+    for _ in range(iterations):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        await repository.get_by_user_id(user_uid=user_uid, limit=limit)
+        wall.append(time.perf_counter() - wall_start)
+        cpu.append(time.process_time() - cpu_start)
+    return {
+        "wall_p50_ms": statistics.median(wall) * 1000,
+        "wall_p99_ms": statistics.quantiles(wall, n=100)[98] * 1000,
+        "cpu_mean_ms": statistics.fmean(cpu) * 1000,
+    }
+
+
+async def main(rows: int, limit: int, iterations: int) -> None:
+    db_name = f"{settings.mongo.db_name}_benchmark"
+    client = await db.init_db(db_name=db_name)
+    try:
+        user_uid = uuid.uuid4()
+        await ReviewModel.insert_many(
+            [ReviewModel(user_uid=user_uid, movie_uid=uuid.uuid4(), rating=7, content="x" * 200) for _ in range(rows)]
+        )
+
+        repositories = {
+            "beanie": ReviewRepository(model=ReviewModel, domain_model=Review),
+            "raw": ReviewRepository(model=ReviewModel, domain_model=Review, raw_reads=True),
+        }
+        for name, repository in repositories.items():
+            await measure(repository, user_uid, limit, iterations=10)
+            result = await measure(repository, user_uid, limit, iterations)
+            print(f"{name:>6}: " + ", ".join(f"{key}={value:.3f}" for key, value in result.items()))
+    finally:
+        await client.drop_database(db_name)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="Количество рецензий пользователя")
+    parser.add_argument("--limit", type=int, default=100, help="Размер страницы")
+    parser.add_argument("--iterations", type=int, default=200, help="Количество запросов на режим")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.limit, args.iterations))
@@ -0,0 +1,98 @@
+"""
+Задержка полнотекстового поиска рецензий (индекс content_text) на сгенерированном корпусе.
+Нужен запущенный MongoDB из настроек; данные пишутся в отдельную базу <MONGO_DB_NAME>_benchmark.
+
+Запуск: python -m benchmarks.review_search --rows 1000000 --iterations 200
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+
+from src.core.config import settings
+from src.domain.pagination import SearchCursor
+from src.domain.review import Review
+from src.infrastructure import db
+from src.infrastructure.encoding import encode_value
+from src.infrastructure.models import ReviewModel
+from src.infrastructure.repositories.review import ReviewRepository
+
+WORDS = (
+    "фильм сюжет актер режиссер музыка сцена финал герой история эффекты диалог оператор монтаж роль "
+    "драма комедия триллер ужасы шедевр провал скучно отлично красиво затянуто неожиданно атмосфера"
+).split()
+INSERT_BATCH_SIZE = 10000
+
+
+def generate_content(rng: random.Random) -> str:
+    # Частоты слов неравномерны, как в живом тексте: первые слова словаря встречаются заметно чаще
+    return " ".join(rng.choices(WORDS, weights=range(len(WORDS), 0, -1), k=rng.randint(10, 60)))
+
+
+async def populate(rows: int, movie_uids: list[uuid.UUID]) -> None:
+    rng = random.Random(0)
+    collection = ReviewModel.get_motor_collection()
+    for start in range(0, rows, INSERT_BATCH_SIZE):
+        reviews = [
+            Review(
+                movie_uid=rng.choice(movie_uids),
+                user_uid=uuid.uuid4(),
+                rating=rng.randint(1, 10),
+                content=generate_content(rng),
+            )
+            for _ in range(min(INSERT_BATCH_SIZE, rows - start))
+        ]
+        await collection.insert_many([encode_value(review.model_dump(exclude={"id"})) for review in reviews])
+
+
+async def measure(search, iterations: int) -> dict[str, float]:
+    wall = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await search()
+        wall.append(time.perf_counter() - start)
+    return {"p50_ms": statistics.median(wall) * 1000, "p99_ms": statistics.quantiles(wall, n=100)[98] * 1000}
+
+
+async def main(rows: int, movies: int, limit: int, iterations: int) -> None:
+    db_name = f"{settings.mongo.db_name}_benchmark"
+    client = await db.init_db(db_name=db_name)
+    try:
+        movie_uids = [uuid.uuid4() for _ in range(movies)]
+        started = time.perf_counter()
+        await populate(rows, movie_uids)
+        print(f"Корпус из {rows} рецензий загружен за {time.perf_counter() - started:.1f} с")
+
+        repository = ReviewRepository(model=ReviewModel, domain_model=Review)
+        first_page = await repository.search("сюжет", limit=limit)
+        scenarios = {
+            "частое слово": lambda: repository.search("фильм", limit=limit),
+            "редкое слово": lambda: repository.search("атмосфера", limit=limit),
+            "два слова": lambda: repository.search("шедевр финал", limit=limit),
+            "фраза": lambda: repository.search('"отлично красиво"', limit=limit),
+            "фильтр по фильму": lambda: repository.search("сюжет", limit=limit, movie_uid=movie_uids[0]),
+            "фильтр по оценке": lambda: repository.search("сюжет", limit=limit, rating_min=8, rating_max=10),
+            "вторая страница": lambda: repository.search(
+                "сюжет", limit=limit, cursor=SearchCursor.from_item(first_page[-1])
+            ),
+        }
+        for name, search in scenarios.items():
+            await measure(search, iterations=5)
+            result = await measure(search, iterations)
+            print(f"{name:>18}: " + ", ".join(f"{key}={value:.3f}" for key, value in result.items()))
+    finally:
+        await client.drop_database(db_name)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000, help="Количество рецензий в корпусе")
+    parser.add_argument("--movies", type=int, default=10000, help="Количество фильмов")
+    parser.add_argument("--limit", type=int, default=10, help="Размер страницы")
+    parser.add_argument("--iterations", type=int, default=200, help="Количество запросов на сценарий")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.movies, args.limit, args.iterations))
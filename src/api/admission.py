@@ -0,0 +1,170 @@
+import time
+from enum import StrEnum
+
+from fastapi.dependencies.models import Dependant
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import APIRoute
+from src.api.v1.depends import get_current_user, get_test_current_user
+from src.core.config import settings
+from src.infrastructure.metrics import ADMISSION_IN_FLIGHT, ADMISSION_LIMIT, ADMISSION_REQUESTS
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+UNSAFE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+AUTH_DEPENDENCIES = {get_current_user, get_test_current_user}
+
+
+class RouteClass(StrEnum):
+    WRITE = "write"
+    READ = "read"
+    PUBLIC = "public"
+
+
+def _requires_auth(dependant: Dependant) -> bool:
+    return dependant.call in AUTH_DEPENDENCIES or any(_requires_auth(sub) for sub in dependant.dependencies)
+
+
+def classify_route(route: APIRoute) -> RouteClass:
+    """
+    Класс маршрута для управления допуском: записи и чтения пользователя требуют аутентификации,
+    остальные маршруты (счетчики, средние, популярные фильмы) считаются публичными агрегатами
+    :param route: Маршрут
+    :return: Класс маршрута
+    """
+
+    if not _requires_auth(route.dependant):
+        return RouteClass.PUBLIC
+    if route.methods & UNSAFE_METHODS:
+        return RouteClass.WRITE
+    return RouteClass.READ
+
+
+class AdaptiveLimiter:
+    """
+    Адаптивный лимит одновременных запросов процесса (AIMD).
+    Пока задержка до начала ответа не превышает целевую, лимит растет примерно на единицу за каждые limit запросов,
+    при превышении - умножается на backoff (не чаще раза за целевую задержку, чтобы одна волна медленных
+    ответов не обрушила лимит). Класс маршрута допускается, пока общее число запросов меньше его доли лимита,
+    поэтому при перегрузке сначала отклоняются классы с меньшей долей.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        latency_target: float,
+        backoff: float,
+        shares: dict[RouteClass, float],
+    ):
+        self.limit = float(initial_limit)
+        self.in_flight = 0
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._latency_target = latency_target
+        self._backoff = backoff
+        self._shares = shares
+        self._decreased_at = 0.0
+        ADMISSION_LIMIT.set(self.limit)
+
+    def try_acquire(self, route_class: RouteClass) -> bool:
+        if self.in_flight >= max(1, int(self.limit * self._shares[route_class])):
+            ADMISSION_REQUESTS.labels(route_class, "shed").inc()
+            return False
+        self.in_flight += 1
+        ADMISSION_REQUESTS.labels(route_class, "admitted").inc()
+        ADMISSION_IN_FLIGHT.labels(route_class).inc()
+        return True
+
+    def release(self, route_class: RouteClass, latency: float | None) -> None:
+        """
+        Освобождает место запроса и подстраивает лимит по его задержке
+        :param route_class: Класс маршрута
+        :param latency: Задержка до начала ответа, сек. (None - ответ не начат, лимит не меняется)
+        """
+
+        in_flight = self.in_flight
+        self.in_flight -= 1
+        ADMISSION_IN_FLIGHT.labels(route_class).dec()
+        if latency is None:
+            return
+
+        now = time.monotonic()
+        if latency > self._latency_target:
+            if now - self._decreased_at >= self._latency_target:
+                self.limit = max(self._min_limit, self.limit * self._backoff)
+                self._decreased_at = now
+        elif in_flight >= self.limit / 2:
+            # Лимит растет, только пока он действительно используется, иначе он уходит в максимум без нагрузки
+            self.limit = min(self._max_limit, self.limit + 1 / self.limit)
+        ADMISSION_LIMIT.set(self.limit)
+
+
+class AdmissionMiddleware:
+    """
+    Управление допуском запросов: сверх адаптивного лимита запросы сразу отклоняются
+    с 503 и Retry-After, а не ждут соединения в пуле MongoDB вместе со всеми остальными.
+    Служебные маршруты (метрики, документация) и ненайденные пути не ограничиваются.
+    """
+
+    def __init__(self, app: ASGIApp, routes: list[BaseRoute], limiter: AdaptiveLimiter, retry_after: int):
+        self.app = app
+        self._routes = routes
+        self._limiter = limiter
+        self._retry_after = retry_after
+        self._classes: dict[str, RouteClass] = {}
+
+    def _match(self, scope: Scope) -> APIRoute | None:
+        for route in self._routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route if isinstance(route, APIRoute) and route.include_in_schema else None
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        route = self._match(scope) if scope["type"] == "http" else None
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        route_class = self._classes.get(route.unique_id)
+        if route_class is None:
+            route_class = self._classes[route.unique_id] = classify_route(route)
+
+        if not self._limiter.try_acquire(route_class):
+            scope["route"] = route
+            response = ORJSONResponse(
+                status_code=503,
+                content={"detail": "Сервис перегружен, повторите запрос позже."},
+                headers={"Retry-After": str(self._retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        latency = None
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal latency
+            if message["type"] == "http.response.start":
+                latency = time.perf_counter() - start
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self._limiter.release(route_class, latency)
+
+
+admission_limiter = AdaptiveLimiter(
+    initial_limit=settings.admission.initial_limit,
+    min_limit=settings.admission.min_limit,
+    max_limit=settings.admission.max_limit,
+    latency_target=settings.admission.latency_target_ms / 1000,
+    backoff=settings.admission.backoff,
+    shares={
+        RouteClass.WRITE: settings.admission.write_share,
+        RouteClass.READ: settings.admission.read_share,
+        RouteClass.PUBLIC: settings.admission.public_share,
+    },
+)
@@ -0,0 +1,45 @@
+import hashlib
+from collections.abc import Awaitable, Callable
+from typing import Any
+from uuid import UUID
+
+from fastapi import Request, Response, status
+from src.api.v1.serialization import dump_json
+from src.infrastructure.cache import CachedResponse, response_cache
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    return any(tag.strip() in (etag, f"W/{etag}", "*") for tag in if_none_match.split(","))
+
+
+async def cached_response(
+    request: Request,
+    movie_uid: UUID,
+    response_model: Any,
+    load: Callable[[], Awaitable[tuple[Any, dict[str, str]]]],
+) -> Response:
+    """
+    Отдает ответ публичного эндпоинта фильма из кэша со строгим ETag.
+    При совпадении If-None-Match отвечает 304, при промахе загружает ответ и сохраняет его в кэше.
+    :param request: Запрос
+    :param movie_uid: ID фильма, записи по которому сбрасывают кэш
+    :param response_model: Модель ответа для сериализации
+    :param load: Загрузка содержимого ответа и его заголовков
+    :return: Ответ
+    """
+
+    variants = response_cache.variants(movie_uid)
+    variant = (request.url.path, request.url.query)
+    cached = variants.get(variant)
+    if cached is None:
+        content, headers = await load()
+        body = dump_json(content, response_model)
+        cached = CachedResponse(body=body, etag=f'"{hashlib.sha1(body).hexdigest()}"', headers=headers)
+        variants[variant] = cached
+
+    headers = {**cached.headers, "ETag": cached.etag, "Cache-Control": f"public, max-age={response_cache.ttl}"}
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
@@ -1,4 +1,6 @@
+import hashlib
 import logging
+import time
 import uuid
 from typing import Annotated
 
@@ -6,17 +8,26 @@ from circuitbreaker import CircuitBreakerError, circuit
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 from httpx import AsyncClient, RequestError
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 from src.core.config import settings
+from src.infrastructure.cache import TTLCache
 from src.infrastructure.clients.http import get_httpx_client
+from src.infrastructure.jwks import UnknownKeyError, decode_token, jwks_key_store
+from src.infrastructure.metrics import AUTH_REQUEST_DURATION
+from src.services.activity import AbstractActivityService, get_activity_service
 from src.services.bookmark import AbstractBookmarkService, get_bookmark_service
+from src.services.export import AbstractExportService, get_export_service
 from src.services.like import AbstractLikeService, get_like_service
+from src.services.movie import AbstractMovieService, get_movie_service
 from src.services.review import AbstractReviewService, get_review_service
 
 logger = logging.getLogger(__name__)
 
+activity_serviceDep = Annotated[AbstractActivityService, Depends(get_activity_service)]
 bookmark_serviceDep = Annotated[AbstractBookmarkService, Depends(get_bookmark_service)]
+export_serviceDep = Annotated[AbstractExportService, Depends(get_export_service)]
 like_serviceDep = Annotated[AbstractLikeService, Depends(get_like_service)]
+movie_serviceDep = Annotated[AbstractMovieService, Depends(get_movie_service)]
 review_serviceDep = Annotated[AbstractReviewService, Depends(get_review_service)]
 
 oauth2_scheme = HTTPBearer()
@@ -27,29 +38,85 @@ class User(BaseModel):
     role: list[str]
 
 
+auth_cache: TTLCache[User | None] = TTLCache(maxsize=settings.auth.cache_size, ttl=settings.auth.cache_ttl, name="auth")
+
+
 async def get_test_current_user(token: Annotated[str, Depends(oauth2_scheme)]) -> User:
     print(token.credentials)
     user = User(sub=uuid.UUID("3fa85f67-5717-4562-b3fc-2c963f66afa6"), role=["admin"])
     return user
 
 
+async def get_local_user(token: str, httpx_client: AsyncClient) -> User:
+    """
+    Проверка токена без запроса в сервис аутентификации: подпись, срок действия и claims sub и role
+    :param token: Токен доступа
+    :param httpx_client: HTTP-клиент для обновления JWKS
+    :return: Пользователь
+    :raises UnknownKeyError: Токен подписан неизвестным ключом
+    :raises HTTPException: Токен недействителен
+    """
+
+    claims = await decode_token(token, jwks_key_store, httpx_client)
+    if claims is not None:
+        role = claims["role"]
+        try:
+            return User(sub=claims["sub"], role=[role] if isinstance(role, str) else role)
+        except ValidationError:
+            pass
+    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Время жизни сессии истекло.")
+
+
 @circuit(failure_threshold=5, recovery_timeout=15)
+async def fetch_current_user(token: str, httpx_client: AsyncClient) -> User | None:
+    """
+    Запрос текущего пользователя в сервисе аутентификации
+    :param token: Токен доступа
+    :param httpx_client: HTTP-клиент
+    :return: Пользователь или None, если токен недействителен
+    """
+
+    start = time.perf_counter()
+    try:
+        response = await httpx_client.get(settings.auth.service_url, headers={"Authorization": f"Bearer {token}"})
+    except RequestError:
+        AUTH_REQUEST_DURATION.labels("error").observe(time.perf_counter() - start)
+        raise
+    AUTH_REQUEST_DURATION.labels(response.status_code).observe(time.perf_counter() - start)
+
+    if response.status_code == 401:
+        return None
+    if response.status_code == 200:
+        return User(**response.json())
+    raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Сервис временно не доступен.")
+
+
 async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)], httpx_client: Annotated[AsyncClient, Depends(get_httpx_client)]
 ) -> User:
-    """Получение текущего пользователя из сервиса аутентификации"""
+    """
+    Получение текущего пользователя из сервиса аутентификации.
+    В режиме local токен проверяется локально ключами из JWKS, а сервис вызывается только для неизвестных ключей.
+    Ответы сервиса кэшируются по хэшу токена, одновременные запросы с одним токеном ожидают один запрос к сервису.
+    """
+
+    if settings.auth.mode == "local":
+        try:
+            return await get_local_user(token.credentials, httpx_client)
+        except UnknownKeyError:
+            logger.info("Токен подписан неизвестным ключом, проверка в сервисе аутентификации.")
 
+    token_hash = hashlib.sha256(token.credentials.encode()).hexdigest()
     try:
-        response = await httpx_client.get(
-            settings.auth.service_url, headers={"Authorization": f"Bearer {token.credentials}"}
+        user = await auth_cache.get_or_load(
+            token_hash,
+            lambda: fetch_current_user(token.credentials, httpx_client),
+            ttl=lambda user: settings.auth.negative_cache_ttl if user is None else None,
         )
-        if response.status_code == 401:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Время жизни сессии истекло.")
-        if response.status_code == 200:
-            return User(**response.json())
-        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Сервис временно не доступен.")
-    except CircuitBreakerError as e:
-        logger.warning(f"Circuit Breaker: сервис аутентификации временно не доступен.")
+    except HTTPException:
+        raise
+    except CircuitBreakerError:
+        logger.warning("Circuit Breaker: сервис аутентификации временно не доступен.")
         raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Сервис временно не доступен.")
     except RequestError as e:
         logger.exception(f"Ошибка при получении текущего пользователя: {e}")
@@ -57,3 +124,7 @@ async def get_current_user(
     except Exception as e:
         logger.exception(f"Неизвестная ошибка при получении текущего пользователя: {e}")
         raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Сервис временно не доступен.")
+
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Время жизни сессии истекло.")
+    return user
@@ -3,7 +3,9 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, Path, Query, status
 from src.api.v1.depends import User, bookmark_serviceDep, get_current_user, get_test_current_user
+from src.api.v1.pagination import cursorDep, next_cursor_headers
 from src.api.v1.schemas import BookmarkResponse, CreateBookmarkRequest
+from src.api.v1.serialization import orjson_response
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +22,7 @@ async def create_bookmark(
 
     print(1 / 0)
     bookmark_response = await service.create_bookmark(current_user.sub, bookmark.movie_uid)
-    return bookmark_response
+    return orjson_response(bookmark_response, BookmarkResponse, status_code=status.HTTP_201_CREATED)
 
 
 @router.get(
@@ -32,13 +34,16 @@ async def create_bookmark(
 async def get_bookmarks_by_user_id(
     bookmark_service: bookmark_serviceDep,
     current_user: Annotated[User, Depends(get_current_user)],
+    cursor: cursorDep,
     limit: int = Query(default=10, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
 ) -> list[BookmarkResponse]:
-    """Получение закладок пользователя"""
+    """Получение закладок пользователя. Курсор следующей страницы возвращается в заголовке X-Next-Cursor"""
 
-    bookmarks = await bookmark_service.get_bookmarks_by_user_id(user_uid=current_user.sub, limit=limit, offset=offset)
-    return bookmarks
+    bookmarks = await bookmark_service.get_bookmarks_by_user_id(
+        user_uid=current_user.sub, limit=limit, offset=offset, cursor=cursor
+    )
+    return orjson_response(bookmarks, list[BookmarkResponse], headers=next_cursor_headers(bookmarks, limit))
 
 
 @router.get(
@@ -55,7 +60,7 @@ async def get_bookmark_by_id(
     """Получение закладки по ID"""
 
     bookmark = await bookmark_service.get_bookmark_by_id(bookmark_id=bookmark_id, user_uid=current_user.sub)
-    return bookmark
+    return orjson_response(bookmark, BookmarkResponse)
 
 
 @router.delete("/{bookmark_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Удаление закладки по ID")
@@ -1,9 +1,12 @@
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Path, Query, status
+from fastapi import APIRouter, Depends, Path, Query, Request, status
+from src.api.v1.caching import cached_response
 from src.api.v1.depends import User, get_test_current_user, like_serviceDep
+from src.api.v1.pagination import cursorDep, next_cursor_headers
 from src.api.v1.schemas import CreateLikeRequest, LikeCountResponse, LikeResponse
+from src.api.v1.serialization import orjson_response
 
 router = APIRouter(prefix="/like", tags=["Like"])
 
@@ -15,7 +18,7 @@ async def create_like(
     """Создать лайк."""
 
     like_response = await service.create_like(current_user.sub, like.movie_uid)
-    return like_response
+    return orjson_response(like_response, LikeResponse, status_code=status.HTTP_201_CREATED)
 
 
 @router.get(
@@ -24,13 +27,16 @@ async def create_like(
 async def get_likes_by_user_id(
     like_service: like_serviceDep,
     current_user: Annotated[User, Depends(get_test_current_user)],
+    cursor: cursorDep,
     limit: int = Query(default=10, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
 ) -> list[LikeResponse]:
-    """Получить лайки пользователя."""
+    """Получить лайки пользователя. Курсор следующей страницы возвращается в заголовке X-Next-Cursor."""
 
-    likes = await like_service.get_likes_by_user_id(user_uid=current_user.sub, limit=limit, offset=offset)
-    return likes
+    likes = await like_service.get_likes_by_user_id(
+        user_uid=current_user.sub, limit=limit, offset=offset, cursor=cursor
+    )
+    return orjson_response(likes, list[LikeResponse], headers=next_cursor_headers(likes, limit))
 
 
 @router.get(
@@ -47,7 +53,7 @@ async def get_like_by_id(
     """Получить лайк по ID."""
 
     like = await like_service.get_like_by_id(like_id=like_id, user_uid=current_user.sub)
-    return like
+    return orjson_response(like, LikeResponse)
 
 
 @router.delete("/{like_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Удалить лайк по ID")
@@ -69,10 +75,14 @@ async def delete_like(
     status_code=status.HTTP_200_OK,
 )
 async def get_likes_count_by_movie_id(
+    request: Request,
     like_service: like_serviceDep,
     movie_uid: UUID = Path(..., description="ID фильма"),
 ) -> LikeCountResponse:
     """Получить лайки по ID фильма."""
 
-    likes_count = await like_service.get_likes_count_by_movie_id(movie_uid=movie_uid)
-    return LikeCountResponse(count=likes_count, movie_uid=movie_uid)
+    async def load():
+        likes_count = await like_service.get_likes_count_by_movie_id(movie_uid=movie_uid)
+        return LikeCountResponse(count=likes_count, movie_uid=movie_uid), {}
+
+    return await cached_response(request, movie_uid, LikeCountResponse, load)
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Query, status
+from src.api.v1.depends import movie_serviceDep
+from src.api.v1.schemas import MoviesStatsBatchRequest, MovieStatsResponse, TrendingMovieResponse
+from src.api.v1.serialization import orjson_response
+from src.core.config import settings
+from src.domain.movie import TrendingWindow
+
+router = APIRouter(prefix="/movies", tags=["Movies"])
+
+
+@router.post(
+    "/stats:batch",
+    response_model=list[MovieStatsResponse],
+    summary="Получить статистику по списку фильмов",
+    status_code=status.HTTP_200_OK,
+)
+async def get_movies_stats(
+    request: MoviesStatsBatchRequest, movie_service: movie_serviceDep
+) -> list[MovieStatsResponse]:
+    """Получить количество лайков, рецензий и средний рейтинг для списка фильмов."""
+
+    movies_stats = await movie_service.get_movies_stats(movie_uids=request.movie_uids)
+    return orjson_response(movies_stats, list[MovieStatsResponse])
+
+
+@router.get(
+    "/trending",
+    response_model=list[TrendingMovieResponse],
+    summary="Получить популярные фильмы",
+    status_code=status.HTTP_200_OK,
+)
+async def get_trending_movies(
+    movie_service: movie_serviceDep,
+    window: TrendingWindow = Query(default=TrendingWindow.DAY, description="Окно: 1h, 24h или 7d"),
+    limit: int = Query(default=20, ge=1, le=settings.trending.size),
+) -> list[TrendingMovieResponse]:
+    """Получить фильмы с наибольшим количеством лайков и рецензий за окно. Списки пересчитываются в фоне."""
+
+    trending = await movie_service.get_trending(window=window, limit=limit)
+    headers = {"Cache-Control": f"public, max-age={settings.trending.refresh_interval}"}
+    return orjson_response(trending, list[TrendingMovieResponse], headers=headers)
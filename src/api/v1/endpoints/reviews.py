@@ -1,15 +1,21 @@
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Path, Query, status
+from fastapi import APIRouter, Depends, Path, Query, Request, status
+from src.api.v1.caching import cached_response
 from src.api.v1.depends import User, get_test_current_user, review_serviceDep
+from src.api.v1.pagination import cursorDep, next_cursor_headers, searchCursorDep
 from src.api.v1.schemas import (
     CreateReviewRequest,
     ReviewAverageResponse,
     ReviewCountResponse,
     ReviewResponse,
+    ReviewSearchResponse,
     UpdateReviewRequest,
 )
+from src.api.v1.serialization import orjson_response
+from src.domain.pagination import SearchCursor
+from src.domain.review import ReviewSort
 
 router = APIRouter(prefix="/review", tags=["Review"])
 
@@ -25,7 +31,7 @@ async def create_review(
     review_response = await review_service.create_review(
         current_user.sub, review.movie_uid, review.rating, review.content
     )
-    return review_response
+    return orjson_response(review_response, ReviewResponse, status_code=status.HTTP_201_CREATED)
 
 
 @router.get(
@@ -35,15 +41,23 @@ async def create_review(
     status_code=status.HTTP_200_OK,
 )
 async def get_reviews_by_movie_id(
+    request: Request,
     review_service: review_serviceDep,
+    cursor: cursorDep,
     movie_uid: UUID = Path(..., description="ID фильма"),
+    sort: ReviewSort = Query(default=ReviewSort.NEWEST, description="Порядок рецензий"),
     limit: int = Query(default=10, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
 ) -> list[ReviewResponse]:
-    """Получить рецензии по ID фильма."""
+    """Получить рецензии по ID фильма. Курсор следующей страницы возвращается в заголовке X-Next-Cursor."""
 
-    reviews = await review_service.get_reviews_by_movie_id(movie_uid=movie_uid, limit=limit, offset=offset)
-    return reviews
+    async def load():
+        reviews = await review_service.get_reviews_by_movie_id(
+            movie_uid=movie_uid, limit=limit, offset=offset, cursor=cursor, sort=sort
+        )
+        return reviews, next_cursor_headers(reviews, limit)
+
+    return await cached_response(request, movie_uid, list[ReviewResponse], load)
 
 
 @router.get(
@@ -54,14 +68,42 @@ async def get_reviews_by_movie_id(
 )
 async def get_reviews_by_user_id(
     review_service: review_serviceDep,
+    cursor: cursorDep,
     user_uid: UUID = Path(..., description="ID пользователя"),
+    sort: ReviewSort = Query(default=ReviewSort.NEWEST, description="Порядок рецензий"),
     limit: int = Query(default=10, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
 ) -> list[ReviewResponse]:
-    """Получить рецензии по ID пользователя."""
+    """Получить рецензии по ID пользователя. Курсор следующей страницы возвращается в заголовке X-Next-Cursor."""
 
-    reviews = await review_service.get_reviews_by_user_id(user_uid=user_uid, limit=limit, offset=offset)
-    return reviews
+    reviews = await review_service.get_reviews_by_user_id(
+        user_uid=user_uid, limit=limit, offset=offset, cursor=cursor, sort=sort
+    )
+    return orjson_response(reviews, list[ReviewResponse], headers=next_cursor_headers(reviews, limit))
+
+
+@router.get(
+    "/search",
+    response_model=list[ReviewSearchResponse],
+    summary="Поиск рецензий по тексту",
+    status_code=status.HTTP_200_OK,
+)
+async def search_reviews(
+    review_service: review_serviceDep,
+    cursor: searchCursorDep,
+    q: str = Query(..., min_length=1, max_length=200, description="Поисковый запрос"),
+    movie_uid: UUID | None = Query(default=None, description="ID фильма"),
+    rating_min: int | None = Query(default=None, ge=1, le=10, description="Минимальная оценка"),
+    rating_max: int | None = Query(default=None, ge=1, le=10, description="Максимальная оценка"),
+    limit: int = Query(default=10, ge=1, le=100),
+) -> list[ReviewSearchResponse]:
+    """Поиск рецензий по тексту по убыванию релевантности. Курсор следующей страницы - в заголовке X-Next-Cursor."""
+
+    reviews = await review_service.search_reviews(
+        query=q, limit=limit, movie_uid=movie_uid, rating_min=rating_min, rating_max=rating_max, cursor=cursor
+    )
+    headers = next_cursor_headers(reviews, limit, cursor_class=SearchCursor)
+    return orjson_response(reviews, list[ReviewSearchResponse], headers=headers)
 
 
 @router.get(
@@ -74,7 +116,7 @@ async def get_review_by_id(
     """Получить рецензию по ID."""
 
     review = await review_service.get_review_by_id(review_id=review_id)
-    return review
+    return orjson_response(review, ReviewResponse)
 
 
 @router.patch(
@@ -91,7 +133,7 @@ async def update_review(
     review_response = await review_service.update_review(
         review_id=review_id, user_uid=current_user.sub, rating=review.rating, content=review.content
     )
-    return review_response
+    return orjson_response(review_response, ReviewResponse)
 
 
 @router.delete("/{review_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Удалить рецензию по ID")
@@ -113,13 +155,17 @@ async def delete_review(
     status_code=status.HTTP_200_OK,
 )
 async def get_reviews_count_by_movie_id(
+    request: Request,
     review_service: review_serviceDep,
     movie_uid: UUID = Path(..., description="ID фильма"),
 ) -> ReviewCountResponse:
     """Получить количество рецензий по ID фильма."""
 
-    reviews_count = await review_service.get_reviews_count_by_movie_id(movie_uid=movie_uid)
-    return ReviewCountResponse(count=reviews_count, movie_uid=movie_uid)
+    async def load():
+        reviews_count = await review_service.get_reviews_count_by_movie_id(movie_uid=movie_uid)
+        return ReviewCountResponse(count=reviews_count, movie_uid=movie_uid), {}
+
+    return await cached_response(request, movie_uid, ReviewCountResponse, load)
 
 
 @router.get(
@@ -129,10 +175,14 @@ async def get_reviews_count_by_movie_id(
     status_code=status.HTTP_200_OK,
 )
 async def get_reviews_average_by_movie_id(
+    request: Request,
     review_service: review_serviceDep,
     movie_uid: UUID = Path(..., description="ID фильма"),
 ) -> ReviewAverageResponse:
     """Получить средний рейтинг по ID фильма."""
 
-    reviews_average = await review_service.get_reviews_average_by_movie_id(movie_uid=movie_uid)
-    return ReviewAverageResponse(average=reviews_average, movie_uid=movie_uid)
+    async def load():
+        reviews_average = await review_service.get_reviews_average_by_movie_id(movie_uid=movie_uid)
+        return ReviewAverageResponse(average=reviews_average, movie_uid=movie_uid), {}
+
+    return await cached_response(request, movie_uid, ReviewAverageResponse, load)
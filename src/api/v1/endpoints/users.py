@@ -0,0 +1,66 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
+from src.api.v1.depends import User, activity_serviceDep, export_serviceDep, get_current_user
+from src.api.v1.pagination import cursorDep, next_cursor_headers
+from src.api.v1.schemas import ActivityResponse, MovieMembershipResponse, MoviesMembershipRequest
+from src.api.v1.serialization import orjson_response
+
+router = APIRouter(prefix="/users", tags=["Users"])
+
+
+@router.get(
+    "/me/activity",
+    response_model=list[ActivityResponse],
+    summary="Лента активности пользователя",
+    status_code=status.HTTP_200_OK,
+)
+async def get_user_activity(
+    activity_service: activity_serviceDep,
+    current_user: Annotated[User, Depends(get_current_user)],
+    cursor: cursorDep,
+    limit: int = Query(default=20, ge=1, le=100),
+) -> list[ActivityResponse]:
+    """
+    Лайки, закладки и рецензии пользователя одной лентой, новые первыми.
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor
+    """
+
+    activity = await activity_service.get_user_activity(user_uid=current_user.sub, limit=limit, cursor=cursor)
+    return orjson_response(activity, list[ActivityResponse], headers=next_cursor_headers(activity, limit))
+
+
+@router.post(
+    "/me/movies:membership",
+    response_model=list[MovieMembershipResponse],
+    summary="Лайки, закладки и рецензии пользователя для списка фильмов",
+    status_code=status.HTTP_200_OK,
+)
+async def get_movies_membership(
+    request: MoviesMembershipRequest,
+    activity_service: activity_serviceDep,
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> list[MovieMembershipResponse]:
+    """Для каждого фильма из списка: поставил ли пользователь лайк, добавил закладку и написал рецензию."""
+
+    membership = await activity_service.get_movies_membership(user_uid=current_user.sub, movie_uids=request.movie_uids)
+    return orjson_response(membership, list[MovieMembershipResponse])
+
+
+@router.get(
+    "/me/export",
+    response_class=StreamingResponse,
+    summary="Выгрузить активность пользователя",
+    status_code=status.HTTP_200_OK,
+)
+async def export_user_activity(
+    export_service: export_serviceDep, current_user: Annotated[User, Depends(get_current_user)]
+) -> StreamingResponse:
+    """Выгрузить все лайки, закладки и рецензии пользователя потоком NDJSON (одна строка - один документ)."""
+
+    return StreamingResponse(
+        export_service.export_user_activity(user_uid=current_user.sub),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="activity-{current_user.sub}.ndjson"'},
+    )
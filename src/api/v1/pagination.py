@@ -0,0 +1,42 @@
+from typing import Annotated
+
+from fastapi import Depends, HTTPException, Query, status
+from src.domain.base import TimestampMixin
+from src.domain.pagination import BaseCursor, Cursor, SearchCursor
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def get_cursor(
+    cursor: str | None = Query(default=None, description="Курсор страницы из заголовка X-Next-Cursor"),
+) -> Cursor | None:
+    return _decode_cursor(Cursor, cursor)
+
+
+def get_search_cursor(
+    cursor: str | None = Query(default=None, description="Курсор страницы из заголовка X-Next-Cursor"),
+) -> SearchCursor | None:
+    return _decode_cursor(SearchCursor, cursor)
+
+
+def _decode_cursor(cursor_class: type[BaseCursor], cursor: str | None) -> BaseCursor | None:
+    if cursor is None:
+        return None
+    try:
+        return cursor_class.decode(cursor)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Некорректный курсор.")
+
+
+cursorDep = Annotated[Cursor | None, Depends(get_cursor)]
+searchCursorDep = Annotated[SearchCursor | None, Depends(get_search_cursor)]
+
+
+def next_cursor_headers(
+    items: list[TimestampMixin], limit: int, cursor_class: type[BaseCursor] = Cursor
+) -> dict[str, str]:
+    """Заголовок с курсором следующей страницы, если страница заполнена полностью"""
+
+    if items and len(items) == limit:
+        return {NEXT_CURSOR_HEADER: cursor_class.from_item(items[-1]).encode()}
+    return {}
@@ -1,7 +1,9 @@
 from fastapi import APIRouter
 from src.api.v1.endpoints.bookmark import router as bookmarks_router
 from src.api.v1.endpoints.like import router as likes_router
+from src.api.v1.endpoints.movies import router as movies_router
 from src.api.v1.endpoints.reviews import router as reviews_router
+from src.api.v1.endpoints.users import router as users_router
 
 router = APIRouter(prefix="/v1")
 
@@ -9,3 +11,5 @@ router = APIRouter(prefix="/v1")
 router.include_router(likes_router)
 router.include_router(reviews_router)
 router.include_router(bookmarks_router)
+router.include_router(movies_router)
+router.include_router(users_router)
@@ -1,6 +1,8 @@
+from datetime import datetime
 from uuid import UUID
 
 from pydantic import BaseModel, Field
+from src.domain.activity import ActivityType
 
 
 class CreateBookmarkRequest(BaseModel):
@@ -42,6 +44,10 @@ class ReviewResponse(BaseModel):
     content: str = Field(..., description="Контент", min_length=1, max_length=1000)
 
 
+class ReviewSearchResponse(ReviewResponse):
+    score: float = Field(..., description="Релевантность")
+
+
 class ReviewCountResponse(BaseModel):
     count: int = Field(..., description="Количество рецензий")
     movie_uid: UUID = Field(..., description="ID фильма")
@@ -55,3 +61,41 @@ class ReviewAverageResponse(BaseModel):
 class UpdateReviewRequest(BaseModel):
     rating: int | None = Field(default=None, description="Рейтинг", ge=1, le=10)
     content: str | None = Field(default=None, description="Контент", min_length=1, max_length=1000)
+
+
+class MoviesStatsBatchRequest(BaseModel):
+    movie_uids: list[UUID] = Field(..., description="ID фильмов", min_length=1, max_length=100)
+
+
+class MoviesMembershipRequest(BaseModel):
+    movie_uids: list[UUID] = Field(..., description="ID фильмов", min_length=1, max_length=100)
+
+
+class MovieMembershipResponse(BaseModel):
+    movie_uid: UUID = Field(..., description="ID фильма")
+    liked: bool = Field(..., description="Пользователь поставил лайк")
+    bookmarked: bool = Field(..., description="Фильм в закладках пользователя")
+    reviewed: bool = Field(..., description="Пользователь написал рецензию")
+
+
+class TrendingMovieResponse(BaseModel):
+    movie_uid: UUID = Field(..., description="ID фильма")
+    likes_count: int = Field(..., description="Количество лайков за окно")
+    reviews_count: int = Field(..., description="Количество рецензий за окно")
+
+
+class MovieStatsResponse(BaseModel):
+    movie_uid: UUID = Field(..., description="ID фильма")
+    likes_count: int = Field(..., description="Количество лайков")
+    reviews_count: int = Field(..., description="Количество рецензий")
+    average: float | None = Field(default=None, description="Средний рейтинг")
+
+
+class ActivityResponse(BaseModel):
+    type: ActivityType = Field(..., description="Тип действия")
+    id: str = Field(..., description="ID документа")
+    movie_uid: UUID = Field(..., description="ID фильма")
+    user_uid: UUID = Field(..., description="ID пользователя")
+    created_at: datetime = Field(..., description="Дата создания документа")
+    rating: int | None = Field(default=None, description="Рейтинг (для рецензий)")
+    content: str | None = Field(default=None, description="Контент (для рецензий)")
@@ -0,0 +1,60 @@
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, get_args, get_origin
+
+import orjson
+from fastapi import status
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+@lru_cache
+def response_fields(response_model: type[BaseModel]) -> tuple[str, ...]:
+    return tuple(response_model.model_fields)
+
+
+def to_content(content: Any, response_model: Any) -> Any:
+    """
+    Отбирает из доменных объектов (или словарей документов) поля модели ответа без повторной валидации.
+    Значения уже проверены доменной моделью при чтении из репозитория, поэтому передаются orjson как есть.
+    :param content: Доменный объект, словарь или их список
+    :param response_model: Модель ответа или list[модель ответа]
+    :return: Словарь или список словарей для сериализации orjson
+    """
+
+    if get_origin(response_model) is not list:
+        return to_content([content], list[response_model])[0]
+
+    (item_model,) = get_args(response_model)
+    fields = response_fields(item_model)
+    return [
+        (
+            {name: item[name] for name in fields}
+            if isinstance(item, Mapping)
+            else {name: getattr(item, name) for name in fields}
+        )
+        for item in content
+    ]
+
+
+def dump_json(content: Any, response_model: Any) -> bytes:
+    return orjson.dumps(to_content(content, response_model))
+
+
+def orjson_response(
+    content: Any,
+    response_model: Any,
+    status_code: int = status.HTTP_200_OK,
+    headers: dict[str, str] | None = None,
+) -> ORJSONResponse:
+    """
+    Ответ, сериализованный напрямую из доменных объектов, минуя валидацию response_model в FastAPI.
+    response_model эндпоинта при этом по-прежнему описывает ответ в OpenAPI.
+    :param content: Доменный объект, словарь или их список
+    :param response_model: Модель ответа или list[модель ответа]
+    :param status_code: Код ответа
+    :param headers: Заголовки ответа
+    :return: Ответ
+    """
+
+    return ORJSONResponse(content=to_content(content, response_model), status_code=status_code, headers=headers)
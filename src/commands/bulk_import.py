@@ -0,0 +1,219 @@
+"""
+Пакетная загрузка лайков, закладок и рецензий из NDJSON или CSV (например, при переносе из старой системы).
+Строки читаются потоком и проверяются доменными моделями, невалидные строки пропускаются с записью в лог.
+Документы пишутся неупорядоченным insert_many несколькими параллельными обработчиками.
+Дубликаты (user_uid, movie_uid) пропускаются по уникальному индексу, поэтому повторный запуск безопасен.
+После каждой пачки в файл контрольной точки записывается количество строк, обработанных без пропусков,
+и при повторном запуске чтение продолжается с этого места.
+После загрузки рецензий статистику нужно пересчитать: python -m src.commands.rebuild_review_stats,
+после загрузки лайков - счетчики: python -m src.commands.rebuild_like_counters
+
+Запуск: python -m src.commands.bulk_import review reviews.ndjson --workers 8 --batch-size 1000
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+from beanie import Document
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pydantic import BaseModel, ValidationError
+from pymongo.errors import BulkWriteError
+from src.domain.bookmark import Bookmark
+from src.domain.like import Like
+from src.domain.review import Review
+from src.infrastructure import db
+from src.infrastructure.encoding import encode_value
+from src.infrastructure.models import BookmarkModel, LikeModel, ReviewModel
+
+logger = logging.getLogger(__name__)
+
+MODELS: dict[str, tuple[type[Document], type[BaseModel]]] = {
+    "like": (LikeModel, Like),
+    "bookmark": (BookmarkModel, Bookmark),
+    "review": (ReviewModel, Review),
+}
+DUPLICATE_KEY_ERROR = 11000
+REPORT_INTERVAL = 5.0
+
+Batch = tuple[int, int, list[dict]]
+
+
+def read_rows(path: Path, file_format: str) -> Iterator[str | dict]:
+    """
+    Читает строки файла по одной
+    :param path: Путь к файлу
+    :param file_format: Формат файла: ndjson или csv (пустые значения CSV заменяются значениями по умолчанию)
+    :return: Итератор строк: JSON-строки для NDJSON, словари для CSV
+    """
+
+    with path.open(newline="", encoding="utf-8") as file:
+        if file_format == "csv":
+            for row in csv.DictReader(file):
+                yield {key: value for key, value in row.items() if value != ""}
+            return
+        for line in file:
+            if line.strip():
+                yield line
+
+
+class Checkpoint:
+    """
+    Контрольная точка загрузки: количество строк от начала файла, все пачки которых записаны.
+    Пачки завершаются в произвольном порядке, поэтому граница сдвигается только по непрерывному префиксу.
+    """
+
+    def __init__(self, path: Path, source: Path):
+        self._path = path
+        self._source = str(source)
+        self._completed: dict[int, int] = {}
+        self.rows = 0
+        if path.exists():
+            state = json.loads(path.read_text())
+            if state["source"] == self._source:
+                self.rows = state["rows"]
+
+    def complete(self, first_row: int, end_row: int) -> None:
+        self._completed[first_row] = end_row
+        if self.rows not in self._completed:
+            return
+        while self.rows in self._completed:
+            self.rows = self._completed.pop(self.rows)
+        temporary = self._path.with_suffix(".tmp")
+        temporary.write_text(json.dumps({"source": self._source, "rows": self.rows}))
+        os.replace(temporary, self._path)
+
+
+class ImportStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.read = 0
+        self.invalid = 0
+        self.inserted = 0
+        self.duplicates = 0
+
+    def report(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        return (
+            f"прочитано {self.read}, записано {self.inserted}, дубликатов {self.duplicates}, "
+            f"невалидных {self.invalid}, {self.read / elapsed:.0f} строк/с, {self.inserted / elapsed:.0f} записей/с"
+        )
+
+
+async def insert_batch(collection: AsyncIOMotorCollection, documents: list[dict]) -> tuple[int, int]:
+    """
+    Записывает пачку документов без остановки на ошибках
+    :param collection: Коллекция
+    :param documents: Документы
+    :return: Количество записанных документов и дубликатов
+    :raises BulkWriteError: Ошибки записи, отличные от дубликатов
+    """
+
+    try:
+        result = await collection.insert_many(documents, ordered=False)
+        return len(result.inserted_ids), 0
+    except BulkWriteError as e:
+        errors = e.details["writeErrors"]
+        if any(error["code"] != DUPLICATE_KEY_ERROR for error in errors):
+            raise
+        return e.details["nInserted"], len(errors)
+
+
+async def worker(
+    collection: AsyncIOMotorCollection, queue: asyncio.Queue[Batch | None], checkpoint: Checkpoint, stats: ImportStats
+) -> None:
+    while (batch := await queue.get()) is not None:
+        first_row, end_row, documents = batch
+        if documents:
+            inserted, duplicates = await insert_batch(collection, documents)
+            stats.inserted += inserted
+            stats.duplicates += duplicates
+        checkpoint.complete(first_row, end_row)
+
+
+async def produce(
+    rows: Iterator[str | dict],
+    domain_model: type[BaseModel],
+    queue: asyncio.Queue[Batch | None],
+    start_row: int,
+    batch_size: int,
+    stats: ImportStats,
+) -> None:
+    first_row, documents = start_row, []
+    for row_number, row in enumerate(rows):
+        if row_number < start_row:
+            continue
+        stats.read += 1
+        try:
+            item = domain_model.model_validate_json(row) if isinstance(row, str) else domain_model.model_validate(row)
+        except ValidationError as e:
+            stats.invalid += 1
+            logger.warning(f"Строка {row_number + 1} пропущена: {e.errors(include_url=False)}")
+        else:
+            documents.append({"_id": ObjectId(), **encode_value(item.model_dump(exclude={"id"}))})
+        if row_number + 1 - first_row >= batch_size:
+            await queue.put((first_row, row_number + 1, documents))
+            first_row, documents = row_number + 1, []
+    if stats.read:
+        await queue.put((first_row, start_row + stats.read, documents))
+
+
+async def report(stats: ImportStats) -> None:
+    while True:
+        await asyncio.sleep(REPORT_INTERVAL)
+        logger.info(stats.report())
+
+
+async def main(
+    collection_name: str, path: Path, file_format: str, workers: int, batch_size: int, checkpoint_path: Path
+) -> None:
+    model, domain_model = MODELS[collection_name]
+    checkpoint = Checkpoint(checkpoint_path, source=path)
+    if checkpoint.rows:
+        logger.info(f"Продолжение загрузки со строки {checkpoint.rows + 1} по контрольной точке {checkpoint_path}.")
+
+    client = await db.init_db()
+    stats = ImportStats()
+    queue: asyncio.Queue[Batch | None] = asyncio.Queue(maxsize=workers * 2)
+    reporter = asyncio.create_task(report(stats))
+    try:
+        async with asyncio.TaskGroup() as group:
+            for _ in range(workers):
+                group.create_task(worker(model.get_motor_collection(), queue, checkpoint, stats))
+            await produce(read_rows(path, file_format), domain_model, queue, checkpoint.rows, batch_size, stats)
+            for _ in range(workers):
+                await queue.put(None)
+    finally:
+        reporter.cancel()
+        client.close()
+    logger.info(f"Загрузка завершена: {stats.report()}.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("collection", choices=MODELS, help="Коллекция для загрузки")
+    parser.add_argument("path", type=Path, help="Файл NDJSON или CSV")
+    parser.add_argument("--format", choices=["ndjson", "csv"], help="Формат файла (по умолчанию по расширению)")
+    parser.add_argument("--workers", type=int, default=4, help="Количество параллельных обработчиков записи")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Количество строк в пачке insert_many")
+    parser.add_argument("--checkpoint", type=Path, help="Файл контрольной точки (по умолчанию <path>.checkpoint)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(
+        main(
+            collection_name=args.collection,
+            path=args.path,
+            file_format=args.format or ("csv" if args.path.suffix == ".csv" else "ndjson"),
+            workers=args.workers,
+            batch_size=args.batch_size,
+            checkpoint_path=args.checkpoint or args.path.with_name(f"{args.path.name}.checkpoint"),
+        )
+    )
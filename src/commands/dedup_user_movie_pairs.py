@@ -0,0 +1,81 @@
+"""
+Удаление дубликатов (user_uid, movie_uid) в коллекциях лайков, закладок и рецензий.
+Уникальный индекс user_uid_movie_uid создается при запуске приложения (init_beanie) и не создается,
+если в коллекции уже есть дубликаты, поэтому команду нужно выполнить до первого развертывания индексов.
+Из каждой группы дубликатов остается самый ранний документ (created_at, _id), остальные удаляются.
+Команда подключается к MongoDB без инициализации моделей Beanie, чтобы не создавать индексы до очистки.
+После удаления дубликатов рецензий статистику нужно пересчитать: python -m src.commands.rebuild_review_stats,
+лайков - счетчики: python -m src.commands.rebuild_like_counters
+
+Запуск: python -m src.commands.dedup_user_movie_pairs [--dry-run] [--collection like ...]
+"""
+
+import argparse
+import asyncio
+import logging
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+from src.core.config import settings
+from src.infrastructure.models import BookmarkModel, LikeModel, ReviewModel
+
+logger = logging.getLogger(__name__)
+
+COLLECTIONS = {
+    "like": LikeModel.Settings.name,
+    "bookmark": BookmarkModel.Settings.name,
+    "review": ReviewModel.Settings.name,
+}
+DELETE_BATCH_SIZE = 1000
+
+
+async def dedup(collection: AsyncIOMotorCollection, dry_run: bool) -> tuple[int, int]:
+    """
+    Удаляет дубликаты пар (user_uid, movie_uid) коллекции, оставляя самый ранний документ группы
+    :param collection: Коллекция MongoDB
+    :param dry_run: Только подсчитать дубликаты, ничего не удаляя
+    :return: Количество групп дубликатов и количество удаленных (при dry_run - лишних) документов
+    """
+
+    pipeline = [
+        {"$sort": {"created_at": 1, "_id": 1}},
+        {"$group": {"_id": {"user_uid": "$user_uid", "movie_uid": "$movie_uid"}, "ids": {"$push": "$_id"}}},
+        {"$match": {"ids.1": {"$exists": True}}},
+        {"$project": {"_id": 0, "duplicates": {"$slice": ["$ids", 1, {"$size": "$ids"}]}}},
+    ]
+    groups, duplicates, batch = 0, 0, []
+    async for group in collection.aggregate(pipeline, allowDiskUse=True):
+        groups += 1
+        duplicates += len(group["duplicates"])
+        if dry_run:
+            continue
+        batch.extend(group["duplicates"])
+        if len(batch) >= DELETE_BATCH_SIZE:
+            await collection.delete_many({"_id": {"$in": batch}})
+            batch = []
+    if batch:
+        await collection.delete_many({"_id": {"$in": batch}})
+    return groups, duplicates
+
+
+async def main(kinds: list[str], dry_run: bool) -> None:
+    client = AsyncIOMotorClient(settings.mongo.connection_url, **settings.mongo.client_options)
+    try:
+        database = client[settings.mongo.db_name]
+        for kind in kinds:
+            groups, duplicates = await dedup(database[COLLECTIONS[kind]], dry_run)
+            action = "найдено" if dry_run else "удалено"
+            logger.info(f"{COLLECTIONS[kind]}: {groups} пар с дубликатами, {action} {duplicates} лишних документов")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--collection", action="append", choices=list(COLLECTIONS), help="Коллекция (по умолчанию все), можно повторять"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Только подсчитать дубликаты")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(args.collection or list(COLLECTIONS), args.dry_run))
@@ -0,0 +1,51 @@
+"""
+Пересчет распределенных счетчиков лайков (коллекция movie_like_counters) из коллекции лайков
+или, с флагом --verify, только сверка сумм долей счетчиков с количеством лайков каждого фильма.
+Пересчет нужен при первом развертывании счетчиков, после пакетной загрузки лайков и при расхождениях.
+При сверке с расхождениями команда завершается с кодом 1.
+
+Запуск: python -m src.commands.rebuild_like_counters [--verify]
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+
+from src.infrastructure import db
+from src.infrastructure.repositories.like_counter import get_like_counter_repository
+
+logger = logging.getLogger(__name__)
+
+REPORTED_MISMATCHES = 20
+
+
+async def main(verify: bool) -> bool:
+    client = await db.init_db()
+    try:
+        repository = get_like_counter_repository()
+        if not verify:
+            movies_count = await repository.rebuild()
+            logger.info(f"Счетчики лайков пересчитаны для {movies_count} фильмов.")
+            return True
+
+        mismatches = await repository.verify()
+    finally:
+        client.close()
+
+    for movie_uid, (counted, actual) in list(mismatches.items())[:REPORTED_MISMATCHES]:
+        logger.error(f"Фильм {movie_uid}: счетчик {counted}, лайков {actual}")
+    if mismatches:
+        logger.error(f"Счетчики расходятся с количеством лайков у {len(mismatches)} фильмов.")
+    else:
+        logger.info("Счетчики лайков совпадают с количеством лайков.")
+    return not mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verify", action="store_true", help="Только сверить счетчики с количеством лайков")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(0 if asyncio.run(main(args.verify)) else 1)
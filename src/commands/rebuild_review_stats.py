@@ -0,0 +1,28 @@
+"""
+Пересчет статистики рецензий по фильмам (коллекция movie_review_stats) из коллекции рецензий.
+Используется для исправления расхождений счетчиков.
+
+Запуск: python -m src.commands.rebuild_review_stats
+"""
+
+import asyncio
+import logging
+
+from src.infrastructure import db
+from src.infrastructure.repositories.review_stats import get_review_stats_repository
+
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    client = await db.init_db()
+    try:
+        movies_count = await get_review_stats_repository().rebuild()
+        logger.info(f"Статистика рецензий пересчитана для {movies_count} фильмов.")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
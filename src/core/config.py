@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import Field, SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -12,11 +14,13 @@ class ProjectSettings(ModelConfig):
     title: Название проекта (по умолчанию User activity service)
     decription: Описание проекта (по умолчанию "")
     debug: Флаг для включения режима отладки (по умолчанию False)
+    workers: Количество процессов приложения, как у uvicorn --workers (по умолчанию 1)
     """
 
     title: str = Field("User activity service", validation_alias="PROJECT_TITLE")
     decription: str = Field("", validation_alias="PROJECT_DESCRIPTION")
     debug: bool = Field(False, validation_alias="DEBUG")
+    workers: int = Field(1, ge=1, validation_alias="WEB_CONCURRENCY")
 
 
 class MongoSettings(ModelConfig):
@@ -27,6 +31,18 @@ class MongoSettings(ModelConfig):
     username: Имя пользователя MongoDB (по умолчанию None)
     password: Пароль MongoDB (по умолчанию None)
     db_name: Имя базы данных MongoDB (по умолчанию None)
+    raw_reads: Читать документы напрямую через Motor, без создания документов Beanie (по умолчанию False)
+    uri: Строка подключения MongoDB, заменяет хост, порт и учетные данные (по умолчанию None)
+    replica_set: Имя набора реплик (по умолчанию None)
+    max_pool_size: Максимальный размер пула соединений (по умолчанию 100)
+    min_pool_size: Минимальный размер пула соединений (по умолчанию 0)
+    compressors: Сжатие протокола через запятую, например zstd,snappy,zlib (по умолчанию None)
+    read_preference: Предпочтение чтения для счетчиков, средних и списков (по умолчанию primary)
+    max_staleness: Максимальное отставание вторичного узла для этих чтений, сек., не меньше 90 (по умолчанию None)
+    causal_consistency: Причинно-согласованные сессии: пользователь читает свои записи сразу после записи
+    (по умолчанию False)
+    causal_token_ttl: Время хранения времени последней записи пользователя, сек. (по умолчанию 60)
+    causal_cache_size: Максимальное количество пользователей с сохраненным временем записи (по умолчанию 100000)
     """
 
     host: str = Field("127.0.0.1", validation_alias="MONGO_HOST")
@@ -34,9 +50,33 @@ class MongoSettings(ModelConfig):
     username: str | None = Field(None, validation_alias="MONGO_USERNAME")
     password: SecretStr | None = Field(None, validation_alias="MONGO_PASSWORD")
     db_name: str = Field(..., validation_alias="MONGO_DB_NAME")
+    raw_reads: bool = Field(False, validation_alias="MONGO_RAW_READS")
+    uri: str | None = Field(None, validation_alias="MONGO_URI")
+    replica_set: str | None = Field(None, validation_alias="MONGO_REPLICA_SET")
+    max_pool_size: int = Field(100, validation_alias="MONGO_MAX_POOL_SIZE")
+    min_pool_size: int = Field(0, validation_alias="MONGO_MIN_POOL_SIZE")
+    compressors: str | None = Field(None, validation_alias="MONGO_COMPRESSORS")
+    read_preference: Literal["primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest"] = Field(
+        "primary", validation_alias="MONGO_READ_PREFERENCE"
+    )
+    max_staleness: int | None = Field(None, ge=90, validation_alias="MONGO_MAX_STALENESS_SECONDS")
+    causal_consistency: bool = Field(False, validation_alias="MONGO_CAUSAL_CONSISTENCY")
+    causal_token_ttl: float = Field(60.0, validation_alias="MONGO_CAUSAL_TOKEN_TTL")
+    causal_cache_size: int = Field(100000, validation_alias="MONGO_CAUSAL_CACHE_SIZE")
+
+    @property
+    def client_options(self) -> dict:
+        options = {"maxPoolSize": self.max_pool_size, "minPoolSize": self.min_pool_size}
+        if self.replica_set:
+            options["replicaSet"] = self.replica_set
+        if self.compressors:
+            options["compressors"] = self.compressors
+        return options
 
     @property
     def connection_url(self):
+        if self.uri:
+            return self.uri
         if self.username and self.password:
             pwd = self.password.get_secret_value()
             return f"mongodb://{self.username}:{pwd}@{self.host}:{self.port}"
@@ -48,10 +88,142 @@ class AuthSettings(ModelConfig):
     Настройки для сервиса авторизации
     auth_service_url: Ссылка на сервис авторизации (по умолчанию None)
     auth_token: Токен для авторизации (по умолчанию None)
+    cache_size: Максимальное количество токенов в кэше пользователей (по умолчанию 10000)
+    cache_ttl: Время жизни пользователя в кэше, сек. (по умолчанию 60)
+    negative_cache_ttl: Время жизни недействительного токена в кэше, сек. (по умолчанию 5)
+    mode: Проверка токенов: remote - запросом в сервис авторизации, local - проверкой подписи JWT
+        ключами из JWKS (сервис авторизации вызывается только для неизвестных ключей) (по умолчанию remote)
+    jwks_url: Ссылка на JWKS с ключами подписи токенов (по умолчанию None)
+    jwks_refresh_interval: Период обновления JWKS, сек. (по умолчанию 300)
+    jwt_algorithms: Допустимые алгоритмы подписи через запятую (по умолчанию RS256)
+    jwt_issuer: Ожидаемый издатель токена, claim iss (по умолчанию None - не проверяется)
+    jwt_audience: Ожидаемая аудитория токена, claim aud (по умолчанию None - не проверяется)
+    jwt_leeway: Допустимое расхождение часов при проверке exp и nbf, сек. (по умолчанию 10)
     """
 
     service_url: str | None = Field(None, validation_alias="AUTH_SERVICE_URL")
     token: str | None = Field(None, validation_alias="AUTH_TOKEN")
+    cache_size: int = Field(10000, validation_alias="AUTH_CACHE_SIZE")
+    cache_ttl: float = Field(60.0, validation_alias="AUTH_CACHE_TTL")
+    negative_cache_ttl: float = Field(5.0, validation_alias="AUTH_NEGATIVE_CACHE_TTL")
+    mode: Literal["remote", "local"] = Field("remote", validation_alias="AUTH_MODE")
+    jwks_url: str | None = Field(None, validation_alias="AUTH_JWKS_URL")
+    jwks_refresh_interval: float = Field(300.0, validation_alias="AUTH_JWKS_REFRESH_INTERVAL")
+    jwt_algorithms: str = Field("RS256", validation_alias="AUTH_JWT_ALGORITHMS")
+    jwt_issuer: str | None = Field(None, validation_alias="AUTH_JWT_ISSUER")
+    jwt_audience: str | None = Field(None, validation_alias="AUTH_JWT_AUDIENCE")
+    jwt_leeway: float = Field(10.0, validation_alias="AUTH_JWT_LEEWAY")
+
+
+class ResponseCacheSettings(ModelConfig):
+    """
+    Настройки кэша ответов публичных эндпоинтов фильмов
+    size: Максимальное количество фильмов в кэше (по умолчанию 10000)
+    ttl: Время жизни ответа в кэше и max-age для клиентов, сек. (по умолчанию 5)
+    """
+
+    size: int = Field(10000, validation_alias="RESPONSE_CACHE_SIZE")
+    ttl: int = Field(5, validation_alias="RESPONSE_CACHE_TTL")
+
+
+class TrendingSettings(ModelConfig):
+    """
+    Настройки популярных фильмов
+    size: Количество фильмов в списке каждого окна (по умолчанию 100)
+    refresh_interval: Период пересчета списков и max-age для клиентов, сек. (по умолчанию 60)
+    """
+
+    size: int = Field(100, validation_alias="TRENDING_SIZE")
+    refresh_interval: int = Field(60, validation_alias="TRENDING_REFRESH_INTERVAL")
+
+
+class CacheInvalidationSettings(ModelConfig):
+    """
+    Настройки сброса кэшей процесса по потокам изменений MongoDB (требуется набор реплик)
+    enabled: Следить за изменениями коллекций like, bookmark и review (по умолчанию False)
+    retry_delay: Пауза перед переподключением после ошибки, сек. (по умолчанию 1)
+    """
+
+    enabled: bool = Field(False, validation_alias="CACHE_INVALIDATION_ENABLED")
+    retry_delay: float = Field(1.0, validation_alias="CACHE_INVALIDATION_RETRY_DELAY")
+
+
+class AdmissionSettings(ModelConfig):
+    """
+    Настройки управления допуском запросов (отклонение с 503 сверх адаптивного лимита)
+    enabled: Включить управление допуском (по умолчанию False)
+    initial_limit: Начальный лимит одновременных запросов процесса (по умолчанию 100)
+    min_limit: Минимальный лимит (по умолчанию 10)
+    max_limit: Максимальный лимит (по умолчанию 1000)
+    latency_target_ms: Целевая задержка до начала ответа, выше которой лимит снижается, мс (по умолчанию 250)
+    backoff: Множитель снижения лимита (по умолчанию 0.9)
+    write_share: Доля лимита, до которой допускаются записи (по умолчанию 1.0 - записи отклоняются последними)
+    read_share: Доля лимита для чтений пользователя (по умолчанию 0.9)
+    public_share: Доля лимита для публичных агрегатов (по умолчанию 0.8)
+    retry_after: Значение заголовка Retry-After отклоненных запросов, сек. (по умолчанию 1)
+    """
+
+    enabled: bool = Field(False, validation_alias="ADMISSION_ENABLED")
+    initial_limit: int = Field(100, ge=1, validation_alias="ADMISSION_INITIAL_LIMIT")
+    min_limit: int = Field(10, ge=1, validation_alias="ADMISSION_MIN_LIMIT")
+    max_limit: int = Field(1000, ge=1, validation_alias="ADMISSION_MAX_LIMIT")
+    latency_target_ms: float = Field(250.0, gt=0, validation_alias="ADMISSION_LATENCY_TARGET_MS")
+    backoff: float = Field(0.9, gt=0, lt=1, validation_alias="ADMISSION_BACKOFF")
+    write_share: float = Field(1.0, gt=0, le=1, validation_alias="ADMISSION_WRITE_SHARE")
+    read_share: float = Field(0.9, gt=0, le=1, validation_alias="ADMISSION_READ_SHARE")
+    public_share: float = Field(0.8, gt=0, le=1, validation_alias="ADMISSION_PUBLIC_SHARE")
+    retry_after: int = Field(1, ge=0, validation_alias="ADMISSION_RETRY_AFTER")
+
+
+class WriteBehindSettings(ModelConfig):
+    """
+    Настройки отложенной пакетной записи лайков и закладок и изменений счетчиков лайков и активности
+    enabled: Включить отложенную запись (по умолчанию False)
+    batch_size: Максимальное количество документов в одной пакетной записи (по умолчанию 500)
+    flush_interval_ms: Максимальное время ожидания пакета, мс (по умолчанию 20)
+    """
+
+    enabled: bool = Field(False, validation_alias="WRITE_BEHIND_ENABLED")
+    batch_size: int = Field(500, validation_alias="WRITE_BEHIND_BATCH_SIZE")
+    flush_interval_ms: int = Field(20, validation_alias="WRITE_BEHIND_FLUSH_INTERVAL_MS")
+
+
+class LikeCounterSettings(ModelConfig):
+    """
+    Настройки распределенных счетчиков лайков (несколько документов-долей на фильм)
+    hot_writes_per_second: Частота изменений счетчика фильма в процессе, выше которой число долей удваивается
+    (по умолчанию 20)
+    max_shards: Максимальное число долей счетчика фильма (по умолчанию 64)
+    window: Окно измерения частоты изменений, сек. (по умолчанию 1)
+    cooldown: Время, в течение которого число долей не уменьшается после последнего увеличения, сек. (по умолчанию 300)
+    tracked_movies: Максимальное количество фильмов, частота изменений которых отслеживается (по умолчанию 10000)
+    """
+
+    hot_writes_per_second: float = Field(20.0, gt=0, validation_alias="LIKE_COUNTER_HOT_WRITES_PER_SECOND")
+    max_shards: int = Field(64, ge=1, validation_alias="LIKE_COUNTER_MAX_SHARDS")
+    window: float = Field(1.0, gt=0, validation_alias="LIKE_COUNTER_WINDOW")
+    cooldown: float = Field(300.0, ge=0, validation_alias="LIKE_COUNTER_COOLDOWN")
+    tracked_movies: int = Field(10000, ge=1, validation_alias="LIKE_COUNTER_TRACKED_MOVIES")
+
+
+class BloomFilterSettings(ModelConfig):
+    """
+    Настройки фильтров Блума пар (user_uid, movie_uid) лайков, закладок и рецензий
+    enabled: Проверять пары по фильтру перед запросом документов пользователя для фильмов; работает только
+        в одном процессе (WEB_CONCURRENCY=1) с потоками изменений (CACHE_INVALIDATION_ENABLED) (по умолчанию False)
+    capacity: Минимальная емкость фильтра коллекции, пар (по умолчанию 1000000)
+    error_rate: Допустимая доля ложноположительных ответов при полной емкости (по умолчанию 0.01)
+    max_memory_mb: Ограничение памяти фильтра коллекции, МиБ (по умолчанию 64)
+    rebuild_interval: Период перестройки фильтра, удаляющей из него удаленные пары, сек. (по умолчанию 3600)
+    batch_size: Размер пачки курсора при загрузке фильтра (по умолчанию 10000)
+    """
+
+    enabled: bool = Field(False, validation_alias="BLOOM_FILTER_ENABLED")
+    capacity: int = Field(1_000_000, ge=1, validation_alias="BLOOM_FILTER_CAPACITY")
+    error_rate: float = Field(0.01, gt=0, lt=1, validation_alias="BLOOM_FILTER_ERROR_RATE")
+    max_memory_mb: int = Field(64, ge=1, validation_alias="BLOOM_FILTER_MAX_MEMORY_MB")
+    rebuild_interval: float = Field(3600.0, gt=0, validation_alias="BLOOM_FILTER_REBUILD_INTERVAL")
+    batch_size: int = Field(10000, ge=1, validation_alias="BLOOM_FILTER_BATCH_SIZE")
 
 
 class SentrySettings(ModelConfig):
@@ -68,6 +240,13 @@ class Settings(BaseSettings):
     proect: ProjectSettings = ProjectSettings()
     auth: AuthSettings = AuthSettings()
     sentry: SentrySettings = SentrySettings()
+    write_behind: WriteBehindSettings = WriteBehindSettings()
+    response_cache: ResponseCacheSettings = ResponseCacheSettings()
+    trending: TrendingSettings = TrendingSettings()
+    cache_invalidation: CacheInvalidationSettings = CacheInvalidationSettings()
+    admission: AdmissionSettings = AdmissionSettings()
+    bloom_filter: BloomFilterSettings = BloomFilterSettings()
+    like_counter: LikeCounterSettings = LikeCounterSettings()
 
 
 settings = Settings()
@@ -0,0 +1,19 @@
+from enum import StrEnum
+from uuid import UUID
+
+from pydantic import Field
+from src.domain.base import TimestampMixin
+
+
+class ActivityType(StrEnum):
+    LIKE = "like"
+    BOOKMARK = "bookmark"
+    REVIEW = "review"
+
+
+class Activity(TimestampMixin):
+    type: ActivityType = Field(..., description="Тип действия")
+    movie_uid: UUID = Field(..., description="ID фильма")
+    user_uid: UUID = Field(..., description="ID пользователя")
+    rating: int | None = Field(default=None, description="Оценка (для рецензий)")
+    content: str | None = Field(default=None, description="Тело рецензии (для рецензий)")
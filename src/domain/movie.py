@@ -0,0 +1,50 @@
+from datetime import UTC, datetime, timedelta
+from enum import StrEnum
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class MovieStats(BaseModel):
+    movie_uid: UUID = Field(..., description="ID фильма")
+    likes_count: int = Field(default=0, description="Количество лайков")
+    reviews_count: int = Field(default=0, description="Количество рецензий")
+    average: float | None = Field(default=None, description="Средний рейтинг")
+
+
+class MovieMembership(BaseModel):
+    movie_uid: UUID = Field(..., description="ID фильма")
+    liked: bool = Field(default=False, description="Пользователь поставил лайк")
+    bookmarked: bool = Field(default=False, description="Фильм в закладках пользователя")
+    reviewed: bool = Field(default=False, description="Пользователь написал рецензию")
+
+
+class TrendingWindow(StrEnum):
+    HOUR = "1h"
+    DAY = "24h"
+    WEEK = "7d"
+
+    @property
+    def duration(self) -> timedelta:
+        return {"1h": timedelta(hours=1), "24h": timedelta(days=1), "7d": timedelta(days=7)}[self.value]
+
+
+class TrendingMovie(BaseModel):
+    movie_uid: UUID = Field(..., description="ID фильма")
+    likes_count: int = Field(default=0, description="Количество лайков за окно")
+    reviews_count: int = Field(default=0, description="Количество рецензий за окно")
+
+    @property
+    def score(self) -> int:
+        return self.likes_count + self.reviews_count
+
+
+def activity_hour(moment: datetime) -> datetime:
+    """
+    Начало часа (UTC), в счетчик которого попадает событие. Часы счетчиков хранятся в UTC, так как с ними
+    сравнивает TTL-индекс hour_ttl.
+    :param moment: Время события (без часового пояса - местное время)
+    :return: Начало часа в UTC
+    """
+
+    return moment.astimezone(UTC).replace(minute=0, second=0, microsecond=0)
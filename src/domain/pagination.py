@@ -0,0 +1,47 @@
+import base64
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+from src.domain.base import TimestampMixin
+from src.domain.review import ScoredReview
+
+
+class BaseCursor(BaseModel):
+    """Курсор keyset-пагинации, передаваемый клиенту в виде строки"""
+
+    def encode(self) -> str:
+        return base64.urlsafe_b64encode(self.model_dump_json(exclude_none=True).encode()).decode()
+
+    @classmethod
+    def decode(cls, value: str) -> "BaseCursor":
+        """
+        Восстанавливает курсор из строки
+        :param value: Закодированный курсор
+        :return: Курсор
+        :raises ValueError: Некорректный курсор
+        """
+
+        return cls.model_validate_json(base64.urlsafe_b64decode(value.encode()))
+
+
+class Cursor(BaseCursor):
+    """Курсор keyset-пагинации: ключи сортировки последнего документа страницы"""
+
+    id: str = Field(..., pattern=r"^[0-9a-f]{24}$", description="ID документа")
+    created_at: datetime = Field(..., description="Дата создания документа")
+    rating: int | None = Field(default=None, description="Оценка (для сортировки рецензий по оценке)")
+
+    @classmethod
+    def from_item(cls, item: TimestampMixin) -> "Cursor":
+        return cls(id=item.id, created_at=item.created_at, rating=getattr(item, "rating", None))
+
+
+class SearchCursor(BaseCursor):
+    """Курсор полнотекстового поиска: релевантность и ID последнего документа страницы"""
+
+    id: str = Field(..., pattern=r"^[0-9a-f]{24}$", description="ID документа")
+    score: float = Field(..., description="Релевантность документа")
+
+    @classmethod
+    def from_item(cls, item: ScoredReview) -> "SearchCursor":
+        return cls(id=item.id, score=item.score)
@@ -1,6 +1,7 @@
+from enum import StrEnum
 from uuid import UUID
 
-from pydantic import Field
+from pydantic import BaseModel, ConfigDict, Field
 from src.domain.base import TimestampMixin
 
 
@@ -13,3 +14,32 @@ class Review(TimestampMixin):
     @classmethod
     def create(cls, movie_uid: UUID, user_uid: UUID, rating: int, content: str) -> "Review":
         return cls(movie_uid=movie_uid, user_uid=user_uid, rating=rating, content=content.strip())
+
+
+class ReviewSort(StrEnum):
+    RATING_DESC = "rating_desc"
+    RATING_ASC = "rating_asc"
+    NEWEST = "newest"
+    OLDEST = "oldest"
+
+    @property
+    def by_rating(self) -> bool:
+        return self in (ReviewSort.RATING_DESC, ReviewSort.RATING_ASC)
+
+
+class ScoredReview(Review):
+    score: float = Field(..., description="Релевантность рецензии поисковому запросу")
+
+
+class ReviewStats(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    movie_uid: UUID = Field(..., description="ID фильма")
+    reviews_count: int = Field(default=0, description="Количество рецензий")
+    rating_sum: int = Field(default=0, description="Сумма оценок")
+
+    @property
+    def average(self) -> float | None:
+        if self.reviews_count <= 0:
+            return None
+        return self.rating_sum / self.reviews_count
@@ -0,0 +1,256 @@
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from collections.abc import Callable
+from functools import partial
+from uuid import UUID
+
+from beanie import Document
+from motor.motor_asyncio import AsyncIOMotorCollection
+from src.infrastructure.cache import InvalidationEvent, cache_registry
+from src.infrastructure.encoding import decode_uuid
+from src.infrastructure.metrics import BLOOM_FILTER_BYTES, BLOOM_FILTER_CHECKS, BLOOM_FILTER_ERROR_RATE
+
+logger = logging.getLogger(__name__)
+
+USER_MOVIE_INDEX = "user_uid_movie_uid"
+# Запас емкости: до следующей перестройки коллекция может вырасти, а с заполнением растет доля ложных ответов
+CAPACITY_HEADROOM = 2
+# Операции, после которых добавленные пары могли быть пропущены (в том числе потеря истории потока изменений)
+RESET_OPERATIONS = {"invalidate", "dropDatabase"}
+
+
+class BloomFilter:
+    """
+    Фильтр Блума над байтовыми ключами. Отсутствие ключа в фильтре означает, что ключ не добавлялся;
+    присутствие - что ключ, возможно, добавлялся (ложноположительный ответ с вероятностью error_rate).
+    Позиции битов вычисляются двойным хешированием одного дайджеста BLAKE2b.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, max_bytes: int | None = None):
+        """
+        :param capacity: Ожидаемое количество ключей
+        :param error_rate: Допустимая доля ложноположительных ответов при capacity ключах
+        :param max_bytes: Ограничение памяти: при превышении фильтр уменьшается ценой большей доли ложных ответов
+        """
+
+        size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        if max_bytes is not None:
+            size = min(size, max_bytes * 8)
+        self._bits = bytearray((size + 7) // 8)
+        self._size = len(self._bits) * 8
+        self._hashes = max(1, round(self._size / capacity * math.log(2)))
+        self._set_bits = 0
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+    @property
+    def error_rate(self) -> float:
+        """Текущая вероятность ложноположительного ответа по доле установленных битов"""
+
+        return (self._set_bits / self._size) ** self._hashes
+
+    def _positions(self, key: bytes) -> list[int]:
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self._size for i in range(self._hashes)]
+
+    def add(self, key: bytes) -> None:
+        for position in self._positions(key):
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not self._bits[byte] & mask:
+                self._bits[byte] |= mask
+                self._set_bits += 1
+
+    def __contains__(self, key: bytes) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class MembershipFilter:
+    """
+    Фильтр пар (user_uid, movie_uid) коллекции: позволяет не запрашивать MongoDB о документе пользователя
+    для фильма, если пары точно нет. Пока фильтр не загружен, все пары считаются возможными.
+    Пары добавляются при записи через репозиторий и по событиям потока изменений (записи других процессов,
+    например пакетной загрузки). Удаленные пары остаются в фильтре до периодической перестройки,
+    что дает только лишние запросы.
+    Ответу "пары нет" можно верить, только если фильтр видит все записи: поток изменений коллекции открыт
+    без пропусков с момента, не позже начала построения фильтра. Иначе (потока нет, история потеряна,
+    поток открыт заново после построения) все пары считаются возможными и запрос идет по индексу,
+    а фильтр перестраивается. Запись другого процесса приложения попадает в фильтр с задержкой потока,
+    поэтому фильтры включаются только при развертывании в один процесс.
+    """
+
+    def __init__(
+        self,
+        collection: AsyncIOMotorCollection,
+        capacity: int,
+        error_rate: float,
+        max_bytes: int,
+        rebuild_interval: float,
+        batch_size: int,
+        watching_since: Callable[[], float | None],
+    ):
+        """
+        :param collection: Коллекция
+        :param capacity: Минимальная емкость фильтра, пар
+        :param error_rate: Допустимая доля ложноположительных ответов
+        :param max_bytes: Ограничение памяти фильтра
+        :param rebuild_interval: Период перестройки, сек.
+        :param batch_size: Размер пачки курсора при построении
+        :param watching_since: Время, с которого поток изменений коллекции доставляет все события, или None
+        """
+
+        self._collection = collection
+        self._capacity = capacity
+        self._error_rate = error_rate
+        self._max_bytes = max_bytes
+        self._rebuild_interval = rebuild_interval
+        self._batch_size = batch_size
+        self._watching_since = watching_since
+        self._filter: BloomFilter | None = None
+        self._building: BloomFilter | None = None
+        self._built_at = 0.0
+        self._rebuild_requested = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self._filter is not None
+
+    def stats(self) -> dict[str, float]:
+        if self._filter is None:
+            return {"ready": False}
+        return {"ready": True, "bytes": self._filter.nbytes, "error_rate": self._filter.error_rate}
+
+    def add(self, user_uid: UUID, movie_uid: UUID) -> None:
+        # Во время перестройки пара пишется и в новый фильтр: сканирование коллекции могло ее уже пройти
+        key = user_uid.bytes + movie_uid.bytes
+        for bloom in (self._filter, self._building):
+            if bloom is not None:
+                bloom.add(key)
+
+    def might_contain(self, user_uid: UUID, movie_uid: UUID) -> bool:
+        """
+        Проверяет, может ли в коллекции быть документ пары
+        :param user_uid: ID пользователя
+        :param movie_uid: ID фильма
+        :return: False - документа точно нет, True - документ возможен и нужен запрос
+        """
+
+        if self._filter is None:
+            return True
+        watching_since = self._watching_since()
+        if watching_since is None or watching_since > self._built_at:
+            # Записи других процессов могли пройти мимо фильтра
+            BLOOM_FILTER_CHECKS.labels(self._collection.name, "bypass").inc()
+            if watching_since is not None:
+                self._rebuild_requested.set()
+            return True
+        result = user_uid.bytes + movie_uid.bytes in self._filter
+        BLOOM_FILTER_CHECKS.labels(self._collection.name, "maybe" if result else "miss").inc()
+        return result
+
+    def on_change(self, event: InvalidationEvent) -> None:
+        if event.operation in RESET_OPERATIONS:
+            self._filter = None
+            self._rebuild_requested.set()
+        elif event.operation in ("insert", "replace") and event.user_uid and event.movie_uid:
+            self.add(event.user_uid, event.movie_uid)
+
+    async def rebuild(self) -> None:
+        """
+        Строит новый фильтр покрытым индексом user_uid_movie_uid сканированием коллекции и заменяет им текущий.
+        Емкость берется с запасом CAPACITY_HEADROOM от текущего размера коллекции, но не меньше настроенной.
+        """
+
+        start, started_at = time.perf_counter(), time.monotonic()
+        count = await self._collection.estimated_document_count()
+        capacity = max(self._capacity, count * CAPACITY_HEADROOM)
+        self._building = BloomFilter(capacity=capacity, error_rate=self._error_rate, max_bytes=self._max_bytes)
+        try:
+            raw_cursor = self._collection.find({}, {"_id": 0, "user_uid": 1, "movie_uid": 1}).hint(USER_MOVIE_INDEX)
+            async for raw in raw_cursor.batch_size(self._batch_size):
+                self._building.add(decode_uuid(raw["user_uid"]).bytes + decode_uuid(raw["movie_uid"]).bytes)
+            self._filter, self._built_at = self._building, started_at
+        finally:
+            self._building = None
+
+        logger.info(
+            f"Фильтр Блума {self._collection.name} перестроен за {time.perf_counter() - start:.1f} с: "
+            f"{count} документов, {self._filter.nbytes / 2**20:.1f} МиБ, "
+            f"доля ложных ответов {self._filter.error_rate:.4f}"
+        )
+
+    def start(self) -> None:
+        name = self._collection.name
+        BLOOM_FILTER_BYTES.labels(name).set_function(lambda: self._filter.nbytes if self._filter else 0)
+        BLOOM_FILTER_ERROR_RATE.labels(name).set_function(lambda: self._filter.error_rate if self._filter else 1.0)
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._filter = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.rebuild()
+            except Exception as e:
+                logger.exception(f"Ошибка при перестройке фильтра Блума {self._collection.name}: {e}")
+            try:
+                await asyncio.wait_for(self._rebuild_requested.wait(), timeout=self._rebuild_interval)
+            except TimeoutError:
+                pass
+            self._rebuild_requested.clear()
+
+
+filters: dict[str, MembershipFilter] = {}
+
+
+def get_filter(model: type[Document]) -> MembershipFilter | None:
+    return filters.get(model.get_settings().name)
+
+
+def start_filters(
+    models: list[type[Document]],
+    capacity: int,
+    error_rate: float,
+    max_bytes: int,
+    rebuild_interval: float,
+    batch_size: int,
+    watching_since: Callable[[str], float | None],
+) -> None:
+    for model in models:
+        name = model.get_settings().name
+        membership_filter = MembershipFilter(
+            model.get_motor_collection(),
+            capacity=capacity,
+            error_rate=error_rate,
+            max_bytes=max_bytes,
+            rebuild_interval=rebuild_interval,
+            batch_size=batch_size,
+            watching_since=partial(watching_since, name),
+        )
+        membership_filter.start()
+        filters[name] = membership_filter
+
+
+async def close_filters() -> None:
+    for name, membership_filter in list(filters.items()):
+        logger.info(f"Фильтр Блума {name} остановлен: {membership_filter.stats()}")
+        await membership_filter.close()
+        del filters[name]
+
+
+@cache_registry.register
+def on_change(event: InvalidationEvent) -> None:
+    membership_filter = filters.get(event.collection)
+    if membership_filter is not None:
+        membership_filter.on_change(event)
@@ -0,0 +1,222 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, NamedTuple, TypeVar
+from uuid import UUID
+
+from src.core.config import settings
+from src.infrastructure.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """
+    LRU-кэш в памяти процесса с ограничением размера и временем жизни записей.
+    Одновременные загрузки одного ключа через get_or_load объединяются в один запрос.
+    Кэш с именем name учитывает попадания, промахи и объединенные загрузки в метрике cache_requests.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, name: str | None = None):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._name = name
+        self._data: OrderedDict[Hashable, tuple[float, V]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": self.hit_ratio,
+        }
+
+    def _lookup(self, key: Hashable) -> tuple[bool, V | None]:
+        entry = self._data.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return False, None
+        self._data.move_to_end(key)
+        return True, value
+
+    def _count(self, result: str) -> None:
+        setattr(self, result, getattr(self, result) + 1)
+        if self._name is not None:
+            CACHE_REQUESTS.labels(self._name, result).inc()
+
+    def get(self, key: Hashable, default: V | None = None) -> V | None:
+        found, value = self._lookup(key)
+        if found:
+            self._count("hits")
+            return value
+        self._count("misses")
+        return default
+
+    def set(self, key: Hashable, value: V, ttl: float | None = None) -> None:
+        """
+        Сохраняет значение в кэше, вытесняя самые давно использованные записи
+        :param key: Ключ
+        :param value: Значение
+        :param ttl: Время жизни записи в секундах (по умолчанию - ttl кэша)
+        """
+
+        self._data[key] = (time.monotonic() + (self._ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[V]],
+        ttl: Callable[[V], float | None] | None = None,
+    ) -> V:
+        """
+        Возвращает значение из кэша, а при промахе загружает его. Пока загрузка ключа не завершена,
+        остальные запросы того же ключа ожидают ее результата. Ошибки загрузки не кэшируются.
+        :param key: Ключ
+        :param loader: Функция загрузки значения
+        :param ttl: Функция, возвращающая время жизни для загруженного значения (None - ttl кэша)
+        :return: Значение
+        """
+
+        found, value = self._lookup(key)
+        if found:
+            self._count("hits")
+            return value
+        self._count("misses")
+
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._load(key, loader, ttl))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self._count("coalesced")
+        return await asyncio.shield(future)
+
+    async def _load(
+        self, key: Hashable, loader: Callable[[], Awaitable[V]], ttl: Callable[[V], float | None] | None
+    ) -> V:
+        value = await loader()
+        self.set(key, value, ttl(value) if ttl else None)
+        return value
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    headers: dict[str, str]
+
+
+class ResponseCache:
+    """
+    Кэш сериализованных ответов публичных эндпоинтов фильма.
+    Варианты ответов (путь и параметры запроса) хранятся вместе под ID фильма,
+    поэтому любая запись по фильму сбрасывает их все одной операцией.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, max_variants: int = 64):
+        self.ttl = ttl
+        self._movies: TTLCache[dict[Hashable, CachedResponse]] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._max_variants = max_variants
+
+    def stats(self) -> dict[str, float]:
+        return self._movies.stats()
+
+    def variants(self, movie_uid: UUID) -> dict[Hashable, CachedResponse]:
+        """
+        Возвращает варианты ответов фильма. Ответ, загруженный после сброса кэша фильма,
+        записывается в уже исключенный из кэша словарь и не переживает сброс.
+        :param movie_uid: ID фильма
+        :return: Варианты ответов по ключу запроса
+        """
+
+        variants = self._movies.get(movie_uid)
+        if variants is None or len(variants) >= self._max_variants:
+            variants = {}
+            self._movies.set(movie_uid, variants)
+        return variants
+
+    def invalidate(self, movie_uid: UUID) -> None:
+        self._movies.pop(movie_uid)
+
+    def clear(self) -> None:
+        self._movies.clear()
+
+    def on_change(self, event: "InvalidationEvent") -> None:
+        if event.collection not in ("like", "review"):
+            return
+        if event.movie_uid is None:
+            self.clear()
+        else:
+            self.invalidate(event.movie_uid)
+
+
+class InvalidationEvent(NamedTuple):
+    """
+    Изменение документа коллекции, полученное из потока изменений MongoDB.
+    movie_uid и user_uid равны None, если документ неизвестен (например, коллекция удалена
+    или пропущена часть истории): подписчики должны сбросить все записи коллекции.
+    """
+
+    collection: str
+    operation: str
+    movie_uid: UUID | None = None
+    user_uid: UUID | None = None
+
+
+InvalidationHandler = Callable[[InvalidationEvent], None]
+
+
+class CacheRegistry:
+    """
+    Реестр кэшей процесса, получающих события об изменении документов.
+    Обработчики вызываются синхронно в цикле событий и должны только сбрасывать записи.
+    """
+
+    def __init__(self):
+        self._handlers: list[InvalidationHandler] = []
+
+    def register(self, handler: InvalidationHandler) -> InvalidationHandler:
+        self._handlers.append(handler)
+        return handler
+
+    def publish(self, event: InvalidationEvent) -> None:
+        for handler in self._handlers:
+            try:
+                handler(event)
+            except Exception as e:
+                logger.exception(f"Ошибка при сбросе кэша по событию {event}: {e}")
+
+
+response_cache = ResponseCache(maxsize=settings.response_cache.size, ttl=settings.response_cache.ttl)
+
+cache_registry = CacheRegistry()
+cache_registry.register(response_cache.on_change)
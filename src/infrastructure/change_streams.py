@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import time
+from datetime import UTC, datetime
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import OperationFailure, PyMongoError
+from src.core.config import settings
+from src.infrastructure.cache import CacheRegistry, InvalidationEvent, cache_registry
+from src.infrastructure.encoding import decode_document
+from src.infrastructure.metrics import CHANGE_STREAM_EVENTS, CHANGE_STREAM_LAG
+
+logger = logging.getLogger(__name__)
+
+WATCHED_OPERATIONS = ["insert", "update", "replace", "delete", "drop", "rename", "dropDatabase", "invalidate"]
+# Операции, после которых документы коллекции неизвестны и кэши сбрасываются целиком
+COLLECTION_OPERATIONS = {"drop", "rename", "dropDatabase", "invalidate"}
+
+NOT_REPLICA_SET = 40573
+CHANGE_STREAM_HISTORY_LOST = 286
+CHANGE_STREAM_FATAL_ERROR = 280
+
+
+def to_event(name: str, change: dict) -> InvalidationEvent:
+    """
+    Преобразует событие потока изменений в событие сброса кэшей.
+    Для удалений документ берется из предварительного образа (changeStreamPreAndPostImages).
+    :param name: Имя коллекции
+    :param change: Событие потока изменений
+    :return: Событие сброса кэшей
+    """
+
+    operation = change["operationType"]
+    document = change.get("fullDocument") or change.get("fullDocumentBeforeChange")
+    if operation in COLLECTION_OPERATIONS or document is None:
+        return InvalidationEvent(collection=name, operation=operation)
+    document = decode_document(document)
+    return InvalidationEvent(
+        collection=name, operation=operation, movie_uid=document.get("movie_uid"), user_uid=document.get("user_uid")
+    )
+
+
+class ChangeStreamWatcher:
+    """
+    Фоновое чтение потоков изменений коллекций и рассылка событий в реестр кэшей процесса.
+    Каждый процесс читает свой поток, поэтому запись в любом процессе сбрасывает кэши всех процессов.
+    Поток начинается с момента запуска процесса: кэши нового процесса пусты, и прошлые события им не нужны.
+    Токен возобновления хранится только в памяти процесса и нужен для переподключения после ошибки без потери
+    событий. При потере истории (токен вытеснен из oplog) кэши коллекции сбрасываются целиком.
+    """
+
+    def __init__(self, registry: CacheRegistry, retry_delay: float):
+        self._registry = registry
+        self._retry_delay = retry_delay
+        self._tasks: list[asyncio.Task] = []
+        self._tokens: dict[str, dict | None] = {}
+        self._watching_since: dict[str, float] = {}
+
+    def watching_since(self, name: str) -> float | None:
+        """
+        Время (time.monotonic), с которого поток коллекции доставляет все события без пропусков.
+        Переподключение по токену возобновления пропусков не дает и время не меняет.
+        :param name: Имя коллекции
+        :return: Время открытия потока или None, если поток не открыт с начала или события могли быть пропущены
+        """
+
+        return self._watching_since.get(name)
+
+    def start(self, collections: list[AsyncIOMotorCollection]) -> None:
+        self._tasks = [asyncio.create_task(self._run(collection)) for collection in collections]
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._tokens = {}
+        self._watching_since = {}
+
+    async def _run(self, collection: AsyncIOMotorCollection) -> None:
+        name = collection.name
+        pre_images = await self._enable_pre_images(collection)
+        while True:
+            try:
+                await self._watch(collection, pre_images)
+            except OperationFailure as e:
+                if e.code == NOT_REPLICA_SET:
+                    logger.warning(f"Потоки изменений недоступны без набора реплик, кэши {name} сбрасываются по TTL.")
+                    return
+                if e.code in (CHANGE_STREAM_HISTORY_LOST, CHANGE_STREAM_FATAL_ERROR):
+                    logger.warning(f"Токен потока изменений {name} устарел, кэши коллекции сброшены: {e}")
+                    self._watching_since.pop(name, None)
+                    self._registry.publish(InvalidationEvent(collection=name, operation="invalidate"))
+                    self._tokens[name] = None
+                else:
+                    logger.exception(f"Ошибка потока изменений {name}: {e}")
+                await asyncio.sleep(self._retry_delay)
+            except PyMongoError as e:
+                logger.warning(f"Поток изменений {name} прерван, переподключение: {e}")
+                await asyncio.sleep(self._retry_delay)
+
+    async def _watch(self, collection: AsyncIOMotorCollection, pre_images: bool) -> None:
+        """
+        Читает поток изменений коллекции до его закрытия: после переподключения - с последнего обработанного
+        события, при первом запуске - с текущего момента
+        :param collection: Коллекция
+        :param pre_images: Запрашивать предварительные образы (MongoDB 6.0+)
+        """
+
+        name = collection.name
+        async with collection.watch(
+            [{"$match": {"operationType": {"$in": WATCHED_OPERATIONS}}}],
+            full_document="updateLookup",
+            full_document_before_change="whenAvailable" if pre_images else None,
+            start_after=self._tokens.get(name),
+        ) as stream:
+            # Токен открытого потока есть и до первого события: переподключение не пропустит события
+            self._tokens[name] = stream.resume_token
+            self._watching_since.setdefault(name, time.monotonic())
+            async for change in stream:
+                event = to_event(name, change)
+                self._registry.publish(event)
+                CHANGE_STREAM_EVENTS.labels(name, event.operation).inc()
+                if "wallTime" in change:
+                    lag = datetime.now(UTC) - change["wallTime"].replace(tzinfo=UTC)
+                    CHANGE_STREAM_LAG.labels(name).observe(lag.total_seconds())
+                self._tokens[name] = stream.resume_token
+
+    @staticmethod
+    async def _enable_pre_images(collection: AsyncIOMotorCollection) -> bool:
+        """
+        Включает предварительные образы коллекции. Без них событие удаления содержит только _id,
+        и кэши коллекции сбрасываются целиком.
+        :param collection: Коллекция
+        :return: Предварительные образы включены
+        """
+
+        try:
+            await collection.database.command(
+                {"collMod": collection.name, "changeStreamPreAndPostImages": {"enabled": True}}
+            )
+        except OperationFailure as e:
+            # MongoDB < 6.0 не знает changeStreamPreAndPostImages (или нет прав на collMod)
+            logger.warning(f"Предварительные образы {collection.name} недоступны, поток без них: {e}")
+            return False
+        except PyMongoError as e:
+            logger.warning(f"Не удалось включить предварительные образы для {collection.name}: {e}")
+            return False
+        return True
+
+
+change_stream_watcher = ChangeStreamWatcher(
+    registry=cache_registry,
+    retry_delay=settings.cache_invalidation.retry_delay,
+)
@@ -1,7 +1,81 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from uuid import UUID
+
+from beanie import init_beanie
+from bson import Timestamp
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorClientSession
+from pymongo.read_preferences import Nearest, PrimaryPreferred, Secondary, SecondaryPreferred, _ServerMode
+from src.core.config import settings
+from src.infrastructure.cache import TTLCache
+from src.infrastructure.metrics import ConnectionPoolMetrics
+from src.infrastructure.models import DOCUMENT_MODELS
 
 mongo_client: AsyncIOMotorClient | None = None
 
+READ_PREFERENCES = {
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+causal_tokens: TTLCache[tuple[dict, Timestamp]] = TTLCache(
+    maxsize=settings.mongo.causal_cache_size, ttl=settings.mongo.causal_token_ttl
+)
+
 
 def get_mongo_client() -> AsyncIOMotorClient:
     return mongo_client
+
+
+def get_read_preference() -> _ServerMode | None:
+    """
+    Предпочтение чтения для счетчиков, средних и списков из настроек
+    :return: Предпочтение чтения или None, если чтения идут на первичный узел
+    """
+
+    mode = READ_PREFERENCES.get(settings.mongo.read_preference)
+    if mode is None:
+        return None
+    return mode(max_staleness=settings.mongo.max_staleness or -1)
+
+
+@asynccontextmanager
+async def causal_session(client: AsyncIOMotorClient, user_uid: UUID) -> AsyncIterator[AsyncIOMotorClientSession | None]:
+    """
+    Причинно-согласованная сессия пользователя. Сессия продолжает время последней операции пользователя,
+    поэтому чтение с вторичного узла дожидается его записей. Без MONGO_CAUSAL_CONSISTENCY сессия не создается.
+    :param client: Клиент MongoDB
+    :param user_uid: ID пользователя
+    :return: Сессия или None
+    """
+
+    if not settings.mongo.causal_consistency:
+        yield None
+        return
+
+    async with await client.start_session(causal_consistency=True) as session:
+        token = causal_tokens.get(user_uid)
+        if token is not None:
+            cluster_time, operation_time = token
+            session.advance_cluster_time(cluster_time)
+            session.advance_operation_time(operation_time)
+        yield session
+        if session.cluster_time is not None and session.operation_time is not None:
+            causal_tokens.set(user_uid, (session.cluster_time, session.operation_time))
+
+
+async def init_db(db_name: str | None = None) -> AsyncIOMotorClient:
+    """
+    Подключение к MongoDB и инициализация моделей Beanie (с созданием индексов)
+    :param db_name: Имя базы данных (по умолчанию из настроек)
+    :return: Клиент MongoDB
+    """
+
+    global mongo_client
+    mongo_client = AsyncIOMotorClient(
+        settings.mongo.connection_url, event_listeners=[ConnectionPoolMetrics()], **settings.mongo.client_options
+    )
+    await init_beanie(database=mongo_client[db_name or settings.mongo.db_name], document_models=DOCUMENT_MODELS)
+    return mongo_client
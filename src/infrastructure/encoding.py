@@ -0,0 +1,46 @@
+from typing import Any
+from uuid import UUID
+
+from bson import Binary
+from bson.binary import UUID_SUBTYPE
+
+
+def encode_uuid(value: UUID) -> Binary:
+    """UUID в BSON (binary subtype 4), как его сохраняет Beanie"""
+
+    return Binary.from_uuid(value)
+
+
+def decode_uuid(value: Binary | UUID) -> UUID:
+    """BSON binary subtype 4 в UUID"""
+
+    if isinstance(value, Binary):
+        return value.as_uuid()
+    return value
+
+
+def encode_value(value: Any) -> Any:
+    """Приводит UUID (в том числе вложенные в фильтры и списки) к BSON для запросов в обход Beanie"""
+
+    if isinstance(value, UUID):
+        return encode_uuid(value)
+    if isinstance(value, dict):
+        return {key: encode_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode_value(item) for item in value]
+    return value
+
+
+def decode_document(raw: dict[str, Any]) -> dict[str, Any]:
+    """
+    Преобразует документ MongoDB в словарь полей доменной модели: _id -> id (строка), BSON UUID -> UUID
+    :param raw: Документ из коллекции
+    :return: Словарь полей
+    """
+
+    document = {"id": str(raw["_id"])} if "_id" in raw else {}
+    for key, value in raw.items():
+        if key == "_id":
+            continue
+        document[key] = value.as_uuid() if isinstance(value, Binary) and value.subtype == UUID_SUBTYPE else value
+    return document
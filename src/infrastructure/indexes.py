@@ -0,0 +1,48 @@
+import logging
+
+from beanie import Document
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_NAME = "_id_"
+
+
+async def report_indexes(document_models: list[type[Document]]) -> dict[str, dict[str, list[str]]]:
+    """
+    Сверяет объявленные в моделях индексы с фактическими индексами коллекций.
+    Сами индексы создаются в init_beanie, здесь формируется отчет:
+    missing - объявлены в модели, но отсутствуют в коллекции;
+    undeclared - есть в коллекции, но не объявлены в модели;
+    unused - не использовались с момента запуска mongod ($indexStats).
+    :param document_models: Модели документов
+    :return: Отчет по коллекциям
+    """
+
+    report = {}
+    for model in document_models:
+        collection = model.get_motor_collection()
+        declared = {index.document["name"] for index in model.get_settings().indexes or []}
+        existing = set(await collection.index_information()) - {DEFAULT_INDEX_NAME}
+
+        try:
+            usage = {
+                stats["name"]: stats["accesses"]["ops"] async for stats in collection.aggregate([{"$indexStats": {}}])
+            }
+        except OperationFailure as e:
+            logger.warning(f"Не удалось получить статистику индексов коллекции {collection.name}: {e}")
+            usage = {}
+
+        collection_report = {
+            "missing": sorted(declared - existing),
+            "undeclared": sorted(existing - declared),
+            "unused": sorted(name for name in existing if usage and usage.get(name, 0) == 0),
+        }
+        report[collection.name] = collection_report
+
+        if any(collection_report.values()):
+            logger.warning(f"Индексы коллекции {collection.name}: {collection_report}")
+        else:
+            logger.info(f"Индексы коллекции {collection.name} в порядке.")
+
+    return report
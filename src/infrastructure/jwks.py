@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import time
+
+import jwt
+from httpx import AsyncClient, HTTPError
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Неизвестный kid может означать ротацию ключей: JWKS перечитывается не чаще этого интервала, сек.
+UNKNOWN_KEY_REFRESH_INTERVAL = 30.0
+
+
+class UnknownKeyError(Exception):
+    """Токен подписан ключом, которого нет в JWKS"""
+
+
+class JWKSKeyStore:
+    """
+    Ключи подписи токенов из JWKS сервиса авторизации, обновляемые фоновой задачей.
+    При ротации новый kid может появиться в токенах раньше периодического обновления,
+    поэтому неизвестный kid вызывает внеочередное обновление (не чаще UNKNOWN_KEY_REFRESH_INTERVAL).
+    """
+
+    def __init__(self, url: str | None, refresh_interval: float):
+        self._url = url
+        self._refresh_interval = refresh_interval
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._refreshed_at = 0.0
+        self._refresh_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    async def refresh(self, httpx_client: AsyncClient) -> None:
+        """
+        Загружает JWKS и заменяет набор ключей: ключи, удаленные из JWKS, перестают приниматься
+        :param httpx_client: HTTP-клиент
+        """
+
+        self._refreshed_at = time.monotonic()
+        response = await httpx_client.get(self._url)
+        response.raise_for_status()
+        key_set = jwt.PyJWKSet.from_dict(response.json())
+        self._keys = {key.key_id: key for key in key_set.keys if key.key_id}
+
+    async def get(self, kid: str | None, httpx_client: AsyncClient) -> jwt.PyJWK:
+        """
+        Возвращает ключ по kid, при необходимости обновляя JWKS
+        :param kid: ID ключа из заголовка токена
+        :param httpx_client: HTTP-клиент
+        :return: Ключ
+        :raises UnknownKeyError: Ключа нет в JWKS
+        """
+
+        if kid not in self._keys and self._url:
+            async with self._refresh_lock:
+                if kid not in self._keys and time.monotonic() - self._refreshed_at >= UNKNOWN_KEY_REFRESH_INTERVAL:
+                    try:
+                        await self.refresh(httpx_client)
+                    except (HTTPError, ValueError, jwt.PyJWKSetError) as e:
+                        logger.warning(f"Не удалось обновить JWKS: {e}")
+        key = self._keys.get(kid)
+        if key is None:
+            raise UnknownKeyError(kid)
+        return key
+
+    def start(self, httpx_client: AsyncClient) -> None:
+        self._task = asyncio.create_task(self._run(httpx_client))
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self, httpx_client: AsyncClient) -> None:
+        while True:
+            try:
+                await self.refresh(httpx_client)
+            except Exception as e:
+                logger.exception(f"Ошибка при обновлении JWKS: {e}")
+            await asyncio.sleep(self._refresh_interval)
+
+
+async def decode_token(token: str, key_store: JWKSKeyStore, httpx_client: AsyncClient) -> dict | None:
+    """
+    Проверяет подпись, срок действия и обязательные claims токена (exp, sub и role) без обращения к сервису авторизации
+    :param token: Токен доступа
+    :param key_store: Ключи подписи
+    :param httpx_client: HTTP-клиент для обновления JWKS
+    :return: Claims токена или None, если токен недействителен
+    :raises UnknownKeyError: Токен подписан неизвестным ключом
+    """
+
+    try:
+        kid = jwt.get_unverified_header(token).get("kid")
+    except jwt.InvalidTokenError:
+        return None
+    key = await key_store.get(kid, httpx_client)
+
+    algorithms = [algorithm.strip() for algorithm in settings.auth.jwt_algorithms.split(",")]
+    if key.algorithm_name not in algorithms:
+        return None
+    try:
+        return jwt.decode(
+            token,
+            key=key,
+            algorithms=[key.algorithm_name],
+            audience=settings.auth.jwt_audience,
+            issuer=settings.auth.jwt_issuer,
+            leeway=settings.auth.jwt_leeway,
+            options={"require": ["exp", "sub", "role"], "verify_aud": settings.auth.jwt_audience is not None},
+        )
+    except jwt.InvalidTokenError:
+        return None
+
+
+jwks_key_store = JWKSKeyStore(url=settings.auth.jwks_url, refresh_interval=settings.auth.jwks_refresh_interval)
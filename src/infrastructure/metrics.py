@@ -0,0 +1,142 @@
+import functools
+import inspect
+import time
+from collections.abc import Callable
+
+from prometheus_client import Counter, Gauge, Histogram
+from pymongo import monitoring
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Длительность обработки HTTP-запроса",
+    ["method", "route", "status"],
+)
+REPOSITORY_CALL_DURATION = Histogram(
+    "repository_call_duration_seconds",
+    "Длительность вызова метода репозитория",
+    ["repository", "method", "outcome"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+AUTH_REQUEST_DURATION = Histogram(
+    "auth_request_duration_seconds",
+    "Длительность запроса к сервису аутентификации",
+    ["status"],
+)
+ADMISSION_REQUESTS = Counter("admission_requests", "Решения управления допуском запросов", ["route_class", "outcome"])
+ADMISSION_IN_FLIGHT = Gauge("admission_in_flight", "Допущенные запросы в обработке", ["route_class"])
+ADMISSION_LIMIT = Gauge("admission_limit", "Текущий адаптивный лимит одновременных запросов")
+CHANGE_STREAM_EVENTS = Counter(
+    "change_stream_events", "События потоков изменений MongoDB, разосланные кэшам", ["collection", "operation"]
+)
+CHANGE_STREAM_LAG = Histogram(
+    "change_stream_lag_seconds",
+    "Задержка между записью в MongoDB и сбросом кэшей процесса",
+    ["collection"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+BLOOM_FILTER_CHECKS = Counter(
+    "bloom_filter_checks", "Проверки пар (user_uid, movie_uid) фильтром Блума", ["collection", "result"]
+)
+BLOOM_FILTER_BYTES = Gauge("bloom_filter_bytes", "Память фильтра Блума", ["collection"])
+BLOOM_FILTER_ERROR_RATE = Gauge(
+    "bloom_filter_error_rate", "Оценка доли ложноположительных ответов фильтра Блума", ["collection"]
+)
+CACHE_REQUESTS = Counter("cache_requests", "Обращения к кэшам в памяти процесса", ["cache", "result"])
+WRITE_BEHIND_FLUSH_SIZE = Histogram(
+    "write_behind_flush_size",
+    "Количество операций в одной пакетной записи буфера отложенной записи",
+    ["collection"],
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+WRITE_BEHIND_FLUSH_DURATION = Histogram(
+    "write_behind_flush_duration_seconds",
+    "Длительность пакетной записи буфера отложенной записи",
+    ["collection"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+WRITE_BEHIND_PENDING = Gauge("write_behind_pending", "Операции, ожидающие пакетной записи", ["collection"])
+MONGO_POOL_CONNECTIONS = Gauge("mongo_pool_connections", "Открытые соединения пула MongoDB", ["address"])
+MONGO_POOL_IN_USE = Gauge("mongo_pool_connections_in_use", "Соединения пула MongoDB, выданные операциям", ["address"])
+MONGO_POOL_WAITING = Gauge("mongo_pool_waiting", "Операции, ожидающие соединение из пула MongoDB", ["address"])
+MONGO_POOL_CREATED = Counter("mongo_pool_connections_created", "Созданные соединения пула MongoDB", ["address"])
+
+
+def _address(address: tuple[str, int]) -> str:
+    host, port = address
+    return f"{host}:{port}"
+
+
+class ConnectionPoolMetrics(monitoring.ConnectionPoolListener):
+    """Слушатель событий пула соединений pymongo, обновляющий метрики пула"""
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        pass
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        pass
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        pass
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        MONGO_POOL_CREATED.labels(_address(event.address)).inc()
+        MONGO_POOL_CONNECTIONS.labels(_address(event.address)).inc()
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        MONGO_POOL_CONNECTIONS.labels(_address(event.address)).dec()
+
+    def connection_check_out_started(self, event: monitoring.ConnectionCheckOutStartedEvent) -> None:
+        MONGO_POOL_WAITING.labels(_address(event.address)).inc()
+
+    def connection_check_out_failed(self, event: monitoring.ConnectionCheckOutFailedEvent) -> None:
+        MONGO_POOL_WAITING.labels(_address(event.address)).dec()
+
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent) -> None:
+        MONGO_POOL_WAITING.labels(_address(event.address)).dec()
+        MONGO_POOL_IN_USE.labels(_address(event.address)).inc()
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        MONGO_POOL_IN_USE.labels(_address(event.address)).dec()
+
+
+def _timed(method: Callable) -> Callable:
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        outcome = "error"
+        start = time.perf_counter()
+        try:
+            result = await method(self, *args, **kwargs)
+            outcome = "ok"
+            return result
+        finally:
+            REPOSITORY_CALL_DURATION.labels(type(self).__name__, method.__name__, outcome).observe(
+                time.perf_counter() - start
+            )
+
+    wrapper.__timed__ = True
+    return wrapper
+
+
+def time_repository_methods(cls: type) -> type:
+    """
+    Оборачивает публичные асинхронные методы класса репозитория (включая унаследованные) замером длительности.
+    Метрика помечается именем класса экземпляра, поэтому унаследованные методы различаются по репозиториям.
+    :param cls: Класс репозитория
+    :return: Тот же класс
+    """
+
+    for name, method in inspect.getmembers(cls, inspect.iscoroutinefunction):
+        if (
+            name.startswith("_")
+            or getattr(method, "__timed__", False)
+            or getattr(method, "__isabstractmethod__", False)
+        ):
+            continue
+        setattr(cls, name, _timed(method))
+    return cls
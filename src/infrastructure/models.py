@@ -1,8 +1,9 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from uuid import UUID
 
 from beanie import Document
 from pydantic import BaseModel, Field
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
 
 
 class TimestampMixin(BaseModel):
@@ -16,6 +17,17 @@ class LikeModel(Document, TimestampMixin):
 
     class Settings:
         name = "like"
+        indexes = [
+            IndexModel([("user_uid", ASCENDING), ("movie_uid", ASCENDING)], name="user_uid_movie_uid", unique=True),
+            IndexModel(
+                [("movie_uid", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                name="movie_uid_created_at_id",
+            ),
+            IndexModel(
+                [("user_uid", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                name="user_uid_created_at_id",
+            ),
+        ]
 
 
 class BookmarkModel(Document, TimestampMixin):
@@ -24,6 +36,17 @@ class BookmarkModel(Document, TimestampMixin):
 
     class Settings:
         name = "bookmark"
+        indexes = [
+            IndexModel([("user_uid", ASCENDING), ("movie_uid", ASCENDING)], name="user_uid_movie_uid", unique=True),
+            IndexModel(
+                [("movie_uid", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                name="movie_uid_created_at_id",
+            ),
+            IndexModel(
+                [("user_uid", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                name="user_uid_created_at_id",
+            ),
+        ]
 
 
 class ReviewModel(Document, TimestampMixin):
@@ -34,3 +57,72 @@ class ReviewModel(Document, TimestampMixin):
 
     class Settings:
         name = "review"
+        indexes = [
+            IndexModel([("user_uid", ASCENDING), ("movie_uid", ASCENDING)], name="user_uid_movie_uid", unique=True),
+            IndexModel(
+                [("movie_uid", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                name="movie_uid_created_at_id",
+            ),
+            IndexModel(
+                [("user_uid", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                name="user_uid_created_at_id",
+            ),
+            IndexModel(
+                [("movie_uid", ASCENDING), ("rating", DESCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                name="movie_uid_rating_created_at_id",
+            ),
+            IndexModel(
+                [("user_uid", ASCENDING), ("rating", DESCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                name="user_uid_rating_created_at_id",
+            ),
+            IndexModel([("content", TEXT)], name="content_text", default_language="russian"),
+        ]
+
+
+class MovieReviewStatsModel(Document):
+    movie_uid: UUID = Field(..., description="ID фильма")
+    reviews_count: int = Field(default=0, description="Количество рецензий")
+    rating_sum: int = Field(default=0, description="Сумма оценок")
+
+    class Settings:
+        name = "movie_review_stats"
+        indexes = [IndexModel([("movie_uid", ASCENDING)], name="movie_uid", unique=True)]
+
+
+class MovieLikeCounterModel(Document):
+    movie_uid: UUID = Field(..., description="ID фильма")
+    shard: int = Field(..., description="Номер доли счетчика")
+    likes_count: int = Field(default=0, description="Изменение количества лайков в доле")
+
+    class Settings:
+        name = "movie_like_counters"
+        indexes = [IndexModel([("movie_uid", ASCENDING), ("shard", ASCENDING)], name="movie_uid_shard", unique=True)]
+
+
+MOVIE_ACTIVITY_RETENTION = timedelta(days=8)
+
+
+class MovieActivityModel(Document):
+    movie_uid: UUID = Field(..., description="ID фильма")
+    hour: datetime = Field(..., description="Начало часа")
+    likes_count: int = Field(default=0, description="Изменение количества лайков за час")
+    reviews_count: int = Field(default=0, description="Изменение количества рецензий за час")
+
+    class Settings:
+        name = "movie_activity"
+        indexes = [
+            IndexModel([("movie_uid", ASCENDING), ("hour", ASCENDING)], name="movie_uid_hour", unique=True),
+            IndexModel(
+                [("hour", ASCENDING)], name="hour_ttl", expireAfterSeconds=int(MOVIE_ACTIVITY_RETENTION.total_seconds())
+            ),
+        ]
+
+
+DOCUMENT_MODELS = [
+    LikeModel,
+    BookmarkModel,
+    ReviewModel,
+    MovieReviewStatsModel,
+    MovieLikeCounterModel,
+    MovieActivityModel,
+]
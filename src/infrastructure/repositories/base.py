@@ -1,12 +1,44 @@
 from abc import ABC, abstractmethod
-from typing import Generic, TypeVar
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Any, Generic, TypeVar
 from uuid import UUID
 
-from beanie import Document
+from beanie import Document, PydanticObjectId
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorCollection
 from pydantic import BaseModel
+from pymongo import DESCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from pymongo.read_preferences import _ServerMode
+from src.domain.pagination import Cursor
+from src.infrastructure import db, metrics
+from src.infrastructure.bloom import USER_MOVIE_INDEX, MembershipFilter
+from src.infrastructure.encoding import decode_document, decode_uuid, encode_uuid, encode_value
+from src.infrastructure.repositories.exceptions import DuplicateItemError
+from src.infrastructure.write_behind import WriteBehindBuffer
 
 T = TypeVar("T", bound=BaseModel)
 
+DEFAULT_SORT = [("created_at", DESCENDING), ("_id", DESCENDING)]
+
+
+def keyset_filter(sort: list[tuple[str, int]], cursor: Cursor) -> dict:
+    """
+    Строит условие выборки документов, следующих за курсором в заданном порядке сортировки
+    :param sort: Порядок сортировки (поле, направление)
+    :param cursor: Курсор последнего документа предыдущей страницы
+    :return: Фильтр MongoDB
+    """
+
+    values = {"_id": PydanticObjectId(cursor.id), "created_at": cursor.created_at, "rating": cursor.rating}
+    conditions = []
+    for position, (field, direction) in enumerate(sort):
+        condition = {previous: values[previous] for previous, _ in sort[:position]}
+        condition[field] = {"$lt" if direction == DESCENDING else "$gt": values[field]}
+        conditions.append(condition)
+    return {"$or": conditions}
+
 
 class AbstractRepository(ABC, Generic[T]):
 
@@ -17,10 +49,15 @@ class AbstractRepository(ABC, Generic[T]):
     async def get_by_id(self, item_id: str) -> T | None: ...
 
     @abstractmethod
-    async def get_by_user_id(self, user_id: UUID, limit: int = 10, offset: int = 0) -> list[T]: ...
+    async def get_by_user_id(
+        self, user_id: UUID, limit: int = 10, offset: int = 0, cursor: Cursor | None = None
+    ) -> list[T]: ...
+
+    @abstractmethod
+    def iter_by_user_id(self, user_uid: UUID, batch_size: int = 1000) -> AsyncIterator[T]: ...
 
     @abstractmethod
-    async def get_by_user_and_movie_uid(self, user_uid: UUID, movie_uid: UUID) -> T | None: ...
+    async def get_movie_uids_by_user(self, user_uid: UUID, movie_uids: list[UUID]) -> set[UUID]: ...
 
     @abstractmethod
     async def update(self, item: T) -> T | None: ...
@@ -28,24 +65,133 @@ class AbstractRepository(ABC, Generic[T]):
     @abstractmethod
     async def delete(self, item_id: str) -> T | None: ...
 
+    @abstractmethod
+    async def update_by_owner(self, item_id: str, user_uid: UUID, fields: dict[str, Any]) -> tuple[T, T] | None: ...
+
+    @abstractmethod
+    async def delete_by_owner(self, item_id: str, user_uid: UUID) -> T | None: ...
+
 
 class BeanieBaseRepository(AbstractRepository[T], ABC):
 
-    def __init__(self, model: Document, domain_model: BaseModel):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        metrics.time_repository_methods(cls)
+
+    def __init__(
+        self,
+        model: Document,
+        domain_model: BaseModel,
+        raw_reads: bool = False,
+        write_buffer: WriteBehindBuffer | None = None,
+        read_preference: _ServerMode | None = None,
+        membership_filter: MembershipFilter | None = None,
+    ):
+        """
+        :param model: Модель документа Beanie
+        :param domain_model: Доменная модель
+        :param raw_reads: Читать документы напрямую через коллекцию Motor, без создания документов Beanie
+        :param write_buffer: Буфер отложенной пакетной записи для add (по умолчанию - запись сразу)
+        :param read_preference: Предпочтение чтения для счетчиков и списков (по умолчанию - первичный узел).
+        Такие чтения идут через коллекцию Motor, так как Beanie не принимает предпочтение чтения для запроса.
+        :param membership_filter: Фильтр пар (user_uid, movie_uid), отсекающий запросы отсутствующих документов
+        """
+
         self._domain_model = domain_model
         self._model: Document = model
+        self._raw_reads = raw_reads
+        self._write_buffer = write_buffer
+        self._read_preference = read_preference
+        self._membership_filter = membership_filter
+        self._projection = {field: 1 for field in domain_model.model_fields if field != "id"}
+
+    @property
+    def _collection(self) -> AsyncIOMotorCollection:
+        return self._model.get_motor_collection()
+
+    @property
+    def _read_collection(self) -> AsyncIOMotorCollection:
+        if self._read_preference is None:
+            return self._collection
+        return self._collection.with_options(read_preference=self._read_preference)
+
+    def _to_domain(self, document: Document) -> T:
+        document.id = str(document.id)
+        return self._domain_model.model_validate(document)
+
+    def _from_raw(self, raw: dict) -> T:
+        return self._domain_model.model_validate(decode_document(raw))
+
+    async def _find_one(self, filters: dict) -> T | None:
+        if self._raw_reads:
+            raw = await self._collection.find_one(encode_value(filters), self._projection)
+            return self._from_raw(raw) if raw is not None else None
+
+        document = await self._model.find_one(filters)
+        if document is None:
+            return None
+        return self._to_domain(document)
+
+    async def _find_page(
+        self,
+        filters: dict,
+        limit: int,
+        offset: int = 0,
+        cursor: Cursor | None = None,
+        session: AsyncIOMotorClientSession | None = None,
+        sort: list[tuple[str, int]] = DEFAULT_SORT,
+    ) -> list[T]:
+        """
+        Получает страницу документов в заданном порядке (по умолчанию новые первыми).
+        При переданном курсоре выборка начинается сразу после него и не зависит от глубины страницы.
+        Читает с узла по предпочтению чтения репозитория.
+        :param filters: Условия выборки
+        :param limit: Количество документов
+        :param offset: Сдвиг
+        :param cursor: Курсор последнего документа предыдущей страницы
+        :param session: Сессия MongoDB
+        :param sort: Порядок сортировки, которому соответствует индекс коллекции
+        :return: Список документов
+        """
+
+        if cursor is not None:
+            filters = {"$and": [filters, keyset_filter(sort, cursor)]}
+
+        if self._raw_reads or self._read_preference is not None:
+            raw_cursor = self._read_collection.find(encode_value(filters), self._projection, session=session)
+            raw_documents = await raw_cursor.sort(sort).skip(offset).limit(limit).to_list(length=limit)
+            return [self._from_raw(raw) for raw in raw_documents]
+
+        documents = await self._model.find(filters, session=session).sort(sort).skip(offset).limit(limit).to_list()
+        return [self._to_domain(document) for document in documents]
 
     async def add(self, item: T) -> T:
         """
         Добавляет документ в базу данных
         :param item: Документ для добавления
         :return: Добавленный документ
+        :raises DuplicateItemError: Документ с такими ID пользователя и ID фильма уже существует
         """
 
+        if self._membership_filter is not None:
+            # До записи: читатель не должен получить "точно нет" для уже записанной пары
+            self._membership_filter.add(item.user_uid, item.movie_uid)
+
+        if self._write_buffer is not None:
+            raw = {"_id": ObjectId(), **encode_value(item.model_dump(exclude={"id"}))}
+            try:
+                await self._write_buffer.insert(raw)
+            except DuplicateKeyError as e:
+                raise DuplicateItemError(str(e)) from e
+            return item.model_copy(update={"id": str(raw["_id"])})
+
         document = self._model(**item.model_dump())
-        await document.insert()
-        document.id = str(document.id)
-        return self._domain_model.model_validate(document)
+        try:
+            async with db.causal_session(self._collection.database.client, item.user_uid) as session:
+                await document.insert(session=session)
+        except DuplicateKeyError as e:
+            raise DuplicateItemError(str(e)) from e
+        return self._to_domain(document)
 
     async def get_by_id(self, item_id: str):
         """
@@ -53,39 +199,77 @@ class BeanieBaseRepository(AbstractRepository[T], ABC):
         :param item_id: ID документа
         :return: Документ
         """
+
+        if self._raw_reads:
+            if not ObjectId.is_valid(item_id):
+                return None
+            return await self._find_one({"_id": ObjectId(item_id)})
+
         document = await self._model.get(item_id)
         if document is None:
             return None
-        document.id = str(document.id)
-        return self._domain_model.model_validate(document)
+        return self._to_domain(document)
 
-    async def get_by_user_id(self, user_uid: UUID, limit: int = 10, offset: int = 0) -> list[T]:
+    async def get_by_user_id(
+        self, user_uid: UUID, limit: int = 10, offset: int = 0, cursor: Cursor | None = None
+    ) -> list[T]:
         """
         Получает документы из базы данных по ID пользователя
         :param user_uid: ID пользователя
         :param limit: Количество документов
         :param offset: Сдвиг
+        :param cursor: Курсор последнего документа предыдущей страницы
         :return: Список документов
         """
 
-        documents = await self._model.find(self._model.user_uid == user_uid).skip(offset).limit(limit).to_list()
-        for document in documents:
-            document.id = str(document.id)
-        return [self._domain_model.model_validate(document) for document in documents]
+        return await self._find_user_page(user_uid, limit=limit, offset=offset, cursor=cursor)
+
+    async def _find_user_page(
+        self,
+        user_uid: UUID,
+        limit: int,
+        offset: int = 0,
+        cursor: Cursor | None = None,
+        sort: list[tuple[str, int]] = DEFAULT_SORT,
+    ) -> list[T]:
+        async with db.causal_session(self._collection.database.client, user_uid) as session:
+            return await self._find_page(
+                {"user_uid": user_uid}, limit=limit, offset=offset, cursor=cursor, session=session, sort=sort
+            )
 
-    async def get_by_user_and_movie_uid(self, user_uid: UUID, movie_uid: UUID) -> T | None:
+    async def iter_by_user_id(self, user_uid: UUID, batch_size: int = 1000) -> AsyncIterator[T]:
         """
-        Получает документ из базы данных по ID пользователя и ID фильма
+        Итерирует все документы пользователя курсором Motor (новые первыми).
+        Документы запрашиваются пачками по batch_size, в памяти держится только текущая пачка.
         :param user_uid: ID пользователя
-        :param movie_uid: ID фильма
-        :return: Документ
+        :param batch_size: Размер пачки курсора
+        :return: Асинхронный итератор документов
         """
 
-        document = await self._model.find_one(self._model.user_uid == user_uid, self._model.movie_uid == movie_uid)
-        if document is None:
-            return None
-        document.id = str(document.id)
-        return self._domain_model.model_validate(document)
+        raw_cursor = self._read_collection.find(encode_value({"user_uid": user_uid}), self._projection)
+        async for raw in raw_cursor.sort(DEFAULT_SORT).batch_size(batch_size):
+            yield self._from_raw(raw)
+
+    async def get_movie_uids_by_user(self, user_uid: UUID, movie_uids: list[UUID]) -> set[UUID]:
+        """
+        Отбирает из списка фильмов те, для которых у пользователя есть документ, одним запросом ($in).
+        Условие и проекция содержат только поля индекса user_uid_movie_uid, поэтому запрос покрывается индексом
+        и не читает сами документы. Фильмы, пар с которыми точно нет по фильтру Блума, в запрос не попадают.
+        :param user_uid: ID пользователя
+        :param movie_uids: ID фильмов
+        :return: ID фильмов, для которых документ существует
+        """
+
+        if self._membership_filter is not None:
+            movie_uids = [uid for uid in movie_uids if self._membership_filter.might_contain(user_uid, uid)]
+            if not movie_uids:
+                return set()
+
+        filters = {"user_uid": encode_uuid(user_uid), "movie_uid": {"$in": [encode_uuid(uid) for uid in movie_uids]}}
+        async with db.causal_session(self._collection.database.client, user_uid) as session:
+            raw_cursor = self._read_collection.find(filters, {"_id": 0, "movie_uid": 1}, session=session)
+            raw_documents = await raw_cursor.hint(USER_MOVIE_INDEX).to_list(length=len(movie_uids))
+        return {decode_uuid(raw["movie_uid"]) for raw in raw_documents}
 
     async def update(self, item: T) -> T | None:
         """
@@ -97,11 +281,10 @@ class BeanieBaseRepository(AbstractRepository[T], ABC):
         document = await self._model.get(item.id)
         if document is None:
             return None
-        for key, value in item.model_dump().items():
+        for key, value in item.model_dump(exclude={"id"}).items():
             setattr(document, key, value)
         await document.save()
-        document.id = str(document.id)
-        return self._domain_model.model_validate(document)
+        return self._to_domain(document)
 
     async def delete(self, item_id: str) -> T | None:
         """
@@ -114,5 +297,52 @@ class BeanieBaseRepository(AbstractRepository[T], ABC):
         if document is None:
             return None
         await document.delete()
-        document.id = str(document.id)
-        return self._domain_model.model_validate(document)
+        return self._to_domain(document)
+
+    def _owner_filter(self, item_id: str, user_uid: UUID) -> dict | None:
+        if not ObjectId.is_valid(item_id):
+            return None
+        return {"_id": ObjectId(item_id), "user_uid": encode_uuid(user_uid)}
+
+    async def update_by_owner(self, item_id: str, user_uid: UUID, fields: dict[str, Any]) -> tuple[T, T] | None:
+        """
+        Обновляет переданные поля документа пользователя одним запросом (find_one_and_update + $set)
+        :param item_id: ID документа
+        :param user_uid: ID пользователя - владельца документа
+        :param fields: Обновляемые поля
+        :return: Документ до и после обновления или None, если документ не найден или принадлежит другому пользователю
+        """
+
+        owner_filter = self._owner_filter(item_id, user_uid)
+        if owner_filter is None:
+            return None
+
+        fields = {**fields, "updated_at": datetime.now()}
+        async with db.causal_session(self._collection.database.client, user_uid) as session:
+            raw = await self._collection.find_one_and_update(
+                owner_filter,
+                {"$set": encode_value(fields)},
+                projection=self._projection,
+                return_document=ReturnDocument.BEFORE,
+                session=session,
+            )
+        if raw is None:
+            return None
+        previous = self._from_raw(raw)
+        return previous, previous.model_copy(update=fields)
+
+    async def delete_by_owner(self, item_id: str, user_uid: UUID) -> T | None:
+        """
+        Удаляет документ пользователя одним запросом (find_one_and_delete)
+        :param item_id: ID документа
+        :param user_uid: ID пользователя - владельца документа
+        :return: Удаленный документ или None, если документ не найден или принадлежит другому пользователю
+        """
+
+        owner_filter = self._owner_filter(item_id, user_uid)
+        if owner_filter is None:
+            return None
+
+        async with db.causal_session(self._collection.database.client, user_uid) as session:
+            raw = await self._collection.find_one_and_delete(owner_filter, projection=self._projection, session=session)
+        return self._from_raw(raw) if raw is not None else None
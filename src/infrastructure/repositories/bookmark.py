@@ -1,8 +1,11 @@
 from abc import ABC
 
+from src.core.config import settings
 from src.domain.bookmark import Bookmark
+from src.infrastructure import bloom, db, write_behind
 from src.infrastructure.models import BookmarkModel
 from src.infrastructure.repositories.base import AbstractRepository, BeanieBaseRepository
+from src.infrastructure.repositories.memory import InMemoryBaseRepository
 
 
 class AbstractBookmarkRepository(AbstractRepository[Bookmark], ABC):
@@ -13,5 +16,19 @@ class BeanieBookmarkRepository(AbstractBookmarkRepository, BeanieBaseRepository[
     """Репозиторий для работы с закладками"""
 
 
+class InMemoryBookmarkRepository(AbstractBookmarkRepository, InMemoryBaseRepository[Bookmark]):
+    """Репозиторий закладок в памяти процесса"""
+
+    def __init__(self):
+        super().__init__(domain_model=Bookmark)
+
+
 def get_bookmark_repository() -> AbstractBookmarkRepository:
-    return BeanieBookmarkRepository(model=BookmarkModel, domain_model=Bookmark)
+    return BeanieBookmarkRepository(
+        model=BookmarkModel,
+        domain_model=Bookmark,
+        raw_reads=settings.mongo.raw_reads,
+        write_buffer=write_behind.get_buffer(BookmarkModel),
+        read_preference=db.get_read_preference(),
+        membership_filter=bloom.get_filter(BookmarkModel),
+    )
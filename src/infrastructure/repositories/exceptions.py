@@ -0,0 +1,2 @@
+class DuplicateItemError(Exception):
+    """Документ с такими ID пользователя и ID фильма уже существует"""
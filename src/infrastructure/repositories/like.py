@@ -1,29 +1,34 @@
-from abc import ABC, abstractmethod
-from uuid import UUID
+from abc import ABC
 
+from src.core.config import settings
 from src.domain.like import Like
+from src.infrastructure import bloom, db, write_behind
 from src.infrastructure.models import LikeModel
 from src.infrastructure.repositories.base import AbstractRepository, BeanieBaseRepository
+from src.infrastructure.repositories.memory import InMemoryBaseRepository
 
 
 class AbstractLikeRepository(AbstractRepository[Like], ABC):
-    @abstractmethod
-    async def get_likes_count_by_movie_id(self, movie_uid: UUID) -> int: ...
+    pass
 
 
 class LikeRepository(AbstractLikeRepository, BeanieBaseRepository[Like]):
     """Репозиторий для работы с лайками"""
 
-    async def get_likes_count_by_movie_id(self, movie_uid: UUID) -> int:
-        """
-        Получить количество лайков для фильма
-        :param movie_uid: UUID фильма
-        :return: количество лайков
-        """
 
-        likes_count = await self._model.find(self._model.movie_uid == movie_uid).count()
-        return likes_count
+class InMemoryLikeRepository(AbstractLikeRepository, InMemoryBaseRepository[Like]):
+    """Репозиторий лайков в памяти процесса"""
+
+    def __init__(self):
+        super().__init__(domain_model=Like)
 
 
 def get_like_repository() -> AbstractLikeRepository:
-    return LikeRepository(model=LikeModel, domain_model=Like)
+    return LikeRepository(
+        model=LikeModel,
+        domain_model=Like,
+        raw_reads=settings.mongo.raw_reads,
+        write_buffer=write_behind.get_buffer(LikeModel),
+        read_preference=db.get_read_preference(),
+        membership_filter=bloom.get_filter(LikeModel),
+    )
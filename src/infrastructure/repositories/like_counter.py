@@ -0,0 +1,248 @@
+import random
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from uuid import UUID
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.read_preferences import _ServerMode
+from src.core.config import settings
+from src.infrastructure import db, metrics, write_behind
+from src.infrastructure.encoding import decode_uuid, encode_uuid
+from src.infrastructure.models import LikeModel, MovieLikeCounterModel
+from src.infrastructure.repositories.like import InMemoryLikeRepository
+from src.infrastructure.write_behind import IncrementBuffer
+
+
+class ShardPolicy:
+    """
+    Число долей счетчика фильма для изменений из этого процесса.
+    Если частота изменений фильма за окно не меньше hot_writes_per_second, число долей удваивается (до max_shards);
+    без роста в течение cooldown - уменьшается вдвое. Чтение суммирует все доли фильма, поэтому процессы
+    выбирают число долей независимо, а доли, в которые больше не пишут, остаются в сумме.
+    """
+
+    def __init__(self, hot_writes_per_second: float, max_shards: int, window: float, cooldown: float, maxsize: int):
+        self._hot_writes_per_second = hot_writes_per_second
+        self._max_shards = max_shards
+        self._window = window
+        self._cooldown = cooldown
+        self._maxsize = maxsize
+        # movie_uid -> [начало окна, изменения за окно, число долей, время последнего увеличения]
+        self._movies: OrderedDict[UUID, list] = OrderedDict()
+
+    def shards(self, movie_uid: UUID) -> int:
+        """
+        Учитывает изменение счетчика фильма и возвращает число долей, среди которых выбирается доля
+        :param movie_uid: ID фильма
+        :return: Число долей
+        """
+
+        now = time.monotonic()
+        state = self._movies.get(movie_uid)
+        if state is None:
+            state = self._movies[movie_uid] = [now, 0, 1, 0.0]
+            if len(self._movies) > self._maxsize:
+                self._movies.popitem(last=False)
+        else:
+            self._movies.move_to_end(movie_uid)
+
+        window_start, writes, shards, grown_at = state
+        if now - window_start >= self._window:
+            if writes / (now - window_start) >= self._hot_writes_per_second and shards < self._max_shards:
+                shards, grown_at = min(self._max_shards, shards * 2), now
+            elif shards > 1 and now - grown_at >= self._cooldown:
+                shards, grown_at = shards // 2, now
+            window_start, writes = now, 0
+        state[:] = [window_start, writes + 1, shards, grown_at]
+        return shards
+
+
+class AbstractLikeCounterRepository(ABC):
+
+    @abstractmethod
+    async def increment(self, movie_uid: UUID, count: int) -> None: ...
+
+    @abstractmethod
+    async def get_count(self, movie_uid: UUID) -> int: ...
+
+    @abstractmethod
+    async def get_counts(self, movie_uids: list[UUID]) -> dict[UUID, int]: ...
+
+    @abstractmethod
+    async def rebuild(self) -> int: ...
+
+    @abstractmethod
+    async def verify(self) -> dict[UUID, tuple[int, int]]: ...
+
+
+@metrics.time_repository_methods
+class BeanieLikeCounterRepository(AbstractLikeCounterRepository):
+    """
+    Распределенные счетчики лайков: по документу на каждую долю (movie_uid, shard) в movie_like_counters.
+    Изменение попадает в случайную долю, поэтому одновременные лайки популярного фильма не конкурируют
+    за один документ; количество лайков - сумма долей.
+    """
+
+    def __init__(
+        self,
+        model: type[MovieLikeCounterModel],
+        like_model: type[LikeModel],
+        policy: ShardPolicy,
+        read_preference: _ServerMode | None = None,
+        increment_buffer: IncrementBuffer | None = None,
+    ):
+        """
+        :param model: Модель долей счетчиков
+        :param like_model: Модель лайков (для пересчета и сверки)
+        :param policy: Политика числа долей
+        :param read_preference: Предпочтение чтения для get_count и get_counts
+        :param increment_buffer: Буфер отложенных изменений счетчиков (по умолчанию - запись сразу)
+        """
+
+        self._model = model
+        self._like_model = like_model
+        self._policy = policy
+        self._read_preference = read_preference
+        self._increment_buffer = increment_buffer
+
+    @property
+    def _read_collection(self) -> AsyncIOMotorCollection:
+        collection = self._model.get_motor_collection()
+        if self._read_preference is None:
+            return collection
+        return collection.with_options(read_preference=self._read_preference)
+
+    async def increment(self, movie_uid: UUID, count: int) -> None:
+        """
+        Атомарно изменяет случайную долю счетчика фильма ($inc с upsert)
+        :param movie_uid: ID фильма
+        :param count: Изменение количества лайков
+        """
+
+        shard = random.randrange(self._policy.shards(movie_uid))
+        document_filter = {"movie_uid": encode_uuid(movie_uid), "shard": shard}
+        if self._increment_buffer is not None:
+            await self._increment_buffer.increment(document_filter, {"likes_count": count})
+            return
+        await self._model.get_motor_collection().update_one(
+            document_filter, {"$inc": {"likes_count": count}}, upsert=True
+        )
+
+    async def get_count(self, movie_uid: UUID) -> int:
+        """
+        Количество лайков фильма: сумма долей счетчика по индексу movie_uid_shard
+        :param movie_uid: ID фильма
+        :return: Количество лайков
+        """
+
+        raw_cursor = self._read_collection.find({"movie_uid": encode_uuid(movie_uid)}, {"_id": 0, "likes_count": 1})
+        return sum(raw["likes_count"] for raw in await raw_cursor.to_list(length=None))
+
+    async def get_counts(self, movie_uids: list[UUID]) -> dict[UUID, int]:
+        """
+        Количество лайков для списка фильмов одной агрегацией долей ($in + $group)
+        :param movie_uids: ID фильмов
+        :return: Количество лайков по ID фильма (фильмы без счетчика отсутствуют)
+        """
+
+        pipeline = [
+            {"$match": {"movie_uid": {"$in": [encode_uuid(movie_uid) for movie_uid in movie_uids]}}},
+            {"$group": {"_id": "$movie_uid", "count": {"$sum": "$likes_count"}}},
+        ]
+        groups = await self._read_collection.aggregate(pipeline).to_list(length=None)
+        return {decode_uuid(group["_id"]): group["count"] for group in groups}
+
+    async def rebuild(self) -> int:
+        """
+        Пересчитывает счетчики по коллекции лайков (по одной доле на фильм) и атомарно заменяет ими коллекцию
+        счетчиков ($out). Изменения счетчиков, пришедшие во время пересчета, будут потеряны.
+        :return: Количество фильмов со счетчиком
+        """
+
+        pipeline = [
+            {"$group": {"_id": "$movie_uid", "likes_count": {"$sum": 1}}},
+            {"$project": {"_id": 0, "movie_uid": "$_id", "shard": {"$literal": 0}, "likes_count": 1}},
+            {"$out": self._model.get_settings().name},
+        ]
+        await self._like_model.aggregate(pipeline, allowDiskUse=True).to_list()
+        return await self._model.count()
+
+    async def verify(self) -> dict[UUID, tuple[int, int]]:
+        """
+        Сравнивает суммы долей счетчиков с количеством документов лайков по каждому фильму
+        :return: Расхождения: ID фильма -> (значение счетчика, количество лайков)
+        """
+
+        count_pipeline = [{"$group": {"_id": "$movie_uid", "count": {"$sum": 1}}}]
+        counter_pipeline = [{"$group": {"_id": "$movie_uid", "count": {"$sum": "$likes_count"}}}]
+        likes = self._like_model.get_motor_collection().aggregate(count_pipeline, allowDiskUse=True)
+        counters = self._model.get_motor_collection().aggregate(counter_pipeline, allowDiskUse=True)
+        actual = {decode_uuid(group["_id"]): group["count"] async for group in likes}
+        counted = {decode_uuid(group["_id"]): group["count"] async for group in counters}
+        return {
+            movie_uid: (counted.get(movie_uid, 0), actual.get(movie_uid, 0))
+            for movie_uid in counted.keys() | actual.keys()
+            if counted.get(movie_uid, 0) != actual.get(movie_uid, 0)
+        }
+
+
+class InMemoryLikeCounterRepository(AbstractLikeCounterRepository):
+    """Распределенные счетчики лайков в памяти процесса"""
+
+    def __init__(self, like_repository: InMemoryLikeRepository, policy: ShardPolicy):
+        self._like_repository = like_repository
+        self._policy = policy
+        self._shards: dict[tuple[UUID, int], int] = {}
+
+    async def increment(self, movie_uid: UUID, count: int) -> None:
+        key = (movie_uid, random.randrange(self._policy.shards(movie_uid)))
+        self._shards[key] = self._shards.get(key, 0) + count
+
+    async def get_count(self, movie_uid: UUID) -> int:
+        return sum(count for (uid, _), count in self._shards.items() if uid == movie_uid)
+
+    async def get_counts(self, movie_uids: list[UUID]) -> dict[UUID, int]:
+        movie_uids = set(movie_uids)
+        counts = {}
+        for (movie_uid, _), count in self._shards.items():
+            if movie_uid in movie_uids:
+                counts[movie_uid] = counts.get(movie_uid, 0) + count
+        return counts
+
+    async def rebuild(self) -> int:
+        self._shards = {}
+        for like in self._like_repository._items.values():
+            key = (like.movie_uid, 0)
+            self._shards[key] = self._shards.get(key, 0) + 1
+        return len(self._shards)
+
+    async def verify(self) -> dict[UUID, tuple[int, int]]:
+        counted = await self.get_counts([movie_uid for movie_uid, _ in self._shards])
+        actual = {}
+        for like in self._like_repository._items.values():
+            actual[like.movie_uid] = actual.get(like.movie_uid, 0) + 1
+        return {
+            movie_uid: (counted.get(movie_uid, 0), actual.get(movie_uid, 0))
+            for movie_uid in counted.keys() | actual.keys()
+            if counted.get(movie_uid, 0) != actual.get(movie_uid, 0)
+        }
+
+
+like_shard_policy = ShardPolicy(
+    hot_writes_per_second=settings.like_counter.hot_writes_per_second,
+    max_shards=settings.like_counter.max_shards,
+    window=settings.like_counter.window,
+    cooldown=settings.like_counter.cooldown,
+    maxsize=settings.like_counter.tracked_movies,
+)
+
+
+def get_like_counter_repository() -> AbstractLikeCounterRepository:
+    return BeanieLikeCounterRepository(
+        model=MovieLikeCounterModel,
+        like_model=LikeModel,
+        policy=like_shard_policy,
+        read_preference=db.get_read_preference(),
+        increment_buffer=write_behind.get_increment_buffer(MovieLikeCounterModel),
+    )
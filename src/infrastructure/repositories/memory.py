@@ -0,0 +1,101 @@
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from bson import ObjectId
+from pymongo import DESCENDING
+from src.domain.pagination import Cursor
+from src.infrastructure.repositories.base import DEFAULT_SORT, AbstractRepository, T
+from src.infrastructure.repositories.exceptions import DuplicateItemError
+
+
+class InMemoryBaseRepository(AbstractRepository[T]):
+    """
+    Репозиторий в памяти процесса с той же семантикой, что и репозитории MongoDB:
+    уникальность (user_uid, movie_uid), порядок по умолчанию (created_at, id) по убыванию, keyset-пагинация.
+    Используется для измерения накладных расходов API без базы данных.
+    """
+
+    def __init__(self, domain_model: type[T]):
+        self._domain_model = domain_model
+        self._items: dict[str, T] = {}
+        self._by_user_and_movie: dict[tuple[UUID, UUID], str] = {}
+
+    @staticmethod
+    def _value(item: T | Cursor, field: str) -> Any:
+        return item.id if field == "_id" else getattr(item, field)
+
+    def _after(self, item: T, cursor: Cursor, sort: list[tuple[str, int]]) -> bool:
+        for field, direction in sort:
+            value, bound = self._value(item, field), self._value(cursor, field)
+            if value != bound:
+                return value < bound if direction == DESCENDING else value > bound
+        return False
+
+    def _page(
+        self,
+        items: list[T],
+        limit: int,
+        offset: int = 0,
+        cursor: Cursor | None = None,
+        sort: list[tuple[str, int]] = DEFAULT_SORT,
+    ) -> list[T]:
+        for field, direction in reversed(sort):
+            items = sorted(items, key=lambda item: self._value(item, field), reverse=direction == DESCENDING)
+        if cursor is not None:
+            items = [item for item in items if self._after(item, cursor, sort)]
+        return [item.model_copy() for item in items[offset : offset + limit]]
+
+    async def add(self, item: T) -> T:
+        key = (item.user_uid, item.movie_uid)
+        if key in self._by_user_and_movie:
+            raise DuplicateItemError(f"Документ {key} уже существует")
+        item = item.model_copy(update={"id": str(ObjectId())})
+        self._items[item.id] = item
+        self._by_user_and_movie[key] = item.id
+        return item.model_copy()
+
+    async def get_by_id(self, item_id: str) -> T | None:
+        item = self._items.get(item_id)
+        return item.model_copy() if item else None
+
+    async def get_by_user_id(
+        self, user_uid: UUID, limit: int = 10, offset: int = 0, cursor: Cursor | None = None
+    ) -> list[T]:
+        items = [item for item in self._items.values() if item.user_uid == user_uid]
+        return self._page(items, limit=limit, offset=offset, cursor=cursor)
+
+    async def iter_by_user_id(self, user_uid: UUID, batch_size: int = 1000) -> AsyncIterator[T]:
+        items = [item for item in self._items.values() if item.user_uid == user_uid]
+        for item in self._page(items, limit=len(items)):
+            yield item
+
+    async def get_movie_uids_by_user(self, user_uid: UUID, movie_uids: list[UUID]) -> set[UUID]:
+        return {movie_uid for movie_uid in movie_uids if (user_uid, movie_uid) in self._by_user_and_movie}
+
+    async def update(self, item: T) -> T | None:
+        if item.id not in self._items:
+            return None
+        self._items[item.id] = item.model_copy()
+        return item
+
+    async def delete(self, item_id: str) -> T | None:
+        item = self._items.pop(item_id, None)
+        if item is not None:
+            del self._by_user_and_movie[(item.user_uid, item.movie_uid)]
+        return item
+
+    async def update_by_owner(self, item_id: str, user_uid: UUID, fields: dict[str, Any]) -> tuple[T, T] | None:
+        previous = self._items.get(item_id)
+        if previous is None or previous.user_uid != user_uid:
+            return None
+        updated = previous.model_copy(update={**fields, "updated_at": datetime.now()})
+        self._items[item_id] = updated
+        return previous.model_copy(), updated.model_copy()
+
+    async def delete_by_owner(self, item_id: str, user_uid: UUID) -> T | None:
+        item = self._items.get(item_id)
+        if item is None or item.user_uid != user_uid:
+            return None
+        return await self.delete(item_id)
@@ -0,0 +1,131 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from uuid import UUID
+
+from pymongo import DESCENDING
+from pymongo.read_preferences import _ServerMode
+from src.domain.movie import TrendingMovie
+from src.infrastructure import db, metrics, write_behind
+from src.infrastructure.encoding import decode_uuid, encode_uuid
+from src.infrastructure.models import MovieActivityModel
+from src.infrastructure.write_behind import IncrementBuffer
+
+
+class AbstractMovieActivityRepository(ABC):
+
+    @abstractmethod
+    async def increment(
+        self, movie_uid: UUID, hour: datetime, likes_count: int = 0, reviews_count: int = 0
+    ) -> None: ...
+
+    @abstractmethod
+    async def get_top(self, since: datetime, limit: int) -> list[TrendingMovie]: ...
+
+
+@metrics.time_repository_methods
+class BeanieMovieActivityRepository(AbstractMovieActivityRepository):
+    """Репозиторий почасовых счетчиков активности по фильмам"""
+
+    def __init__(
+        self,
+        model: type[MovieActivityModel],
+        read_preference: _ServerMode | None = None,
+        increment_buffer: IncrementBuffer | None = None,
+    ):
+        """
+        :param model: Модель почасовых счетчиков
+        :param read_preference: Предпочтение чтения для get_top
+        :param increment_buffer: Буфер отложенных изменений счетчиков (по умолчанию - запись сразу)
+        """
+
+        self._model = model
+        self._read_preference = read_preference
+        self._increment_buffer = increment_buffer
+
+    async def increment(self, movie_uid: UUID, hour: datetime, likes_count: int = 0, reviews_count: int = 0) -> None:
+        """
+        Атомарно изменяет счетчики фильма за час ($inc). Документ часа создается (upsert) только увеличением:
+        уменьшение для часа без счетчика (например, удаленного по TTL) не создает отрицательный счетчик.
+        :param movie_uid: ID фильма
+        :param hour: Начало часа (UTC)
+        :param likes_count: Изменение количества лайков
+        :param reviews_count: Изменение количества рецензий
+        """
+
+        document_filter = {"movie_uid": encode_uuid(movie_uid), "hour": hour}
+        deltas = {"likes_count": likes_count, "reviews_count": reviews_count}
+        upsert = likes_count >= 0 and reviews_count >= 0
+        if self._increment_buffer is not None:
+            await self._increment_buffer.increment(document_filter, deltas, upsert=upsert)
+            return
+        await self._model.get_motor_collection().update_one(document_filter, {"$inc": deltas}, upsert=upsert)
+
+    async def get_top(self, since: datetime, limit: int) -> list[TrendingMovie]:
+        """
+        Фильмы с наибольшей активностью (лайки + рецензии) с начала часа since (UTC).
+        Сумма по часам и отбор первых limit выполняются в MongoDB ($group + $sort/$limit).
+        :param since: Начало первого часа окна
+        :param limit: Количество фильмов
+        :return: Фильмы по убыванию активности
+        """
+
+        pipeline = [
+            {"$match": {"hour": {"$gte": since}}},
+            {
+                "$group": {
+                    "_id": "$movie_uid",
+                    "likes_count": {"$sum": "$likes_count"},
+                    "reviews_count": {"$sum": "$reviews_count"},
+                }
+            },
+            {"$addFields": {"score": {"$add": ["$likes_count", "$reviews_count"]}}},
+            {"$match": {"score": {"$gt": 0}}},
+            {"$sort": {"score": DESCENDING, "_id": DESCENDING}},
+            {"$limit": limit},
+        ]
+        collection = self._model.get_motor_collection()
+        if self._read_preference is not None:
+            collection = collection.with_options(read_preference=self._read_preference)
+        groups = await collection.aggregate(pipeline, allowDiskUse=True).to_list(length=limit)
+        return [
+            TrendingMovie(
+                movie_uid=decode_uuid(group["_id"]),
+                likes_count=group["likes_count"],
+                reviews_count=group["reviews_count"],
+            )
+            for group in groups
+        ]
+
+
+class InMemoryMovieActivityRepository(AbstractMovieActivityRepository):
+    """Почасовые счетчики активности в памяти процесса"""
+
+    def __init__(self):
+        self._buckets: dict[tuple[UUID, datetime], TrendingMovie] = {}
+
+    async def increment(self, movie_uid: UUID, hour: datetime, likes_count: int = 0, reviews_count: int = 0) -> None:
+        bucket = self._buckets.get((movie_uid, hour))
+        if bucket is None:
+            if likes_count < 0 or reviews_count < 0:
+                return
+            bucket = self._buckets[(movie_uid, hour)] = TrendingMovie(movie_uid=movie_uid)
+        bucket.likes_count += likes_count
+        bucket.reviews_count += reviews_count
+
+    async def get_top(self, since: datetime, limit: int) -> list[TrendingMovie]:
+        totals: dict[UUID, TrendingMovie] = {}
+        for (movie_uid, hour), bucket in self._buckets.items():
+            if hour >= since:
+                total = totals.setdefault(movie_uid, TrendingMovie(movie_uid=movie_uid))
+                total.likes_count += bucket.likes_count
+                total.reviews_count += bucket.reviews_count
+        movies = sorted((movie for movie in totals.values() if movie.score > 0), key=lambda movie: movie.score)
+        return movies[::-1][:limit]
+
+
+def get_movie_activity_repository() -> AbstractMovieActivityRepository:
+    return BeanieMovieActivityRepository(
+        model=MovieActivityModel,
+        read_preference=db.get_read_preference(),
+        increment_buffer=write_behind.get_increment_buffer(MovieActivityModel),
+    )
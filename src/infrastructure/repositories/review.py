@@ -1,60 +1,215 @@
 from abc import ABC, abstractmethod
 from uuid import UUID
 
-from src.domain.review import Review
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+from src.core.config import settings
+from src.domain.pagination import Cursor, SearchCursor
+from src.domain.review import Review, ReviewSort, ScoredReview
+from src.infrastructure import bloom, db
+from src.infrastructure.encoding import decode_document, encode_value
 from src.infrastructure.models import ReviewModel
-from src.infrastructure.repositories.base import AbstractRepository, BeanieBaseRepository
+from src.infrastructure.repositories.base import DEFAULT_SORT, AbstractRepository, BeanieBaseRepository
+from src.infrastructure.repositories.memory import InMemoryBaseRepository
+
+# Каждому порядку соответствуют индексы movie_uid_*/user_uid_* модели ReviewModel с тем же набором полей:
+# возрастающие порядки читают индекс в обратном направлении, поэтому сортировки в памяти MongoDB не будет
+REVIEW_SORTS: dict[ReviewSort, list[tuple[str, int]]] = {
+    ReviewSort.NEWEST: DEFAULT_SORT,
+    ReviewSort.OLDEST: [("created_at", ASCENDING), ("_id", ASCENDING)],
+    ReviewSort.RATING_DESC: [("rating", DESCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+    ReviewSort.RATING_ASC: [("rating", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)],
+}
 
 
 class AbstractReviewRepository(AbstractRepository[Review], ABC):
 
     @abstractmethod
-    async def get_by_movie_id(self, movie_uid: UUID, limit: int = 10, offset: int = 0) -> list[Review]: ...
+    async def get_by_user_id(
+        self,
+        user_uid: UUID,
+        limit: int = 10,
+        offset: int = 0,
+        cursor: Cursor | None = None,
+        sort: ReviewSort = ReviewSort.NEWEST,
+    ) -> list[Review]: ...
 
     @abstractmethod
-    async def get_reviews_count_by_movie_id(self, movie_uid: UUID) -> int: ...
+    async def get_by_movie_id(
+        self,
+        movie_uid: UUID,
+        limit: int = 10,
+        offset: int = 0,
+        cursor: Cursor | None = None,
+        sort: ReviewSort = ReviewSort.NEWEST,
+    ) -> list[Review]: ...
 
     @abstractmethod
-    async def get_reviews_average_by_movie_id(self, movie_uid: UUID) -> float: ...
+    async def search(
+        self,
+        query: str,
+        limit: int = 10,
+        movie_uid: UUID | None = None,
+        rating_min: int | None = None,
+        rating_max: int | None = None,
+        cursor: SearchCursor | None = None,
+    ) -> list[ScoredReview]: ...
 
 
 class ReviewRepository(AbstractReviewRepository, BeanieBaseRepository[Review]):
     """Репозиторий для работы с рецензиями"""
 
-    async def get_by_movie_id(self, movie_uid: UUID, limit: int = 10, offset: int = 0) -> list[Review]:
+    async def get_by_user_id(
+        self,
+        user_uid: UUID,
+        limit: int = 10,
+        offset: int = 0,
+        cursor: Cursor | None = None,
+        sort: ReviewSort = ReviewSort.NEWEST,
+    ) -> list[Review]:
         """
-        Получение рецензий по ID фильма
-        :param movie_uid: ID фильма
+        Получение рецензий по ID пользователя
+        :param user_uid: ID пользователя
         :param limit: Количество рецензий
         :param offset: Сдвиг
+        :param cursor: Курсор последней рецензии предыдущей страницы
+        :param sort: Порядок рецензий
         :return: Список рецензий
         """
 
-        reviews = await self._model.find(self._model.movie_uid == movie_uid).skip(offset).limit(limit).to_list()
-        for review in reviews:
-            review.id = str(review.id)
-        return [self._domain_model.model_validate(review) for review in reviews]
+        return await self._find_user_page(user_uid, limit=limit, offset=offset, cursor=cursor, sort=REVIEW_SORTS[sort])
 
-    async def get_reviews_count_by_movie_id(self, movie_uid: UUID) -> int:
+    async def get_by_movie_id(
+        self,
+        movie_uid: UUID,
+        limit: int = 10,
+        offset: int = 0,
+        cursor: Cursor | None = None,
+        sort: ReviewSort = ReviewSort.NEWEST,
+    ) -> list[Review]:
         """
-        Получение количества рецензий по ID фильма
+        Получение рецензий по ID фильма
         :param movie_uid: ID фильма
-        :return: Количество рецензий
+        :param limit: Количество рецензий
+        :param offset: Сдвиг
+        :param cursor: Курсор последней рецензии предыдущей страницы
+        :param sort: Порядок рецензий
+        :return: Список рецензий
         """
 
-        reviews_count = await self._model.find(self._model.movie_uid == movie_uid).count()
-        return reviews_count
-
-    async def get_reviews_average_by_movie_id(self, movie_uid: UUID) -> float:
+        return await self._find_page(
+            {"movie_uid": movie_uid}, limit=limit, offset=offset, cursor=cursor, sort=REVIEW_SORTS[sort]
+        )
+
+    async def search(
+        self,
+        query: str,
+        limit: int = 10,
+        movie_uid: UUID | None = None,
+        rating_min: int | None = None,
+        rating_max: int | None = None,
+        cursor: SearchCursor | None = None,
+    ) -> list[ScoredReview]:
         """
-        Получение среднего рейтинга по ID фильма
+        Полнотекстовый поиск рецензий по текстовому индексу content_text, по убыванию релевантности.
+        Фильтры по фильму и оценке применяются к найденным по индексу документам.
+        :param query: Поисковый запрос (синтаксис $text: слова, "фразы", -исключения)
+        :param limit: Количество рецензий
         :param movie_uid: ID фильма
-        :return: Средний рейтинг
+        :param rating_min: Минимальная оценка
+        :param rating_max: Максимальная оценка
+        :param cursor: Курсор последней рецензии предыдущей страницы
+        :return: Список рецензий с релевантностью
         """
 
-        reviews_average = await self._model.find(self._model.movie_uid == movie_uid).avg(self._model.rating)
-        return reviews_average
+        filters = {"$text": {"$search": query}}
+        if movie_uid is not None:
+            filters["movie_uid"] = movie_uid
+        if rating_min is not None or rating_max is not None:
+            filters["rating"] = {}
+            if rating_min is not None:
+                filters["rating"]["$gte"] = rating_min
+            if rating_max is not None:
+                filters["rating"]["$lte"] = rating_max
+
+        pipeline = [{"$match": encode_value(filters)}, {"$addFields": {"score": {"$meta": "textScore"}}}]
+        if cursor is not None:
+            cursor_id = ObjectId(cursor.id)
+            pipeline.append(
+                {
+                    "$match": {
+                        "$or": [{"score": {"$lt": cursor.score}}, {"score": cursor.score, "_id": {"$lt": cursor_id}}]
+                    }
+                }
+            )
+        pipeline += [
+            {"$sort": {"score": DESCENDING, "_id": DESCENDING}},
+            {"$limit": limit},
+            {"$project": {**self._projection, "score": 1}},
+        ]
+        raw_documents = await self._read_collection.aggregate(pipeline).to_list(length=limit)
+        return [ScoredReview.model_validate(decode_document(raw)) for raw in raw_documents]
+
+
+class InMemoryReviewRepository(AbstractReviewRepository, InMemoryBaseRepository[Review]):
+    """Репозиторий рецензий в памяти процесса"""
+
+    def __init__(self):
+        super().__init__(domain_model=Review)
+
+    async def get_by_user_id(
+        self,
+        user_uid: UUID,
+        limit: int = 10,
+        offset: int = 0,
+        cursor: Cursor | None = None,
+        sort: ReviewSort = ReviewSort.NEWEST,
+    ) -> list[Review]:
+        reviews = [review for review in self._items.values() if review.user_uid == user_uid]
+        return self._page(reviews, limit=limit, offset=offset, cursor=cursor, sort=REVIEW_SORTS[sort])
+
+    async def get_by_movie_id(
+        self,
+        movie_uid: UUID,
+        limit: int = 10,
+        offset: int = 0,
+        cursor: Cursor | None = None,
+        sort: ReviewSort = ReviewSort.NEWEST,
+    ) -> list[Review]:
+        reviews = [review for review in self._items.values() if review.movie_uid == movie_uid]
+        return self._page(reviews, limit=limit, offset=offset, cursor=cursor, sort=REVIEW_SORTS[sort])
+
+    async def search(
+        self,
+        query: str,
+        limit: int = 10,
+        movie_uid: UUID | None = None,
+        rating_min: int | None = None,
+        rating_max: int | None = None,
+        cursor: SearchCursor | None = None,
+    ) -> list[ScoredReview]:
+        terms = query.lower().split()
+        hits = []
+        for review in self._items.values():
+            if movie_uid is not None and review.movie_uid != movie_uid:
+                continue
+            if rating_min is not None and review.rating < rating_min:
+                continue
+            if rating_max is not None and review.rating > rating_max:
+                continue
+            words = review.content.lower().split()
+            score = float(sum(words.count(term) for term in terms))
+            if score and (cursor is None or (score, review.id) < (cursor.score, cursor.id)):
+                hits.append(ScoredReview(**review.model_dump(), score=score))
+        hits.sort(key=lambda hit: (hit.score, hit.id), reverse=True)
+        return hits[:limit]
 
 
 def get_review_repository() -> AbstractReviewRepository:
-    return ReviewRepository(model=ReviewModel, domain_model=Review)
+    return ReviewRepository(
+        model=ReviewModel,
+        domain_model=Review,
+        raw_reads=settings.mongo.raw_reads,
+        read_preference=db.get_read_preference(),
+        membership_filter=bloom.get_filter(ReviewModel),
+    )
@@ -0,0 +1,130 @@
+from abc import ABC, abstractmethod
+from uuid import UUID
+
+from beanie.odm.operators.update.general import Inc
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.read_preferences import _ServerMode
+from src.domain.review import ReviewStats
+from src.infrastructure import db, metrics
+from src.infrastructure.encoding import decode_document, encode_uuid
+from src.infrastructure.models import MovieReviewStatsModel, ReviewModel
+from src.infrastructure.repositories.review import InMemoryReviewRepository
+
+
+class AbstractReviewStatsRepository(ABC):
+
+    @abstractmethod
+    async def get_by_movie_id(self, movie_uid: UUID) -> ReviewStats | None: ...
+
+    @abstractmethod
+    async def get_by_movie_ids(self, movie_uids: list[UUID]) -> dict[UUID, ReviewStats]: ...
+
+    @abstractmethod
+    async def increment(self, movie_uid: UUID, reviews_count: int = 0, rating_sum: int = 0) -> None: ...
+
+    @abstractmethod
+    async def rebuild(self) -> int: ...
+
+
+@metrics.time_repository_methods
+class BeanieReviewStatsRepository(AbstractReviewStatsRepository):
+    """Репозиторий для работы с агрегированной статистикой рецензий по фильмам"""
+
+    def __init__(
+        self,
+        model: type[MovieReviewStatsModel],
+        review_model: type[ReviewModel],
+        read_preference: _ServerMode | None = None,
+    ):
+        self._model = model
+        self._review_model = review_model
+        self._read_preference = read_preference
+
+    @property
+    def _read_collection(self) -> AsyncIOMotorCollection:
+        collection = self._model.get_motor_collection()
+        if self._read_preference is None:
+            return collection
+        return collection.with_options(read_preference=self._read_preference)
+
+    async def get_by_movie_id(self, movie_uid: UUID) -> ReviewStats | None:
+        """
+        Получение статистики рецензий по ID фильма
+        :param movie_uid: ID фильма
+        :return: Статистика рецензий
+        """
+
+        raw = await self._read_collection.find_one({"movie_uid": encode_uuid(movie_uid)})
+        if raw is None:
+            return None
+        return ReviewStats.model_validate(decode_document(raw))
+
+    async def get_by_movie_ids(self, movie_uids: list[UUID]) -> dict[UUID, ReviewStats]:
+        """
+        Получение статистики рецензий для списка фильмов одним запросом ($in по уникальному индексу)
+        :param movie_uids: ID фильмов
+        :return: Статистика рецензий по ID фильма (фильмы без рецензий отсутствуют)
+        """
+
+        raw_cursor = self._read_collection.find({"movie_uid": {"$in": [encode_uuid(uid) for uid in movie_uids]}})
+        stats = [ReviewStats.model_validate(decode_document(raw)) for raw in await raw_cursor.to_list(length=None)]
+        return {movie_stats.movie_uid: movie_stats for movie_stats in stats}
+
+    async def increment(self, movie_uid: UUID, reviews_count: int = 0, rating_sum: int = 0) -> None:
+        """
+        Атомарно изменяет статистику рецензий фильма ($inc с upsert)
+        :param movie_uid: ID фильма
+        :param reviews_count: Изменение количества рецензий
+        :param rating_sum: Изменение суммы оценок
+        """
+
+        await self._model.find_one(self._model.movie_uid == movie_uid).update(
+            Inc({self._model.reviews_count: reviews_count, self._model.rating_sum: rating_sum}), upsert=True
+        )
+
+    async def rebuild(self) -> int:
+        """
+        Пересчитывает статистику по коллекции рецензий и атомарно заменяет ею коллекцию статистики ($out).
+        Изменения статистики, пришедшие во время пересчета, будут потеряны.
+        :return: Количество фильмов в статистике
+        """
+
+        pipeline = [
+            {"$group": {"_id": "$movie_uid", "reviews_count": {"$sum": 1}, "rating_sum": {"$sum": "$rating"}}},
+            {"$project": {"_id": 0, "movie_uid": "$_id", "reviews_count": 1, "rating_sum": 1}},
+            {"$out": self._model.get_settings().name},
+        ]
+        await self._review_model.aggregate(pipeline, allowDiskUse=True).to_list()
+        return await self._model.count()
+
+
+class InMemoryReviewStatsRepository(AbstractReviewStatsRepository):
+    """Статистика рецензий в памяти процесса"""
+
+    def __init__(self, review_repository: InMemoryReviewRepository):
+        self._review_repository = review_repository
+        self._stats: dict[UUID, ReviewStats] = {}
+
+    async def get_by_movie_id(self, movie_uid: UUID) -> ReviewStats | None:
+        stats = self._stats.get(movie_uid)
+        return stats.model_copy() if stats else None
+
+    async def get_by_movie_ids(self, movie_uids: list[UUID]) -> dict[UUID, ReviewStats]:
+        return {movie_uid: self._stats[movie_uid].model_copy() for movie_uid in movie_uids if movie_uid in self._stats}
+
+    async def increment(self, movie_uid: UUID, reviews_count: int = 0, rating_sum: int = 0) -> None:
+        stats = self._stats.setdefault(movie_uid, ReviewStats(movie_uid=movie_uid))
+        stats.reviews_count += reviews_count
+        stats.rating_sum += rating_sum
+
+    async def rebuild(self) -> int:
+        self._stats = {}
+        for review in self._review_repository._items.values():
+            await self.increment(review.movie_uid, reviews_count=1, rating_sum=review.rating)
+        return len(self._stats)
+
+
+def get_review_stats_repository() -> AbstractReviewStatsRepository:
+    return BeanieReviewStatsRepository(
+        model=MovieReviewStatsModel, review_model=ReviewModel, read_preference=db.get_read_preference()
+    )
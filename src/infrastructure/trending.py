@@ -0,0 +1,60 @@
+import asyncio
+import logging
+from datetime import UTC, datetime
+
+from src.core.config import settings
+from src.domain.movie import TrendingMovie, TrendingWindow, activity_hour
+from src.infrastructure.repositories.movie_activity import AbstractMovieActivityRepository
+
+logger = logging.getLogger(__name__)
+
+
+class TrendingCache:
+    """
+    Популярные фильмы по окнам, пересчитываемые фоновой задачей из почасовых счетчиков активности.
+    Запросы читают готовые списки из памяти и не обращаются к MongoDB.
+    Окно включает текущий неполный час, поэтому фактически охватывает от окна до окна плюс час.
+    """
+
+    def __init__(self, size: int, refresh_interval: float):
+        self._size = size
+        self._refresh_interval = refresh_interval
+        self._top: dict[TrendingWindow, list[TrendingMovie]] = {}
+        self._task: asyncio.Task | None = None
+        self.refreshed_at: datetime | None = None
+
+    def get(self, window: TrendingWindow, limit: int) -> list[TrendingMovie]:
+        return self._top.get(window, [])[:limit]
+
+    async def refresh(self, repository: AbstractMovieActivityRepository) -> None:
+        """
+        Пересчитывает популярные фильмы для всех окон
+        :param repository: Репозиторий счетчиков активности
+        """
+
+        now = datetime.now(UTC)
+        top = {}
+        for window in TrendingWindow:
+            top[window] = await repository.get_top(since=activity_hour(now - window.duration), limit=self._size)
+        self._top = top
+        self.refreshed_at = now
+
+    def start(self, repository: AbstractMovieActivityRepository) -> None:
+        self._task = asyncio.create_task(self._run(repository))
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self, repository: AbstractMovieActivityRepository) -> None:
+        while True:
+            try:
+                await self.refresh(repository)
+            except Exception as e:
+                logger.exception(f"Ошибка при пересчете популярных фильмов: {e}")
+            await asyncio.sleep(self._refresh_interval)
+
+
+trending_cache = TrendingCache(size=settings.trending.size, refresh_interval=settings.trending.refresh_interval)
@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import time
+
+from beanie import Document
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, WriteError
+from src.infrastructure.metrics import WRITE_BEHIND_FLUSH_DURATION, WRITE_BEHIND_FLUSH_SIZE, WRITE_BEHIND_PENDING
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY_ERROR_CODE = 11000
+
+
+class WriteBehindBuffer:
+    """
+    Буфер отложенной записи: копит вставки документов и сбрасывает их в коллекцию неупорядоченным bulk_write,
+    когда накопилось batch_size документов или прошло flush_interval секунд с момента появления первого.
+    Каждый вызов insert завершается после записи своего документа или с ошибкой его записи.
+    """
+
+    def __init__(self, collection: AsyncIOMotorCollection, batch_size: int, flush_interval: float):
+        self._collection = collection
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._pending: list[tuple[dict, asyncio.Future]] = []
+        self._wakeup = asyncio.Event()
+        self._closed = False
+        self._task: asyncio.Task | None = None
+
+        self.flushes = 0
+        self.flushed_items = 0
+        self.last_flush_size = 0
+        self.flush_seconds_total = 0.0
+        self.flush_seconds_max = 0.0
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "pending": len(self._pending),
+            "flushes": self.flushes,
+            "flushed_items": self.flushed_items,
+            "last_flush_size": self.last_flush_size,
+            "avg_flush_size": self.flushed_items / self.flushes if self.flushes else 0.0,
+            "avg_flush_ms": self.flush_seconds_total / self.flushes * 1000 if self.flushes else 0.0,
+            "max_flush_ms": self.flush_seconds_max * 1000,
+        }
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Останавливает буфер, дождавшись записи всех накопленных документов"""
+
+        self._closed = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+
+    async def insert(self, document: dict) -> None:
+        """
+        Ставит документ в очередь на запись и ожидает подтверждения
+        :param document: Документ в формате BSON (с заполненным _id)
+        :raises DuplicateKeyError: Документ нарушает уникальный индекс
+        """
+
+        await self._enqueue(document)
+
+    async def _enqueue(self, item) -> None:
+        if self._closed:
+            raise RuntimeError("Буфер отложенной записи остановлен.")
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        WRITE_BEHIND_PENDING.labels(self._collection.name).set(len(self._pending))
+        if len(self._pending) == 1 or len(self._pending) >= self._batch_size:
+            self._wakeup.set()
+        await future
+
+    async def _run(self) -> None:
+        while self._pending or not self._closed:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            if len(self._pending) < self._batch_size and not self._closed:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self._flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch, self._pending = self._pending[: self._batch_size], self._pending[self._batch_size :]
+            WRITE_BEHIND_PENDING.labels(self._collection.name).set(len(self._pending))
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[tuple[dict, asyncio.Future]]) -> None:
+        started = time.perf_counter()
+        write_errors = {}
+        try:
+            await self._collection.bulk_write([InsertOne(document) for document, _ in batch], ordered=False)
+        except BulkWriteError as e:
+            write_errors = {error["index"]: error for error in e.details.get("writeErrors", [])}
+        except Exception as e:
+            logger.exception(f"Ошибка отложенной записи в коллекцию {self._collection.name}: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for index, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            error = write_errors.get(index)
+            if error is None:
+                future.set_result(None)
+            elif error["code"] == DUPLICATE_KEY_ERROR_CODE:
+                future.set_exception(DuplicateKeyError(error["errmsg"], error["code"], error))
+            else:
+                future.set_exception(WriteError(error["errmsg"], error["code"], error))
+
+        self._record_flush(len(batch), started)
+
+    def _record_flush(self, size: int, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        self.flushes += 1
+        self.flushed_items += size
+        self.last_flush_size = size
+        self.flush_seconds_total += elapsed
+        self.flush_seconds_max = max(self.flush_seconds_max, elapsed)
+        WRITE_BEHIND_FLUSH_SIZE.labels(self._collection.name).observe(size)
+        WRITE_BEHIND_FLUSH_DURATION.labels(self._collection.name).observe(elapsed)
+
+
+class IncrementBuffer(WriteBehindBuffer):
+    """
+    Буфер отложенных изменений счетчиков ($inc). Изменения одного документа (одинаковый фильтр), накопленные
+    за пакет, складываются в одно обновление (с upsert, если его запросил хотя бы один вызов),
+    и пакет пишется неупорядоченным bulk_write.
+    Каждый вызов increment завершается после записи своего обновления или с ошибкой его записи.
+    """
+
+    async def increment(self, document_filter: dict, deltas: dict[str, int], upsert: bool = True) -> None:
+        """
+        Ставит изменение счетчиков документа в очередь на запись и ожидает подтверждения
+        :param document_filter: Фильтр документа в формате BSON (значения должны быть хешируемыми)
+        :param deltas: Изменения полей счетчиков
+        :param upsert: Создать документ, если его нет
+        """
+
+        await self._enqueue((document_filter, deltas, upsert))
+
+    async def _flush(self, batch: list[tuple[tuple[dict, dict[str, int], bool], asyncio.Future]]) -> None:
+        started = time.perf_counter()
+        # ключ фильтра -> [фильтр, сумма изменений, upsert хотя бы одного вызова, ожидающие вызовы]
+        updates: dict[tuple, list] = {}
+        for (document_filter, deltas, upsert), future in batch:
+            update = updates.setdefault(tuple(sorted(document_filter.items())), [document_filter, {}, False, []])
+            for field, delta in deltas.items():
+                update[1][field] = update[1].get(field, 0) + delta
+            update[2] = update[2] or upsert
+            update[3].append(future)
+
+        operations, groups = [], []
+        for document_filter, total, upsert, futures in updates.values():
+            total = {field: delta for field, delta in total.items() if delta}
+            if not total:
+                for future in futures:
+                    future.set_result(None)
+                continue
+            operations.append(UpdateOne(document_filter, {"$inc": total}, upsert=upsert))
+            groups.append(futures)
+
+        write_errors = {}
+        try:
+            if operations:
+                await self._collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            write_errors = {error["index"]: error for error in e.details.get("writeErrors", [])}
+        except Exception as e:
+            logger.exception(f"Ошибка отложенной записи в коллекцию {self._collection.name}: {e}")
+            write_errors = {index: e for index in range(len(groups))}
+
+        for index, futures in enumerate(groups):
+            error = write_errors.get(index)
+            if isinstance(error, dict):
+                error = WriteError(error["errmsg"], error["code"], error)
+            for future in futures:
+                if future.done():
+                    continue
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+
+        self._record_flush(len(batch), started)
+
+
+buffers: dict[str, WriteBehindBuffer] = {}
+increment_buffers: dict[str, IncrementBuffer] = {}
+
+
+def get_buffer(model: type[Document]) -> WriteBehindBuffer | None:
+    return buffers.get(model.get_settings().name)
+
+
+def start_buffers(models: list[type[Document]], batch_size: int, flush_interval: float) -> None:
+    for model in models:
+        buffer = WriteBehindBuffer(model.get_motor_collection(), batch_size=batch_size, flush_interval=flush_interval)
+        buffer.start()
+        buffers[model.get_settings().name] = buffer
+
+
+def get_increment_buffer(model: type[Document]) -> IncrementBuffer | None:
+    return increment_buffers.get(model.get_settings().name)
+
+
+def start_increment_buffers(models: list[type[Document]], batch_size: int, flush_interval: float) -> None:
+    for model in models:
+        buffer = IncrementBuffer(model.get_motor_collection(), batch_size=batch_size, flush_interval=flush_interval)
+        buffer.start()
+        increment_buffers[model.get_settings().name] = buffer
+
+
+async def close_buffers() -> None:
+    """Дописывает накопленные документы и изменения счетчиков и останавливает все буферы"""
+
+    for registry in (buffers, increment_buffers):
+        for name, buffer in list(registry.items()):
+            await buffer.close()
+            logger.info(f"Буфер отложенной записи {name} остановлен: {buffer.stats()}")
+            del registry[name]
@@ -1,31 +1,82 @@
+import logging
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
 import sentry_sdk
-from beanie import init_beanie
 from fastapi import FastAPI
 from fastapi.responses import ORJSONResponse
 from httpx import AsyncClient
-from motor.motor_asyncio import AsyncIOMotorClient
 from sentry_sdk.integrations.fastapi import FastApiIntegration
+from src.api.admission import AdmissionMiddleware, admission_limiter
+from src.api.metrics import MetricsMiddleware
+from src.api.metrics import router as metrics_router
 from src.api.router import router as api_router
 from src.core.config import settings
-from src.infrastructure import db
+from src.infrastructure import bloom, db, write_behind
+from src.infrastructure.change_streams import change_stream_watcher
 from src.infrastructure.clients import http
-from src.infrastructure.models import BookmarkModel, LikeModel, ReviewModel
+from src.infrastructure.indexes import report_indexes
+from src.infrastructure.jwks import jwks_key_store
+from src.infrastructure.models import (
+    DOCUMENT_MODELS,
+    BookmarkModel,
+    LikeModel,
+    MovieActivityModel,
+    MovieLikeCounterModel,
+    ReviewModel,
+)
+from src.infrastructure.repositories.movie_activity import get_movie_activity_repository
+from src.infrastructure.trending import trending_cache
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI) -> AsyncGenerator[None]:
-    db.mongo_client = AsyncIOMotorClient(settings.mongo.connection_url)
-    await init_beanie(
-        database=db.mongo_client[settings.mongo.db_name],
-        document_models=[LikeModel, BookmarkModel, ReviewModel],
-    )
+    await db.init_db()
+    await report_indexes(DOCUMENT_MODELS)
     http.httpx_client = AsyncClient(timeout=5.0)
+    if settings.auth.mode == "local" and settings.auth.jwks_url:
+        jwks_key_store.start(http.httpx_client)
+    if settings.write_behind.enabled:
+        write_behind.start_buffers(
+            [LikeModel, BookmarkModel],
+            batch_size=settings.write_behind.batch_size,
+            flush_interval=settings.write_behind.flush_interval_ms / 1000,
+        )
+        write_behind.start_increment_buffers(
+            [MovieActivityModel, MovieLikeCounterModel],
+            batch_size=settings.write_behind.batch_size,
+            flush_interval=settings.write_behind.flush_interval_ms / 1000,
+        )
+
+    trending_cache.start(get_movie_activity_repository())
+    if settings.cache_invalidation.enabled:
+        change_stream_watcher.start([model.get_motor_collection() for model in (LikeModel, BookmarkModel, ReviewModel)])
+
+    if settings.bloom_filter.enabled and (settings.proect.workers > 1 or not settings.cache_invalidation.enabled):
+        logger.warning(
+            "Фильтры Блума не запущены: нужны один процесс (WEB_CONCURRENCY=1) и потоки изменений "
+            "(CACHE_INVALIDATION_ENABLED), иначе фильтр пропускает чужие записи."
+        )
+    elif settings.bloom_filter.enabled:
+        bloom.start_filters(
+            [LikeModel, BookmarkModel, ReviewModel],
+            capacity=settings.bloom_filter.capacity,
+            error_rate=settings.bloom_filter.error_rate,
+            max_bytes=settings.bloom_filter.max_memory_mb * 2**20,
+            rebuild_interval=settings.bloom_filter.rebuild_interval,
+            batch_size=settings.bloom_filter.batch_size,
+            watching_since=change_stream_watcher.watching_since,
+        )
 
     yield
 
+    await change_stream_watcher.close()
+    await jwks_key_store.close()
+    await trending_cache.close()
+    await bloom.close_filters()
+    await write_behind.close_buffers()
     await http.httpx_client.aclose()
 
 
@@ -40,6 +91,15 @@ def create_app() -> FastAPI:
         response_class=ORJSONResponse,
     )
     app.include_router(api_router)
+    app.include_router(metrics_router)
+    if settings.admission.enabled:
+        app.add_middleware(
+            AdmissionMiddleware,
+            routes=app.routes,
+            limiter=admission_limiter,
+            retry_after=settings.admission.retry_after,
+        )
+    app.add_middleware(MetricsMiddleware)
     return app
 
 
@@ -0,0 +1,155 @@
+import asyncio
+import heapq
+from abc import ABC, abstractmethod
+from collections import deque
+from uuid import UUID
+
+from fastapi import Depends
+from pydantic import BaseModel
+from src.domain.activity import Activity, ActivityType
+from src.domain.movie import MovieMembership
+from src.domain.pagination import Cursor
+from src.infrastructure.repositories.base import AbstractRepository
+from src.infrastructure.repositories.bookmark import AbstractBookmarkRepository, get_bookmark_repository
+from src.infrastructure.repositories.like import AbstractLikeRepository, get_like_repository
+from src.infrastructure.repositories.review import AbstractReviewRepository, get_review_repository
+
+
+class AbstractActivityService(ABC):
+    @abstractmethod
+    async def get_user_activity(
+        self, user_uid: UUID, limit: int = 20, cursor: Cursor | None = None
+    ) -> list[Activity]: ...
+
+    @abstractmethod
+    async def get_movies_membership(self, user_uid: UUID, movie_uids: list[UUID]) -> list[MovieMembership]: ...
+
+
+class ActivitySource:
+    """
+    Лента одной коллекции пользователя (новые первыми), читаемая страницами keyset-пагинации по индексу
+    user_uid_created_at_id. Прочитанные, но еще не выданные документы держатся в буфере.
+    """
+
+    def __init__(
+        self, activity_type: ActivityType, repository: AbstractRepository, user_uid: UUID, cursor: Cursor | None
+    ):
+        self.activity_type = activity_type
+        self.buffer: deque[BaseModel] = deque()
+        self.exhausted = False
+        self._repository = repository
+        self._user_uid = user_uid
+        self._cursor = cursor
+
+    async def fetch(self, limit: int) -> None:
+        """
+        Дочитывает в буфер следующую страницу коллекции
+        :param limit: Количество документов
+        """
+
+        items = await self._repository.get_by_user_id(user_uid=self._user_uid, limit=limit, cursor=self._cursor)
+        self.exhausted = len(items) < limit
+        if items:
+            self._cursor = Cursor.from_item(items[-1])
+        self.buffer.extend(items)
+
+    def pop(self) -> "ActivityEntry":
+        item = self.buffer.popleft()
+        return ActivityEntry(key=(item.created_at, item.id), source=self, item=item)
+
+
+class ActivityEntry:
+    """Элемент кучи слияния: сравнение обратное, чтобы на вершине min-кучи был самый новый документ"""
+
+    __slots__ = ("key", "source", "item")
+
+    def __init__(self, key: tuple, source: ActivitySource, item: BaseModel):
+        self.key = key
+        self.source = source
+        self.item = item
+
+    def __lt__(self, other: "ActivityEntry") -> bool:
+        return self.key > other.key
+
+
+class ActivityService(AbstractActivityService):
+    """Сервис ленты активности пользователя"""
+
+    def __init__(
+        self,
+        like_repository: AbstractLikeRepository,
+        bookmark_repository: AbstractBookmarkRepository,
+        review_repository: AbstractReviewRepository,
+    ):
+        self._repositories: dict[ActivityType, AbstractRepository] = {
+            ActivityType.LIKE: like_repository,
+            ActivityType.BOOKMARK: bookmark_repository,
+            ActivityType.REVIEW: review_repository,
+        }
+
+    async def get_user_activity(self, user_uid: UUID, limit: int = 20, cursor: Cursor | None = None) -> list[Activity]:
+        """
+        Получает лайки, закладки и рецензии пользователя одной лентой, новые первыми.
+        Коллекции читаются параллельно по limit / 3 документов и сливаются кучей; коллекция, буфер которой
+        опустел раньше заполнения страницы, дочитывается ровно на недостающее количество документов.
+        Порядок (created_at, _id) общий для всех коллекций, поэтому курсор ленты применяется к каждой из них.
+        :param user_uid: ID пользователя
+        :param limit: Количество документов
+        :param cursor: Курсор последнего документа предыдущей страницы
+        :return: Список действий пользователя
+        """
+
+        sources = [
+            ActivitySource(activity_type, repository, user_uid, cursor)
+            for activity_type, repository in self._repositories.items()
+        ]
+        await asyncio.gather(*(source.fetch(-(-limit // len(sources))) for source in sources))
+        heap = [source.pop() for source in sources if source.buffer]
+        heapq.heapify(heap)
+
+        activity = []
+        while heap and len(activity) < limit:
+            entry = heapq.heappop(heap)
+            activity.append(Activity.model_construct(type=entry.source.activity_type, **dict(entry.item)))
+            source = entry.source
+            if not source.buffer and not source.exhausted and len(activity) < limit:
+                await source.fetch(limit - len(activity))
+            if source.buffer:
+                heapq.heappush(heap, source.pop())
+        return activity
+
+    async def get_movies_membership(self, user_uid: UUID, movie_uids: list[UUID]) -> list[MovieMembership]:
+        """
+        Определяет для списка фильмов, поставил ли пользователь лайк, добавил закладку и написал рецензию.
+        По каждой коллекции выполняется один покрытый индексом запрос, коллекции опрашиваются параллельно.
+        :param user_uid: ID пользователя
+        :param movie_uids: ID фильмов
+        :return: Признаки по фильмам в порядке запроса
+        """
+
+        movie_uids = list(dict.fromkeys(movie_uids))
+        liked, bookmarked, reviewed = await asyncio.gather(
+            *(
+                self._repositories[activity_type].get_movie_uids_by_user(user_uid, movie_uids)
+                for activity_type in (ActivityType.LIKE, ActivityType.BOOKMARK, ActivityType.REVIEW)
+            )
+        )
+        return [
+            MovieMembership(
+                movie_uid=movie_uid,
+                liked=movie_uid in liked,
+                bookmarked=movie_uid in bookmarked,
+                reviewed=movie_uid in reviewed,
+            )
+            for movie_uid in movie_uids
+        ]
+
+
+def get_activity_service(
+    like_repository: AbstractLikeRepository = Depends(get_like_repository),
+    bookmark_repository: AbstractBookmarkRepository = Depends(get_bookmark_repository),
+    review_repository: AbstractReviewRepository = Depends(get_review_repository),
+) -> AbstractActivityService:
+    return ActivityService(
+        like_repository=like_repository, bookmark_repository=bookmark_repository, review_repository=review_repository
+    )
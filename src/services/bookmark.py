@@ -1,10 +1,13 @@
 from abc import ABC, abstractmethod
+from typing import NoReturn
 from uuid import UUID
 
 from fastapi import Depends, HTTPException
 from pydantic import ValidationError
 from src.domain.bookmark import Bookmark
+from src.domain.pagination import Cursor
 from src.infrastructure.repositories.bookmark import AbstractBookmarkRepository, get_bookmark_repository
+from src.infrastructure.repositories.exceptions import DuplicateItemError
 
 
 class AbstractBookmarkService(ABC):
@@ -15,7 +18,9 @@ class AbstractBookmarkService(ABC):
     async def get_bookmark_by_id(self, bookmark_id: str, user_uid: UUID) -> Bookmark: ...
 
     @abstractmethod
-    async def get_bookmarks_by_user_id(self, user_uid: UUID, limit: int = 10, offset: int = 0) -> list[Bookmark]: ...
+    async def get_bookmarks_by_user_id(
+        self, user_uid: UUID, limit: int = 10, offset: int = 0, cursor: Cursor | None = None
+    ) -> list[Bookmark]: ...
 
     @abstractmethod
     async def delete_bookmark(self, bookmark_id: str, user_uid: UUID) -> Bookmark: ...
@@ -38,11 +43,11 @@ class BookmarkService(AbstractBookmarkService):
         except ValidationError as e:
             raise HTTPException(status_code=400, detail=str(e))
 
-        if await self._repository.get_by_user_and_movie_uid(bookmark.user_uid, bookmark.movie_uid):
+        try:
+            return await self._repository.add(bookmark)
+        except DuplicateItemError:
             raise HTTPException(status_code=400, detail="Закладка уже существует.")
 
-        return await self._repository.add(bookmark)
-
     async def get_bookmark_by_id(self, bookmark_id: str, user_uid: UUID) -> Bookmark:
         """
         Получает закладку по ID
@@ -64,16 +69,19 @@ class BookmarkService(AbstractBookmarkService):
 
         return bookmark
 
-    async def get_bookmarks_by_user_id(self, user_uid: UUID, limit: int = 10, offset: int = 0) -> list[Bookmark]:
+    async def get_bookmarks_by_user_id(
+        self, user_uid: UUID, limit: int = 10, offset: int = 0, cursor: Cursor | None = None
+    ) -> list[Bookmark]:
         """
         Получает закладки по ID пользователя
         :param user_id: ID пользователя
         :param limit: Количество закладок
         :param offset: Сдвиг
+        :param cursor: Курсор последнего элемента предыдущей страницы
         :return: Список закладок
         """
 
-        return await self._repository.get_by_user_id(user_uid=user_uid, limit=limit, offset=offset)
+        return await self._repository.get_by_user_id(user_uid=user_uid, limit=limit, offset=offset, cursor=cursor)
 
     async def delete_bookmark(self, bookmark_id: str, user_uid: UUID) -> Bookmark:
         """
@@ -83,14 +91,25 @@ class BookmarkService(AbstractBookmarkService):
         :return: Удаленная закладка
         """
 
-        bookmark = await self._repository.get_by_id(bookmark_id)
+        bookmark = await self._repository.delete_by_owner(item_id=bookmark_id, user_uid=user_uid)
         if bookmark is None:
-            raise HTTPException(status_code=404, detail="Закладка не найдена.")
+            await self._raise_access_error(bookmark_id)
+        return bookmark
 
-        if bookmark.user_uid != user_uid:
-            raise HTTPException(status_code=403, detail="У вас нет доступа к этой закладке.")
+    async def _raise_access_error(self, bookmark_id: str) -> NoReturn:
+        """
+        Определяет причину неудачи операции владельца: закладка не найдена или принадлежит другому пользователю
+        :param bookmark_id: ID закладки
+        """
+
+        try:
+            bookmark = await self._repository.get_by_id(bookmark_id)
+        except ValidationError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-        return await self._repository.delete(bookmark_id)
+        if bookmark is None:
+            raise HTTPException(status_code=404, detail="Закладка не найдена.")
+        raise HTTPException(status_code=403, detail="У вас нет доступа к этой закладке.")
 
 
 def get_bookmark_service(
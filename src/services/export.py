@@ -0,0 +1,63 @@
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from uuid import UUID
+
+import orjson
+from fastapi import Depends
+from src.infrastructure.repositories.base import AbstractRepository
+from src.infrastructure.repositories.bookmark import AbstractBookmarkRepository, get_bookmark_repository
+from src.infrastructure.repositories.like import AbstractLikeRepository, get_like_repository
+from src.infrastructure.repositories.review import AbstractReviewRepository, get_review_repository
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+class AbstractExportService(ABC):
+    @abstractmethod
+    def export_user_activity(self, user_uid: UUID) -> AsyncIterator[bytes]: ...
+
+
+class ExportService(AbstractExportService):
+    """Сервис выгрузки активности пользователя"""
+
+    def __init__(
+        self,
+        like_repository: AbstractLikeRepository,
+        bookmark_repository: AbstractBookmarkRepository,
+        review_repository: AbstractReviewRepository,
+    ):
+        self._repositories: dict[str, AbstractRepository] = {
+            "like": like_repository,
+            "bookmark": bookmark_repository,
+            "review": review_repository,
+        }
+
+    async def export_user_activity(self, user_uid: UUID) -> AsyncIterator[bytes]:
+        """
+        Выгружает лайки, закладки и рецензии пользователя в формате NDJSON: одна строка - один документ
+        с полем type. Строки сериализуются по одной и отдаются блоками по EXPORT_CHUNK_SIZE,
+        поэтому расход памяти не зависит от количества документов.
+        :param user_uid: ID пользователя
+        :return: Асинхронный итератор блоков NDJSON
+        """
+
+        chunk = bytearray()
+        for item_type, repository in self._repositories.items():
+            async for item in repository.iter_by_user_id(user_uid, batch_size=EXPORT_BATCH_SIZE):
+                chunk += orjson.dumps({"type": item_type, **item.model_dump()}, option=orjson.OPT_APPEND_NEWLINE)
+                if len(chunk) >= EXPORT_CHUNK_SIZE:
+                    yield bytes(chunk)
+                    chunk.clear()
+        if chunk:
+            yield bytes(chunk)
+
+
+def get_export_service(
+    like_repository: AbstractLikeRepository = Depends(get_like_repository),
+    bookmark_repository: AbstractBookmarkRepository = Depends(get_bookmark_repository),
+    review_repository: AbstractReviewRepository = Depends(get_review_repository),
+) -> AbstractExportService:
+    return ExportService(
+        like_repository=like_repository, bookmark_repository=bookmark_repository, review_repository=review_repository
+    )
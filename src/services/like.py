@@ -1,9 +1,20 @@
+import asyncio
 from abc import ABC, abstractmethod
+from typing import NoReturn
 from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 from src.domain.like import Like
+from src.domain.movie import activity_hour
+from src.domain.pagination import Cursor
+from src.infrastructure.cache import response_cache
+from src.infrastructure.repositories.exceptions import DuplicateItemError
 from src.infrastructure.repositories.like import AbstractLikeRepository, get_like_repository
+from src.infrastructure.repositories.like_counter import AbstractLikeCounterRepository, get_like_counter_repository
+from src.infrastructure.repositories.movie_activity import (
+    AbstractMovieActivityRepository,
+    get_movie_activity_repository,
+)
 
 
 class AbstractLikeService(ABC):
@@ -14,7 +25,9 @@ class AbstractLikeService(ABC):
     async def get_like_by_id(self, like_id: str, user_uid: UUID) -> Like: ...
 
     @abstractmethod
-    async def get_likes_by_user_id(self, user_uid: UUID, limit: int = 10, offset: int = 0) -> list[Like]: ...
+    async def get_likes_by_user_id(
+        self, user_uid: UUID, limit: int = 10, offset: int = 0, cursor: Cursor | None = None
+    ) -> list[Like]: ...
 
     @abstractmethod
     async def delete_like(self, like_id: str, user_uid: UUID) -> Like: ...
@@ -24,8 +37,15 @@ class AbstractLikeService(ABC):
 
 
 class LikeService(AbstractLikeService):
-    def __init__(self, repository: AbstractLikeRepository):
+    def __init__(
+        self,
+        repository: AbstractLikeRepository,
+        activity_repository: AbstractMovieActivityRepository,
+        counter_repository: AbstractLikeCounterRepository,
+    ):
         self._repository = repository
+        self._activity_repository = activity_repository
+        self._counter_repository = counter_repository
 
     async def create_like(self, user_uid: UUID, movie_uid: UUID) -> Like:
         """Создать лайк
@@ -34,13 +54,18 @@ class LikeService(AbstractLikeService):
         :return: Созданный лайк.
         """
 
-        like = await self._repository.get_by_user_and_movie_uid(user_uid=user_uid, movie_uid=movie_uid)
-
-        if like:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Лайк уже существует")
-
         like = Like(user_uid=user_uid, movie_uid=movie_uid)
-        like_response = await self._repository.add(item=like)
+        try:
+            like_response = await self._repository.add(item=like)
+        except DuplicateItemError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Лайк уже существует")
+        await asyncio.gather(
+            self._activity_repository.increment(
+                movie_uid=movie_uid, hour=activity_hour(like_response.created_at), likes_count=1
+            ),
+            self._counter_repository.increment(movie_uid=movie_uid, count=1),
+        )
+        response_cache.invalidate(movie_uid)
         return like_response
 
     async def get_like_by_id(self, like_id: str, user_uid: UUID) -> Like:
@@ -61,16 +86,19 @@ class LikeService(AbstractLikeService):
 
         return like
 
-    async def get_likes_by_user_id(self, user_uid: UUID, limit: int = 10, offset: int = 0) -> list[Like]:
+    async def get_likes_by_user_id(
+        self, user_uid: UUID, limit: int = 10, offset: int = 0, cursor: Cursor | None = None
+    ) -> list[Like]:
         """
         Получить лайки пользователя
         :param user_uid: UUID пользователя
         :param limit: Количество лайков
         :param offset: Сдвиг
+        :param cursor: Курсор последнего элемента предыдущей страницы
         :return: Список лайков
         """
 
-        return await self._repository.get_by_user_id(user_uid=user_uid, limit=limit, offset=offset)
+        return await self._repository.get_by_user_id(user_uid=user_uid, limit=limit, offset=offset, cursor=cursor)
 
     async def delete_like(self, like_id: str, user_uid: UUID) -> Like:
         """
@@ -80,25 +108,41 @@ class LikeService(AbstractLikeService):
         :return: Удаленный лайк
         """
 
-        like = await self._repository.get_by_id(like_id)
-
+        like = await self._repository.delete_by_owner(item_id=like_id, user_uid=user_uid)
         if like is None:
-            raise HTTPException(status_code=404, detail="Лайк не найден.")
+            await self._raise_access_error(like_id)
+        await asyncio.gather(
+            self._activity_repository.increment(
+                movie_uid=like.movie_uid, hour=activity_hour(like.created_at), likes_count=-1
+            ),
+            self._counter_repository.increment(movie_uid=like.movie_uid, count=-1),
+        )
+        response_cache.invalidate(like.movie_uid)
+        return like
 
-        if like.user_uid != user_uid:
-            raise HTTPException(status_code=403, detail="Нет доступа.")
+    async def _raise_access_error(self, like_id: str) -> NoReturn:
+        """
+        Определяет причину неудачи операции владельца: лайк не найден или принадлежит другому пользователю
+        :param like_id: ID лайка
+        """
 
-        return await self._repository.delete(item_id=like_id)
+        if await self._repository.get_by_id(like_id) is None:
+            raise HTTPException(status_code=404, detail="Лайк не найден.")
+        raise HTTPException(status_code=403, detail="Нет доступа.")
 
     async def get_likes_count_by_movie_id(self, movie_uid: UUID) -> int:
         """
-        Получить количество лайков по ID фильма
+        Получить количество лайков по ID фильма из распределенного счетчика
         :param movie_uid: ID фильма
         :return: Количество лайков
         """
 
-        return await self._repository.get_likes_count_by_movie_id(movie_uid)
+        return await self._counter_repository.get_count(movie_uid)
 
 
-def get_like_service(repository: AbstractLikeRepository = Depends(get_like_repository)) -> AbstractLikeService:
-    return LikeService(repository)
+def get_like_service(
+    repository: AbstractLikeRepository = Depends(get_like_repository),
+    activity_repository: AbstractMovieActivityRepository = Depends(get_movie_activity_repository),
+    counter_repository: AbstractLikeCounterRepository = Depends(get_like_counter_repository),
+) -> AbstractLikeService:
+    return LikeService(repository, activity_repository, counter_repository)
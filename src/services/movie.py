@@ -0,0 +1,75 @@
+import asyncio
+from abc import ABC, abstractmethod
+from uuid import UUID
+
+from fastapi import Depends
+from src.domain.movie import MovieStats, TrendingMovie, TrendingWindow
+from src.infrastructure.repositories.like_counter import AbstractLikeCounterRepository, get_like_counter_repository
+from src.infrastructure.repositories.review_stats import AbstractReviewStatsRepository, get_review_stats_repository
+from src.infrastructure.trending import trending_cache
+
+
+class AbstractMovieService(ABC):
+    @abstractmethod
+    async def get_movies_stats(self, movie_uids: list[UUID]) -> list[MovieStats]: ...
+
+    @abstractmethod
+    async def get_trending(self, window: TrendingWindow, limit: int) -> list[TrendingMovie]: ...
+
+
+class MovieService(AbstractMovieService):
+    """Сервис для работы со статистикой фильмов"""
+
+    def __init__(
+        self,
+        like_counter_repository: AbstractLikeCounterRepository,
+        review_stats_repository: AbstractReviewStatsRepository,
+    ):
+        self._like_counter_repository = like_counter_repository
+        self._review_stats_repository = review_stats_repository
+
+    async def get_movies_stats(self, movie_uids: list[UUID]) -> list[MovieStats]:
+        """
+        Получение статистики (лайки, рецензии, средний рейтинг) для списка фильмов
+        :param movie_uids: ID фильмов
+        :return: Статистика фильмов в порядке запроса
+        """
+
+        movie_uids = list(dict.fromkeys(movie_uids))
+        likes_counts, reviews_stats = await asyncio.gather(
+            self._like_counter_repository.get_counts(movie_uids),
+            self._review_stats_repository.get_by_movie_ids(movie_uids),
+        )
+
+        movies_stats = []
+        for movie_uid in movie_uids:
+            review_stats = reviews_stats.get(movie_uid)
+            average = review_stats.average if review_stats else None
+            movies_stats.append(
+                MovieStats(
+                    movie_uid=movie_uid,
+                    likes_count=likes_counts.get(movie_uid, 0),
+                    reviews_count=review_stats.reviews_count if review_stats else 0,
+                    average=round(average, 1) if average is not None else None,
+                )
+            )
+        return movies_stats
+
+    async def get_trending(self, window: TrendingWindow, limit: int) -> list[TrendingMovie]:
+        """
+        Получение популярных фильмов за окно из списков, пересчитываемых в фоне
+        :param window: Окно
+        :param limit: Количество фильмов
+        :return: Фильмы по убыванию количества лайков и рецензий
+        """
+
+        return trending_cache.get(window, limit)
+
+
+def get_movie_service(
+    like_counter_repository: AbstractLikeCounterRepository = Depends(get_like_counter_repository),
+    review_stats_repository: AbstractReviewStatsRepository = Depends(get_review_stats_repository),
+) -> AbstractMovieService:
+    return MovieService(
+        like_counter_repository=like_counter_repository, review_stats_repository=review_stats_repository
+    )
@@ -1,9 +1,19 @@
 from abc import ABC, abstractmethod
+from typing import NoReturn
 from uuid import UUID
 
 from fastapi import Depends, HTTPException
-from src.domain.review import Review
+from src.domain.movie import activity_hour
+from src.domain.pagination import Cursor, SearchCursor
+from src.domain.review import Review, ReviewSort, ScoredReview
+from src.infrastructure.cache import response_cache
+from src.infrastructure.repositories.exceptions import DuplicateItemError
+from src.infrastructure.repositories.movie_activity import (
+    AbstractMovieActivityRepository,
+    get_movie_activity_repository,
+)
 from src.infrastructure.repositories.review import AbstractReviewRepository, get_review_repository
+from src.infrastructure.repositories.review_stats import AbstractReviewStatsRepository, get_review_stats_repository
 
 
 class AbstractReviewService(ABC):
@@ -14,10 +24,35 @@ class AbstractReviewService(ABC):
     async def get_review_by_id(self, review_id: UUID) -> Review: ...
 
     @abstractmethod
-    async def get_reviews_by_user_id(self, user_uid: UUID, limit: int = 10, offset: int = 0) -> list[Review]: ...
+    async def get_reviews_by_user_id(
+        self,
+        user_uid: UUID,
+        limit: int = 10,
+        offset: int = 0,
+        cursor: Cursor | None = None,
+        sort: ReviewSort = ReviewSort.NEWEST,
+    ) -> list[Review]: ...
 
     @abstractmethod
-    async def get_reviews_by_movie_id(self, movie_uid: UUID, limit: int = 10, offset: int = 0) -> list[Review]: ...
+    async def get_reviews_by_movie_id(
+        self,
+        movie_uid: UUID,
+        limit: int = 10,
+        offset: int = 0,
+        cursor: Cursor | None = None,
+        sort: ReviewSort = ReviewSort.NEWEST,
+    ) -> list[Review]: ...
+
+    @abstractmethod
+    async def search_reviews(
+        self,
+        query: str,
+        limit: int = 10,
+        movie_uid: UUID | None = None,
+        rating_min: int | None = None,
+        rating_max: int | None = None,
+        cursor: SearchCursor | None = None,
+    ) -> list[ScoredReview]: ...
 
     @abstractmethod
     async def get_reviews_count_by_movie_id(self, movie_uid: UUID) -> int: ...
@@ -26,17 +61,26 @@ class AbstractReviewService(ABC):
     async def get_reviews_average_by_movie_id(self, movie_uid: UUID) -> float: ...
 
     @abstractmethod
-    async def update_review(self, review_id: UUID, user_uid: UUID, rating: int, content: str) -> Review: ...
+    async def update_review(
+        self, review_id: UUID, user_uid: UUID, rating: int | None = None, content: str | None = None
+    ) -> Review: ...
 
     @abstractmethod
-    async def delete_review(self, review_id: UUID) -> None: ...
+    async def delete_review(self, review_id: UUID, user_uid: UUID) -> None: ...
 
 
 class ReviewService(AbstractReviewService):
     """Сервис для работы с рецензиями"""
 
-    def __init__(self, repository: AbstractReviewRepository):
+    def __init__(
+        self,
+        repository: AbstractReviewRepository,
+        stats_repository: AbstractReviewStatsRepository,
+        activity_repository: AbstractMovieActivityRepository,
+    ):
         self._repository = repository
+        self._stats_repository = stats_repository
+        self._activity_repository = activity_repository
 
     async def create_review(self, user_uid: UUID, movie_uid: UUID, rating: int, content: str) -> Review:
         """
@@ -49,10 +93,15 @@ class ReviewService(AbstractReviewService):
         """
 
         review = Review.create(movie_uid=movie_uid, user_uid=user_uid, rating=rating, content=content)
-        review_is_exists = await self._repository.get_by_user_and_movie_uid(user_uid=user_uid, movie_uid=movie_uid)
-        if review_is_exists:
+        try:
+            review_created = await self._repository.add(item=review)
+        except DuplicateItemError:
             raise HTTPException(status_code=400, detail="Оценка уже существует.")
-        review_created = await self._repository.add(item=review)
+        await self._stats_repository.increment(movie_uid=movie_uid, reviews_count=1, rating_sum=review_created.rating)
+        await self._activity_repository.increment(
+            movie_uid=movie_uid, hour=activity_hour(review_created.created_at), reviews_count=1
+        )
+        response_cache.invalidate(movie_uid)
         return review_created
 
     async def get_review_by_id(self, review_id: UUID) -> Review:
@@ -67,28 +116,86 @@ class ReviewService(AbstractReviewService):
             raise HTTPException(status_code=404, detail="Рецензия не найдена.")
         return review
 
-    async def get_reviews_by_user_id(self, user_uid: UUID, limit: int = 10, offset: int = 0) -> list[Review]:
+    async def get_reviews_by_user_id(
+        self,
+        user_uid: UUID,
+        limit: int = 10,
+        offset: int = 0,
+        cursor: Cursor | None = None,
+        sort: ReviewSort = ReviewSort.NEWEST,
+    ) -> list[Review]:
         """
         Получение рецензий по ID пользователя
         :param user_uid: ID пользователя
         :param limit: Количество рецензий
         :param offset: Сдвиг
+        :param cursor: Курсор последнего элемента предыдущей страницы
+        :param sort: Порядок рецензий
         :return: Список рецензий
+        :raises HTTPException: Курсор не подходит для сортировки по оценке
         """
 
-        reviews = await self._repository.get_by_user_id(user_uid=user_uid, limit=limit, offset=offset)
+        self._check_cursor(cursor, sort)
+        reviews = await self._repository.get_by_user_id(
+            user_uid=user_uid, limit=limit, offset=offset, cursor=cursor, sort=sort
+        )
         return reviews
 
-    async def get_reviews_by_movie_id(self, movie_uid: UUID, limit: int = 10, offset: int = 0) -> list[Review]:
+    async def get_reviews_by_movie_id(
+        self,
+        movie_uid: UUID,
+        limit: int = 10,
+        offset: int = 0,
+        cursor: Cursor | None = None,
+        sort: ReviewSort = ReviewSort.NEWEST,
+    ) -> list[Review]:
         """
         Получение рецензий по ID фильма
         :param movie_uid: ID фильма
         :param limit: Количество рецензий
         :param offset: Сдвиг
+        :param cursor: Курсор последнего элемента предыдущей страницы
+        :param sort: Порядок рецензий
         :return: Список рецензий
+        :raises HTTPException: Курсор не подходит для сортировки по оценке
+        """
+
+        self._check_cursor(cursor, sort)
+        reviews = await self._repository.get_by_movie_id(
+            movie_uid=movie_uid, limit=limit, offset=offset, cursor=cursor, sort=sort
+        )
+        return reviews
+
+    async def search_reviews(
+        self,
+        query: str,
+        limit: int = 10,
+        movie_uid: UUID | None = None,
+        rating_min: int | None = None,
+        rating_max: int | None = None,
+        cursor: SearchCursor | None = None,
+    ) -> list[ScoredReview]:
+        """
+        Поиск рецензий по тексту
+        :param query: Поисковый запрос
+        :param limit: Количество рецензий
+        :param movie_uid: ID фильма
+        :param rating_min: Минимальная оценка
+        :param rating_max: Максимальная оценка
+        :param cursor: Курсор последнего элемента предыдущей страницы
+        :return: Список рецензий по убыванию релевантности
         """
 
-        reviews = await self._repository.get_by_movie_id(movie_uid=movie_uid, limit=limit, offset=offset)
+        if rating_min is not None and rating_max is not None and rating_min > rating_max:
+            raise HTTPException(status_code=400, detail="Минимальная оценка больше максимальной.")
+        reviews = await self._repository.search(
+            query=query,
+            limit=limit,
+            movie_uid=movie_uid,
+            rating_min=rating_min,
+            rating_max=rating_max,
+            cursor=cursor,
+        )
         return reviews
 
     async def get_reviews_count_by_movie_id(self, movie_uid: UUID) -> int:
@@ -97,7 +204,9 @@ class ReviewService(AbstractReviewService):
         :param movie_uid: ID фильма
         :return: Количество рецензий
         """
-        return await self._repository.get_reviews_count_by_movie_id(movie_uid=movie_uid)
+
+        stats = await self._stats_repository.get_by_movie_id(movie_uid=movie_uid)
+        return stats.reviews_count if stats else 0
 
     async def get_reviews_average_by_movie_id(self, movie_uid: UUID) -> float:
         """
@@ -105,46 +214,86 @@ class ReviewService(AbstractReviewService):
         :param movie_uid: ID фильма
         :return: Средний рейтинг
         """
-        reviews_average = await self._repository.get_reviews_average_by_movie_id(movie_uid=movie_uid)
-        return round(reviews_average, 1)
 
-    async def update_review(self, review_id: UUID, user_uid: UUID, rating: int, content: str) -> Review:
+        stats = await self._stats_repository.get_by_movie_id(movie_uid=movie_uid)
+        if stats is None or stats.average is None:
+            raise HTTPException(status_code=404, detail="Рецензии не найдены.")
+        return round(stats.average, 1)
+
+    async def update_review(
+        self, review_id: UUID, user_uid: UUID, rating: int | None = None, content: str | None = None
+    ) -> Review:
         """
-        Обновление рецензии
+        Обновление рецензии: изменяются только переданные поля
         :param review_id: ID рецензии
+        :param user_uid: ID пользователя
         :param rating: Оценка
         :param content: Контент
         :return: Рецензия
         """
 
-        review = await self._repository.get_by_id(item_id=review_id)
-        if review is None:
-            raise HTTPException(status_code=404, detail="Рецензия не найдена.")
-
-        if review.user_uid != user_uid:
-            raise HTTPException(status_code=403, detail="У вас нет доступа к этой рецензии.")
-
-        review.rating = rating
-        review.content = content
-        return await self._repository.update(item=review)
+        fields = {}
+        if rating is not None:
+            fields["rating"] = rating
+        if content is not None:
+            fields["content"] = content.strip()
+        if not fields:
+            raise HTTPException(status_code=400, detail="Нет данных для обновления.")
+
+        updated = await self._repository.update_by_owner(item_id=review_id, user_uid=user_uid, fields=fields)
+        if updated is None:
+            await self._raise_access_error(review_id)
+
+        review_previous, review_updated = updated
+        rating_delta = review_updated.rating - review_previous.rating
+        if rating_delta:
+            await self._stats_repository.increment(movie_uid=review_updated.movie_uid, rating_sum=rating_delta)
+        response_cache.invalidate(review_updated.movie_uid)
+        return review_updated
 
     async def delete_review(self, review_id: UUID, user_uid: UUID) -> None:
         """
         Удаление рецензии
         :param review_id: ID рецензии
+        :param user_uid: ID пользователя
         :return: None
         """
 
-        review = await self._repository.get_by_id(item_id=review_id)
-        if review is None:
-            raise HTTPException(status_code=404, detail="Рецензия не найдена.")
+        review_deleted = await self._repository.delete_by_owner(item_id=review_id, user_uid=user_uid)
+        if review_deleted is None:
+            await self._raise_access_error(review_id)
+
+        await self._stats_repository.increment(
+            movie_uid=review_deleted.movie_uid, reviews_count=-1, rating_sum=-review_deleted.rating
+        )
+        await self._activity_repository.increment(
+            movie_uid=review_deleted.movie_uid, hour=activity_hour(review_deleted.created_at), reviews_count=-1
+        )
+        response_cache.invalidate(review_deleted.movie_uid)
+        return None
 
-        if review.user_uid != user_uid:
-            raise HTTPException(status_code=403, detail="У вас нет доступа к этой рецензии.")
+    @staticmethod
+    def _check_cursor(cursor: Cursor | None, sort: ReviewSort) -> None:
+        # Курсор, полученный без оценки (например, со страницы другого списка), не задаёт позицию в порядке по оценке
+        if cursor is not None and sort.by_rating and cursor.rating is None:
+            raise HTTPException(status_code=400, detail="Курсор не подходит для сортировки по оценке.")
 
-        await self._repository.delete(item_id=review_id)
-        return None
+    async def _raise_access_error(self, review_id: UUID) -> NoReturn:
+        """
+        Определяет причину неудачи операции владельца: рецензия не найдена или принадлежит другому пользователю
+        :param review_id: ID рецензии
+        """
+
+        if await self._repository.get_by_id(item_id=review_id) is None:
+            raise HTTPException(status_code=404, detail="Рецензия не найдена.")
+        raise HTTPException(status_code=403, detail="У вас нет доступа к этой рецензии.")
 
 
-def get_review_service(repository: AbstractReviewRepository = Depends(get_review_repository)) -> AbstractReviewService:
-    return ReviewService(repository=repository)
+def get_review_service(
+    repository: AbstractReviewRepository = Depends(get_review_repository),
+    stats_repository: AbstractReviewStatsRepository = Depends(get_review_stats_repository),
+    activity_repository: AbstractMovieActivityRepository = Depends(get_movie_activity_repository),
+) -> AbstractReviewService:
+    return ReviewService(
+        repository=repository, stats_repository=stats_repository, activity_repository=activity_repository
+    )
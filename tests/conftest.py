@@ -0,0 +1,50 @@
+import os
+import uuid
+from collections.abc import AsyncIterator
+
+import pytest
+
+os.environ.setdefault("MONGO_DB_NAME", "user_activity_test")
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase  # noqa: E402
+from pymongo.errors import PyMongoError  # noqa: E402
+from src.core.config import settings  # noqa: E402
+from src.infrastructure import db  # noqa: E402
+
+# Тесты с MongoDB пропускаются, если сервер (по настройкам MONGO_*) недоступен за это время
+SERVER_SELECTION_TIMEOUT_MS = 1000
+# Результат проверки доступности MongoDB, общий для всех тестов сессии
+mongo_probe: dict[str, Exception | None] = {}
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+async def mongo_database() -> AsyncIterator[AsyncIOMotorDatabase]:
+    """
+    Отдельная база данных теста с инициализированными моделями Beanie; удаляется после теста
+    :return: База данных MongoDB
+    """
+
+    if "error" not in mongo_probe:
+        probe = AsyncIOMotorClient(settings.mongo.connection_url, serverSelectionTimeoutMS=SERVER_SELECTION_TIMEOUT_MS)
+        try:
+            await probe.admin.command("ping")
+            mongo_probe["error"] = None
+        except PyMongoError as e:
+            mongo_probe["error"] = e
+        finally:
+            probe.close()
+    if mongo_probe["error"] is not None:
+        pytest.skip(f"MongoDB недоступна: {mongo_probe['error']}")
+
+    db_name = f"{settings.mongo.db_name}_{uuid.uuid4().hex[:8]}"
+    client = await db.init_db(db_name=db_name)
+    try:
+        yield client[db_name]
+    finally:
+        await client.drop_database(db_name)
+        client.close()
@@ -0,0 +1,91 @@
+import time
+import uuid
+
+import pytest
+from src.infrastructure.bloom import BloomFilter, MembershipFilter
+from src.infrastructure.cache import InvalidationEvent
+from src.infrastructure.encoding import encode_uuid
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeCursor:
+    def __init__(self, documents: list[dict]):
+        self._documents = iter(documents)
+
+    def hint(self, index: str) -> "FakeCursor":
+        return self
+
+    def batch_size(self, size: int) -> "FakeCursor":
+        return self
+
+    def __aiter__(self) -> "FakeCursor":
+        return self
+
+    async def __anext__(self) -> dict:
+        try:
+            return next(self._documents)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeCollection:
+    name = "like"
+
+    def __init__(self, pairs: list[tuple[uuid.UUID, uuid.UUID]]):
+        self._documents = [
+            {"user_uid": encode_uuid(user_uid), "movie_uid": encode_uuid(movie_uid)} for user_uid, movie_uid in pairs
+        ]
+
+    async def estimated_document_count(self) -> int:
+        return len(self._documents)
+
+    def find(self, filters: dict, projection: dict) -> FakeCursor:
+        return FakeCursor(self._documents)
+
+
+def make_filter(pairs: list, watching_since: float | None) -> MembershipFilter:
+    return MembershipFilter(
+        FakeCollection(pairs),
+        capacity=1000,
+        error_rate=0.01,
+        max_bytes=2**20,
+        rebuild_interval=3600,
+        batch_size=100,
+        watching_since=lambda: watching_since,
+    )
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [uuid.uuid4().bytes for _ in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    assert sum(uuid.uuid4().bytes in bloom for _ in range(10000)) < 300
+
+
+async def test_negative_trusted_only_with_stream_open_before_build():
+    user_uid, movie_uid = uuid.uuid4(), uuid.uuid4()
+    membership_filter = make_filter([(user_uid, movie_uid)], watching_since=time.monotonic())
+    await membership_filter.rebuild()
+
+    assert membership_filter.might_contain(user_uid, movie_uid)
+    assert not membership_filter.might_contain(user_uid, uuid.uuid4())
+
+
+@pytest.mark.parametrize("watching_since", [None, float("inf")], ids=["no_stream", "stream_opened_after_build"])
+async def test_negative_not_trusted_without_complete_stream(watching_since):
+    membership_filter = make_filter([], watching_since=watching_since)
+    await membership_filter.rebuild()
+
+    assert membership_filter.might_contain(uuid.uuid4(), uuid.uuid4())
+    assert membership_filter._rebuild_requested.is_set() == (watching_since is not None)
+
+
+async def test_reset_event_disables_filter():
+    membership_filter = make_filter([], watching_since=time.monotonic())
+    await membership_filter.rebuild()
+    membership_filter.on_change(InvalidationEvent(collection="like", operation="invalidate"))
+
+    assert membership_filter.might_contain(uuid.uuid4(), uuid.uuid4())
@@ -0,0 +1,30 @@
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+from src.infrastructure.cache import TTLCache
+
+pytestmark = pytest.mark.anyio
+
+
+def sample(cache: str, result: str) -> float:
+    return REGISTRY.get_sample_value("cache_requests_total", {"cache": cache, "result": result}) or 0.0
+
+
+async def test_get_or_load_exports_request_counters():
+    cache: TTLCache[int] = TTLCache(maxsize=10, ttl=60, name="test_get_or_load")
+    loaded = asyncio.Event()
+
+    async def loader() -> int:
+        await loaded.wait()
+        return 1
+
+    first = asyncio.create_task(cache.get_or_load("key", loader))
+    second = asyncio.create_task(cache.get_or_load("key", loader))
+    await asyncio.sleep(0)
+    loaded.set()
+    assert await asyncio.gather(first, second) == [1, 1]
+    assert await cache.get_or_load("key", loader) == 1
+
+    assert (cache.hits, cache.misses, cache.coalesced) == (1, 2, 1)
+    assert [sample("test_get_or_load", result) for result in ("hits", "misses", "coalesced")] == [1, 2, 1]
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+from pymongo.errors import AutoReconnect, OperationFailure
+from src.infrastructure.cache import CacheRegistry
+from src.infrastructure.change_streams import ChangeStreamWatcher
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeStream:
+    def __init__(self, resume_token: dict):
+        self.resume_token = resume_token
+
+    async def __aenter__(self) -> "FakeStream":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+    def __aiter__(self) -> "FakeStream":
+        return self
+
+    async def __anext__(self) -> dict:
+        raise AutoReconnect("connection closed")
+
+
+class FakeDatabase:
+    async def command(self, command: dict) -> dict:
+        raise OperationFailure("BSON field 'collMod.changeStreamPreAndPostImages' is an unknown field.", 40415)
+
+
+class FakeCollection:
+    name = "like"
+    database = FakeDatabase()
+
+    def __init__(self):
+        self.watches: list[dict] = []
+
+    def watch(self, pipeline: list, **kwargs) -> FakeStream:
+        self.watches.append(kwargs)
+        return FakeStream({"_data": str(len(self.watches))})
+
+
+async def test_watcher_starts_from_now_without_pre_images_and_resumes_in_process():
+    collection = FakeCollection()
+    watcher = ChangeStreamWatcher(registry=CacheRegistry(), retry_delay=0)
+    watcher.start([collection])
+    while len(collection.watches) < 3:
+        await asyncio.sleep(0)
+    await watcher.close()
+
+    first, second, third = collection.watches[:3]
+    assert first["start_after"] is None
+    assert first["full_document_before_change"] is None
+    assert second["start_after"] == {"_data": "1"}
+    assert third["start_after"] == {"_data": "2"}
@@ -0,0 +1,152 @@
+import time
+import uuid
+
+import httpx
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from src.api.v1 import depends
+from src.infrastructure import jwks
+from src.infrastructure.jwks import JWKSKeyStore, UnknownKeyError, decode_token
+
+pytestmark = pytest.mark.anyio
+
+JWKS_URL = "http://auth.test/.well-known/jwks.json"
+
+
+class SigningKey:
+    def __init__(self, kid: str):
+        self.kid = kid
+        self.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    @property
+    def jwk(self) -> dict:
+        return {
+            **jwt.algorithms.RSAAlgorithm.to_jwk(self.private_key.public_key(), as_dict=True),
+            "kid": self.kid,
+            "alg": "RS256",
+            "use": "sig",
+        }
+
+    def sign(self, **claims) -> str:
+        payload = {"sub": str(uuid.uuid4()), "role": ["user"], "exp": int(time.time()) + 60, **claims}
+        return jwt.encode(payload, self.private_key, algorithm="RS256", headers={"kid": self.kid})
+
+
+class AuthService:
+    """JWKS сервиса авторизации: набор ключей можно заменить, запросы считаются"""
+
+    def __init__(self, *keys: SigningKey):
+        self.keys = list(keys)
+        self.requests = 0
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        return httpx.Response(200, json={"keys": [key.jwk for key in self.keys]})
+
+
+@pytest.fixture
+def first_key() -> SigningKey:
+    return SigningKey("first")
+
+
+@pytest.fixture
+def auth_service(first_key) -> AuthService:
+    return AuthService(first_key)
+
+
+@pytest.fixture
+async def httpx_client(auth_service):
+    async with httpx.AsyncClient(transport=httpx.MockTransport(auth_service.handle)) as client:
+        yield client
+
+
+@pytest.fixture
+async def key_store(httpx_client) -> JWKSKeyStore:
+    key_store = JWKSKeyStore(url=JWKS_URL, refresh_interval=300)
+    await key_store.refresh(httpx_client)
+    return key_store
+
+
+async def test_valid_token(key_store, httpx_client, first_key):
+    user_uid = str(uuid.uuid4())
+    claims = await decode_token(first_key.sign(sub=user_uid), key_store, httpx_client)
+    assert claims["sub"] == user_uid
+    assert claims["role"] == ["user"]
+
+
+async def test_expired_token(key_store, httpx_client, first_key):
+    token = first_key.sign(exp=int(time.time()) - 3600)
+    assert await decode_token(token, key_store, httpx_client) is None
+
+
+async def test_bad_signature(key_store, httpx_client, first_key):
+    header, payload, _ = first_key.sign().split(".")
+    _, _, signature = SigningKey(first_key.kid).sign().split(".")
+    assert await decode_token(f"{header}.{payload}.{signature}", key_store, httpx_client) is None
+
+
+@pytest.mark.parametrize("claim", ["sub", "role", "exp"])
+async def test_missing_required_claim(key_store, httpx_client, first_key, claim):
+    payload = {"sub": str(uuid.uuid4()), "role": ["user"], "exp": int(time.time()) + 60}
+    del payload[claim]
+    token = jwt.encode(payload, first_key.private_key, algorithm="RS256", headers={"kid": first_key.kid})
+    assert await decode_token(token, key_store, httpx_client) is None
+
+
+async def test_hs256_with_public_key_as_secret_rejected(key_store, httpx_client, first_key):
+    # Подмена алгоритма: подпись HMAC открытым ключом, который известен всем
+    payload = {"sub": str(uuid.uuid4()), "role": ["admin"], "exp": int(time.time()) + 60}
+    secret = jwt.algorithms.RSAAlgorithm.to_jwk(first_key.private_key.public_key()).encode()
+    token = jwt.encode(payload, secret, algorithm="HS256", headers={"kid": first_key.kid})
+    assert await decode_token(token, key_store, httpx_client) is None
+
+
+async def test_alg_none_rejected(key_store, httpx_client, first_key):
+    payload = {"sub": str(uuid.uuid4()), "role": ["admin"], "exp": int(time.time()) + 60}
+    token = jwt.encode(payload, None, algorithm="none", headers={"kid": first_key.kid})
+    assert await decode_token(token, key_store, httpx_client) is None
+
+
+async def test_unknown_kid_refreshes_jwks(key_store, httpx_client, auth_service, monkeypatch):
+    monkeypatch.setattr(jwks, "UNKNOWN_KEY_REFRESH_INTERVAL", 0)
+    new_key = SigningKey("second")
+    auth_service.keys.append(new_key)
+    requests = auth_service.requests
+
+    claims = await decode_token(new_key.sign(), key_store, httpx_client)
+    assert claims is not None
+    assert auth_service.requests == requests + 1
+
+
+async def test_unknown_kid_refresh_is_rate_limited(key_store, httpx_client, auth_service):
+    requests = auth_service.requests
+    with pytest.raises(UnknownKeyError):
+        await decode_token(SigningKey("second").sign(), key_store, httpx_client)
+    assert auth_service.requests == requests
+
+
+async def test_key_rotation(key_store, httpx_client, auth_service, first_key, monkeypatch):
+    monkeypatch.setattr(jwks, "UNKNOWN_KEY_REFRESH_INTERVAL", 0)
+    old_token = first_key.sign()
+    new_key = SigningKey("second")
+    auth_service.keys = [new_key]
+
+    assert await decode_token(new_key.sign(), key_store, httpx_client) is not None
+    with pytest.raises(UnknownKeyError):
+        await decode_token(old_token, key_store, httpx_client)
+
+
+async def test_local_user_requires_role(key_store, httpx_client, first_key, monkeypatch):
+    monkeypatch.setattr(depends, "jwks_key_store", key_store)
+    user_uid = uuid.uuid4()
+
+    user = await depends.get_local_user(first_key.sign(sub=str(user_uid), role="admin"), httpx_client)
+    assert (user.sub, user.role) == (user_uid, ["admin"])
+
+    payload = {"sub": str(user_uid), "exp": int(time.time()) + 60}
+    token = jwt.encode(payload, first_key.private_key, algorithm="RS256", headers={"kid": first_key.kid})
+    with pytest.raises(HTTPException) as error:
+        await depends.get_local_user(token, httpx_client)
+    assert error.value.status_code == 401
@@ -0,0 +1,113 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from src.domain.like import Like
+from src.infrastructure.encoding import encode_value
+from src.infrastructure.models import LikeModel, MovieLikeCounterModel
+from src.infrastructure.repositories import like_counter
+from src.infrastructure.repositories.like import InMemoryLikeRepository
+from src.infrastructure.repositories.like_counter import (
+    BeanieLikeCounterRepository,
+    InMemoryLikeCounterRepository,
+    ShardPolicy,
+)
+
+pytestmark = pytest.mark.anyio
+
+MAX_SHARDS = 8
+
+
+class FakeClock:
+    """time.monotonic, сдвигающийся на step при каждом вызове"""
+
+    def __init__(self, step: float):
+        self.now = 0.0
+        self.step = step
+
+    def __call__(self) -> float:
+        self.now += self.step
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock(step=0.01)
+    monkeypatch.setattr(like_counter, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+@pytest.fixture
+def policy(clock) -> ShardPolicy:
+    # 100 изменений в секунду по часам FakeClock при пороге 10 - фильм горячий
+    return ShardPolicy(hot_writes_per_second=10, max_shards=MAX_SHARDS, window=0.1, cooldown=1, maxsize=100)
+
+
+def test_policy_grows_for_hot_movie_and_shrinks_after_cooldown(policy, clock):
+    movie_uid = uuid.uuid4()
+    assert policy.shards(movie_uid) == 1
+    assert max(policy.shards(movie_uid) for _ in range(100)) == MAX_SHARDS
+
+    clock.step = 10
+    assert [policy.shards(movie_uid) for _ in range(3)] == [MAX_SHARDS // 2, MAX_SHARDS // 4, MAX_SHARDS // 8]
+
+
+def test_policy_keeps_cold_movie_on_one_shard(clock):
+    policy = ShardPolicy(hot_writes_per_second=1000, max_shards=MAX_SHARDS, window=0.1, cooldown=1, maxsize=100)
+    movie_uid = uuid.uuid4()
+    assert {policy.shards(movie_uid) for _ in range(100)} == {1}
+
+
+async def test_increments_spread_over_shards_and_counts_sum_them(policy):
+    counters = InMemoryLikeCounterRepository(InMemoryLikeRepository(), policy)
+    hot_movie, cold_movie = uuid.uuid4(), uuid.uuid4()
+    for _ in range(200):
+        await counters.increment(hot_movie, 1)
+    await counters.increment(hot_movie, -1)
+    await counters.increment(cold_movie, 1)
+
+    assert len({shard for movie_uid, shard in counters._shards if movie_uid == hot_movie}) > 1
+    assert await counters.get_count(hot_movie) == 199
+    assert await counters.get_counts([hot_movie, cold_movie, uuid.uuid4()]) == {hot_movie: 199, cold_movie: 1}
+
+
+async def test_verify_reports_out_of_band_like(policy):
+    likes = InMemoryLikeRepository()
+    counters = InMemoryLikeCounterRepository(likes, policy)
+    movie_uid = uuid.uuid4()
+    await likes.add(Like(user_uid=uuid.uuid4(), movie_uid=movie_uid))
+    await counters.increment(movie_uid, 1)
+    assert await counters.verify() == {}
+
+    await likes.add(Like(user_uid=uuid.uuid4(), movie_uid=movie_uid))
+    assert await counters.verify() == {movie_uid: (1, 2)}
+
+    await counters.rebuild()
+    assert await counters.verify() == {}
+
+
+async def test_beanie_counters(mongo_database, policy):
+    counters = BeanieLikeCounterRepository(model=MovieLikeCounterModel, like_model=LikeModel, policy=policy)
+    likes = LikeModel.get_motor_collection()
+    hot_movie, cold_movie = uuid.uuid4(), uuid.uuid4()
+
+    def like(movie_uid: uuid.UUID) -> dict:
+        return encode_value(Like(user_uid=uuid.uuid4(), movie_uid=movie_uid).model_dump(exclude={"id"}))
+
+    await likes.insert_many([like(hot_movie) for _ in range(100)] + [like(cold_movie)])
+    for _ in range(100):
+        await counters.increment(hot_movie, 1)
+    await counters.increment(cold_movie, 1)
+
+    shards = await MovieLikeCounterModel.get_motor_collection().count_documents(encode_value({"movie_uid": hot_movie}))
+    assert shards > 1
+    assert await counters.get_count(hot_movie) == 100
+    assert await counters.get_counts([hot_movie, cold_movie, uuid.uuid4()]) == {hot_movie: 100, cold_movie: 1}
+    assert await counters.verify() == {}
+
+    await likes.insert_one(like(cold_movie))
+    assert await counters.verify() == {cold_movie: (1, 2)}
+
+    assert await counters.rebuild() == 2
+    assert await counters.verify() == {}
+    assert await counters.get_counts([hot_movie, cold_movie]) == {hot_movie: 100, cold_movie: 2}
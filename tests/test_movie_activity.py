@@ -0,0 +1,46 @@
+import uuid
+from datetime import UTC, datetime, timedelta, timezone
+
+import pytest
+from src.domain.movie import activity_hour
+from src.infrastructure.models import MovieActivityModel
+from src.infrastructure.repositories.movie_activity import (
+    BeanieMovieActivityRepository,
+    InMemoryMovieActivityRepository,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def test_activity_hour_is_utc():
+    moment = datetime(2026, 10, 18, 2, 45, 10, tzinfo=timezone(timedelta(hours=3)))
+    assert activity_hour(moment) == datetime(2026, 10, 17, 23, tzinfo=UTC)
+    assert activity_hour(datetime(2026, 10, 18, 2, 45)) == activity_hour(datetime(2026, 10, 18, 2, 45).astimezone())
+
+
+async def test_in_memory_decrement_does_not_create_bucket():
+    repository = InMemoryMovieActivityRepository()
+    movie_uid, hour = uuid.uuid4(), activity_hour(datetime.now(UTC))
+
+    await repository.increment(movie_uid, hour, likes_count=-1)
+    assert await repository.get_top(since=hour, limit=10) == []
+
+    await repository.increment(movie_uid, hour, likes_count=1)
+    await repository.increment(movie_uid, hour, likes_count=1)
+    await repository.increment(movie_uid, hour, likes_count=-1)
+    [movie] = await repository.get_top(since=hour, limit=10)
+    assert (movie.movie_uid, movie.likes_count) == (movie_uid, 1)
+
+
+async def test_decrement_does_not_create_bucket(mongo_database):
+    repository = BeanieMovieActivityRepository(model=MovieActivityModel)
+    movie_uid, hour = uuid.uuid4(), activity_hour(datetime.now(UTC))
+
+    await repository.increment(movie_uid, hour, reviews_count=-1)
+    assert await MovieActivityModel.get_motor_collection().count_documents({}) == 0
+
+    await repository.increment(movie_uid, hour, reviews_count=1)
+    [movie] = await repository.get_top(since=hour, limit=10)
+    assert (movie.movie_uid, movie.reviews_count) == (movie_uid, 1)
+    raw = await MovieActivityModel.get_motor_collection().find_one({})
+    assert raw["hour"] == hour.replace(tzinfo=None)
@@ -0,0 +1,40 @@
+import uuid
+
+import pytest
+from pymongo.read_preferences import SecondaryPreferred
+from src.core.config import settings
+from src.domain.like import Like
+from src.infrastructure.encoding import encode_uuid
+from src.infrastructure.models import LikeModel
+from src.infrastructure.repositories.like import LikeRepository
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def replica_set(mongo_database):
+    hello = await mongo_database.client.admin.command("hello")
+    if "setName" not in hello:
+        pytest.skip("MongoDB запущена без набора реплик (MONGO_REPLICA_SET)")
+    return mongo_database
+
+
+async def test_causal_session_reads_own_writes_from_secondary(replica_set, monkeypatch):
+    monkeypatch.setattr(settings.mongo, "causal_consistency", True)
+    repository = LikeRepository(model=LikeModel, domain_model=Like, read_preference=SecondaryPreferred())
+    user_uid, movie_uid = uuid.uuid4(), uuid.uuid4()
+
+    like = await repository.add(Like(user_uid=user_uid, movie_uid=movie_uid))
+    assert [item.id for item in await repository.get_by_user_id(user_uid)] == [like.id]
+    assert await repository.get_movie_uids_by_user(user_uid, [movie_uid]) == {movie_uid}
+
+    await repository.delete_by_owner(like.id, user_uid)
+    assert await repository.get_by_user_id(user_uid) == []
+
+
+async def test_change_stream_sees_insert(replica_set):
+    collection = replica_set[LikeModel.get_settings().name]
+    async with collection.watch() as stream:
+        await collection.insert_one({"user_uid": encode_uuid(uuid.uuid4()), "movie_uid": encode_uuid(uuid.uuid4())})
+        change = await stream.next()
+    assert change["operationType"] == "insert"
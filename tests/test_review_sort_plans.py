@@ -0,0 +1,80 @@
+import random
+import uuid
+from collections.abc import Iterator
+
+import pytest
+from src.domain.pagination import Cursor
+from src.domain.review import Review, ReviewSort
+from src.infrastructure.encoding import decode_document, encode_value
+from src.infrastructure.models import ReviewModel
+from src.infrastructure.repositories.base import keyset_filter
+from src.infrastructure.repositories.review import REVIEW_SORTS
+
+pytestmark = pytest.mark.anyio
+
+EXPECTED_INDEXES = {
+    ("movie_uid", False): "movie_uid_created_at_id",
+    ("movie_uid", True): "movie_uid_rating_created_at_id",
+    ("user_uid", False): "user_uid_created_at_id",
+    ("user_uid", True): "user_uid_rating_created_at_id",
+}
+ROWS = 2000
+PAGE_SIZE = 10
+
+
+def plan_stages(plan: dict) -> Iterator[dict]:
+    """
+    Обходит дерево плана запроса (inputStage/inputStages, queryPlan у планировщика SBE)
+    :param plan: Узел плана
+    :return: Итератор стадий плана
+    """
+
+    if "stage" in plan:
+        yield plan
+    for key in ("queryPlan", "inputStage"):
+        if key in plan:
+            yield from plan_stages(plan[key])
+    for stage in plan.get("inputStages", []):
+        yield from plan_stages(stage)
+
+
+@pytest.fixture
+async def reviews(mongo_database) -> dict[str, uuid.UUID]:
+    """Рецензии одного фильма и одного пользователя вперемешку с чужими: ID фильма и пользователя"""
+
+    rng = random.Random(0)
+    uids = {"movie_uid": uuid.uuid4(), "user_uid": uuid.uuid4()}
+    documents = [
+        Review(
+            movie_uid=uids["movie_uid"] if i % 2 else uuid.uuid4(),
+            user_uid=uids["user_uid"] if i % 2 == 0 else uuid.uuid4(),
+            rating=rng.randint(1, 10),
+            content="",
+        )
+        for i in range(ROWS)
+    ]
+    await ReviewModel.get_motor_collection().insert_many(
+        [encode_value(review.model_dump(exclude={"id"})) for review in documents]
+    )
+    return uids
+
+
+@pytest.mark.parametrize("with_cursor", [False, True], ids=["first_page", "after_cursor"])
+@pytest.mark.parametrize("sort", list(ReviewSort))
+@pytest.mark.parametrize("field", ["movie_uid", "user_uid"])
+async def test_review_page_reads_index_without_sort(reviews, field, sort, with_cursor):
+    collection = ReviewModel.get_motor_collection()
+    spec = REVIEW_SORTS[sort]
+    filters = {field: reviews[field]}
+    if with_cursor:
+        raw = await collection.find(encode_value(filters)).sort(spec).skip(PAGE_SIZE).limit(1).to_list(length=1)
+        cursor = Cursor.from_item(Review.model_validate(decode_document(raw[0])))
+        filters = {"$and": [filters, keyset_filter(spec, cursor)]}
+
+    explain = await collection.find(encode_value(filters)).sort(spec).limit(PAGE_SIZE).explain()
+    stages = list(plan_stages(explain["queryPlanner"]["winningPlan"]))
+    names = [stage["stage"] for stage in stages]
+    indexes = {stage.get("indexName") for stage in stages if stage["stage"] == "IXSCAN"}
+
+    assert "SORT" not in names, names
+    assert indexes == {EXPECTED_INDEXES[(field, sort.by_rating)]}
@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+from src.infrastructure.write_behind import IncrementBuffer, WriteBehindBuffer
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeCollection:
+    def __init__(self, name: str):
+        self.name = name
+        self.batches: list[list] = []
+
+    async def bulk_write(self, operations: list, ordered: bool) -> None:
+        self.batches.append(operations)
+
+
+def sample(name: str, collection: str) -> float:
+    return REGISTRY.get_sample_value(name, {"collection": collection}) or 0.0
+
+
+@pytest.mark.parametrize("buffer_class", [WriteBehindBuffer, IncrementBuffer])
+async def test_flush_metrics(buffer_class):
+    collection = FakeCollection(f"write_behind_{buffer_class.__name__}")
+    buffer = buffer_class(collection, batch_size=3, flush_interval=60)
+    buffer.start()
+
+    if buffer_class is WriteBehindBuffer:
+        writes = [buffer.insert({"_id": index}) for index in range(3)]
+    else:
+        writes = [buffer.increment({"_id": index}, {"count": 1}) for index in range(3)]
+    tasks = [asyncio.create_task(write) for write in writes[:2]]
+    while len(buffer._pending) < 2:
+        await asyncio.sleep(0)
+    assert sample("write_behind_pending", collection.name) == 2
+
+    await asyncio.gather(*tasks, writes[2])
+    await buffer.close()
+
+    assert len(collection.batches) == 1
+    assert sample("write_behind_pending", collection.name) == 0
+    assert sample("write_behind_flush_size_count", collection.name) == 1
+    assert sample("write_behind_flush_size_sum", collection.name) == 3
+    assert sample("write_behind_flush_duration_seconds_count", collection.name) == 1